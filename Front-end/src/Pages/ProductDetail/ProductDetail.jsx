@@ -19,7 +19,7 @@ const ProductDetail = () => {
       try {
         // Try to get product from the products endpoint
         const response = await axios.get(`http://localhost:5000/products`, {
-          params: { id: productId }
+          params: { id: productId, all: true }
         });
         
         if (response.data && response.data.products) {
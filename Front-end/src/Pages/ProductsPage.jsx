@@ -2,7 +2,7 @@
 const fetchProducts = async () => {
   try {
     console.log("Fetching products from:", "http://localhost:5000/products");
-    const response = await axios.get("http://localhost:5000/products");
+    const response = await axios.get("http://localhost:5000/products?all=true");
     console.log("Products response:", response.data);
     // Rest of your code...
   } catch (error) {
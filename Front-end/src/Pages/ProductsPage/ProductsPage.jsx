@@ -39,8 +39,8 @@ const ProductsPage = () => {
         const categoryId = queryParams.get('category_id');
         
         const url = categoryId 
-          ? `http://127.0.0.1:5000/products?category_id=${categoryId}`
-          : 'http://127.0.0.1:5000/products';
+          ? `http://127.0.0.1:5000/products?all=true&category_id=${categoryId}`
+          : 'http://127.0.0.1:5000/products?all=true';
           
         const response = await axios.get(url);
         
@@ -1,7 +1,21 @@
 
 from flask import Flask, send_from_directory
-from flask_migrate import Migrate
 from backend.extensions import db
+from backend import query_stats
+from backend.auth_cache import auth_cache
+from backend.catalog_cache import catalog_cache
+from backend.catalog_columns import catalog_columns
+from backend.product_detail_cache import product_detail_cache
+from backend.db_pool import db_pools
+from backend.logging_setup import configure_logging
+from backend.metrics import metrics
+from backend.passwords import password_hasher
+from backend.profiler import request_profiler
+from backend.read_routing import read_router
+from backend.search_index import search_index
+from backend.slow_queries import slow_query_log
+from backend.revocation import revocation_list
+from backend.schema_check import ensure_schema
 from backend.routes.auth import auth_bp
 from backend.routes.orders import order_bp
 from backend.routes.products import product_bp
@@ -10,12 +24,14 @@ from backend.routes.payments import payment_bp
 from backend.routes.checkout import checkout_bp
 from backend.routes.admin import admin_bp
 from backend.routes.uploads import upload_bp
-from flask_cors import CORS
+from backend.routes.metrics import metrics_bp
+from backend.cors_middleware import CORSMiddleware
 import os
+import sys
 
 from backend.config.config import Config
 
-def create_app():
+def create_app(config_overrides=None):
     app = Flask(__name__,
                 template_folder="../frontend/templates",
                 static_folder="static")
@@ -27,25 +43,37 @@ def create_app():
     def serve_static(filename):
         return send_from_directory(os.path.join(app.root_path, 'static'), filename)
 
-    CORS(app,
-         origins=["http://localhost:5174", "http://localhost:3000"],
-         allow_headers=["Content-Type", "Authorization"],
-         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-         supports_credentials=True,
-         max_age=3600)
-
-    @app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
-    @app.route('/<path:path>', methods=['OPTIONS'])
-    def handle_options(path):
-        return '', 200
-
     app.config.from_object(Config)
+    if config_overrides:
+        app.config.update(config_overrides)
+    configure_logging(app)
+
+    app.wsgi_app = CORSMiddleware(app.wsgi_app,
+                                  origins=app.config["CORS_ORIGINS"],
+                                  allow_headers=app.config["CORS_ALLOW_HEADERS"],
+                                  max_age=app.config["CORS_MAX_AGE"])
 
+    db_pools.init_app(app)
     db.init_app(app)
-    Migrate(app, db)
+    read_router.init_app(app)
+    init_migrate(app)
+    auth_cache.init_app(app)
+    catalog_cache.init_app(app)
+    search_index.init_app(app)
+    catalog_columns.init_app(app)
+    product_detail_cache.init_app(app)
+    password_hasher.init_app(app)
+    revocation_list.init_app(app)
+    query_stats.init_app(app)
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    slow_query_log.init_app(app)
 
     with app.app_context():
-        db.create_all()
+        ensure_schema(app)
+        db_pools.register("primary", db.engine)
+        if search_index.enabled:
+            search_index.build()
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(order_bp)
@@ -55,9 +83,19 @@ def create_app():
     app.register_blueprint(checkout_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(upload_bp)
+    app.register_blueprint(metrics_bp)
 
     return app
 
+
+def init_migrate(app):
+    # Flask-Migrate imports Alembic, a large share of cold-start time. Only the
+    # ``flask db`` commands need it, and the flask CLI has already imported it
+    # (as a plugin) by the time it loads the app.
+    if app.config.get("MIGRATE_ON_STARTUP") or "flask_migrate" in sys.modules:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
 # mahmoud elqalini
 # mahmoud ramadan
 # habiba abdelmalik
\ No newline at end of file
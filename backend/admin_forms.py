@@ -0,0 +1,62 @@
+"""Admin form definitions.
+
+Kept out of ``backend.routes.admin`` so that flask_wtf and wtforms are only
+imported by code that actually validates one of these forms.
+"""
+from flask_wtf import FlaskForm
+from wtforms import StringField, FloatField, IntegerField
+from wtforms.validators import DataRequired, NumberRange
+
+
+class AddProductForm(FlaskForm):
+    class Meta:
+        csrf = False  
+
+    product_name = StringField("Product Name", validators=[DataRequired()])
+    description = StringField("Description")
+    price = FloatField(
+        "Price",
+        validators=[
+            DataRequired(),
+            NumberRange(min=0.01, message="Price must be greater than 0"),
+        ],
+    )
+    stock = IntegerField(
+        "Stock",
+        validators=[
+            DataRequired(),
+            NumberRange(min=0, message="Stock cannot be negative"),
+        ],
+    )
+    category_id = IntegerField("Category ID", validators=[DataRequired()])
+    image_url = StringField("Image URL")
+    discount = FloatField(
+        "Discount",
+        validators=[
+            NumberRange(min=0, max=100, message="Discount must be between 0 and 100"),
+        ],
+    )
+
+class UpdatePriceForm(FlaskForm):
+    class Meta:
+        csrf = False
+
+    new_price = FloatField(
+        "New Price",
+        validators=[
+            DataRequired(),
+            NumberRange(min=0.01, message="Price must be greater than 0"),
+        ],
+    )
+
+class UpdateDiscountForm(FlaskForm):
+    class Meta:
+        csrf = False
+
+    new_discount = FloatField(
+        "New Discount",
+        validators=[
+            DataRequired(),
+            NumberRange(min=0, max=100, message="Discount must be between 0 and 100"),
+        ],
+    )
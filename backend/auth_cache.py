@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class AuthCache:
+    """Per-process LRU/TTL cache of verified tokens.
+
+    Maps a raw JWT to the ``Principal`` it was issued for (and the token's
+    ``jti``, so revocation can still be checked), so that ``token_required``
+    can skip both the signature check and the user lookup for tokens it has
+    already verified. Entries never outlive the token's own
+    ``exp`` claim, and every entry for a user is dropped when that user is
+    changed through ``invalidate_user``.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 0
+        self.maxsize = 0
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("AUTH_CACHE_TTL", 300)
+        self.maxsize = app.config.get("AUTH_CACHE_SIZE", 10000)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, token):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+
+            user_id, principal, jti, expires_at = entry
+            if expires_at <= time.time():
+                self._discard(token, user_id)
+                return None
+
+            self._entries.move_to_end(token)
+            return principal, jti
+
+    def put(self, token, user_id, principal, token_exp=None, jti=None):
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+
+        with self._lock:
+            if token in self._entries:
+                self._discard(token, self._entries[token][0])
+
+            self._entries[token] = (user_id, principal, jti, expires_at)
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+
+            while len(self._entries) > self.maxsize:
+                old_token, (old_user_id, _, _, _) = self._entries.popitem(last=False)
+                self._forget_token(old_token, old_user_id)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, ()):
+                self._entries.pop(token, None)
+
+    def invalidate_token(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                self._discard(token, entry[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, token, user_id):
+        self._entries.pop(token, None)
+        self._forget_token(token, user_id)
+
+    def _forget_token(self, token, user_id):
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+auth_cache = AuthCache()
@@ -0,0 +1,161 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+from backend.metrics import metrics
+
+
+class CatalogCache:
+    """Per-process LRU cache of serialized catalog responses.
+
+    Entries are keyed by whatever identifies a response (the route and its
+    ``category_id``) and hold the body exactly as it was sent plus its
+    strong ETag, so a hit skips both the query and JSON encoding, and a
+    matching ``If-None-Match`` is answered without reading the body at all.
+    Each entry carries the catalog version that was current before its rows
+    were read; ``bump`` (called after every admin product change) moves the
+    version on, so older entries turn into misses and a request that read
+    the catalogue before the change cannot store its body afterwards.
+
+    The version lives in this process only, which is why the ETag is a hash
+    of the body rather than the version: any worker produces the same tag
+    for the same content. Other workers pick up an edit when their entries
+    reach ``CATALOG_CACHE_TTL``, which also bounds how far the listed stock
+    can lag behind orders. Memory is bounded by ``CATALOG_CACHE_SIZE``
+    entries and ``CATALOG_CACHE_MAX_BYTES`` of body.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 0
+        self.maxsize = 0
+        self.max_bytes = 0
+        self.version = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("CATALOG_CACHE_TTL", 60)
+        self.maxsize = app.config.get("CATALOG_CACHE_SIZE", 256)
+        self.max_bytes = app.config.get("CATALOG_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.maxsize > 0 and self.max_bytes > 0
+
+    def get(self, key):
+        """The cached ``(body, etag)`` for ``key``, or None."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] != self.version or entry[3] <= time.monotonic()):
+                self._discard(key)
+                return None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key, version, body, etag=None):
+        """Store ``body``, read while the catalog was at ``version``."""
+        if not self.enabled or len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            if version != self.version:
+                return
+            self._discard(key)
+            self._entries[key] = (version, body, etag or body_etag(body), time.monotonic() + self.ttl)
+            self._bytes += len(body)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, (_, old_body, _, _) = self._entries.popitem(last=False)
+                self._bytes -= len(old_body)
+
+    def bump(self):
+        """Invalidate every entry after the catalog changed."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+
+def body_etag(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def catalog_response(key):
+    """Serve a catalog endpoint from ``catalog_cache``, with ETags.
+
+    ``key`` is called inside the request and returns the cache key. Only
+    200 responses are cached and tagged; a view can opt a response out by
+    setting ``Cache-Control: no-store`` on it. ``Cache-Control`` itself comes
+    from the endpoint's entry in the ``CACHE_CONTROL`` setting.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            cache_key = key()
+            cached = catalog_cache.get(cache_key)
+            if cached is not None:
+                body, etag = cached
+                if request.if_none_match.contains_weak(etag):
+                    _count("not_modified")
+                    return _tagged(current_app.response_class(status=304), etag)
+                _count("hit")
+                return _tagged(current_app.response_class(body, mimetype=current_app.config["JSONIFY_MIMETYPE"]),
+                               etag)
+
+            _count("miss")
+            version = catalog_cache.version
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.cache_control.no_store:
+                return response
+
+            body = response.get_data()
+            etag = body_etag(body)
+            catalog_cache.put(cache_key, version, body, etag)
+            if request.if_none_match.contains_weak(etag):
+                return _tagged(current_app.response_class(status=304), etag)
+            return _tagged(response, etag)
+
+        return decorated
+
+    return decorator
+
+
+def _tagged(response, etag):
+    response.set_etag(etag)
+    policy = current_app.config.get("CACHE_CONTROL", {}).get(request.endpoint)
+    if policy:
+        response.headers["Cache-Control"] = policy
+    return response
+
+
+def _count(result):
+    if metrics.enabled:
+        metrics.inc("catalog_cache_requests_total", (("result", result),))
+
+
+catalog_cache = CatalogCache()
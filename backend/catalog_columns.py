@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+
+from backend.statements import ACTIVE_PRODUCT, ALL_PRODUCTS
+
+logger = logging.getLogger(__name__)
+
+# Most price histogram buckets one facet request may ask for
+MAX_PRICE_BUCKETS = 50
+
+
+class CatalogColumns:
+    """In-process columnar copy of the active catalogue, for filters and facets.
+
+    Holds what ``GetAllProducts`` returns as NumPy columns (see
+    ``backend.product_columns``), so ``/products/facets`` and the filtered
+    pages of ``/products`` are vectorized masks over memory rather than
+    queries. NumPy is only imported when the columns are first built, on
+    the first request that needs them, so it adds nothing to startup.
+
+    The admin product routes update the columns incrementally after they
+    commit. Other workers, and the stock that orders take, are caught up
+    by the first request that finds the columns
+    ``CATALOG_COLUMNS_REFRESH_SECONDS`` old, which rebuilds them while
+    other threads keep reading the current ones. Reads return None while
+    no columns could be built (the database was unreachable).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.refresh_interval = 60
+        self._columns = None
+        self._built_at = None
+        self._changed = None
+        self._lock = threading.Lock()
+        self._building = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("CATALOG_COLUMNS_ENABLED", True)
+        self.refresh_interval = app.config.get("CATALOG_COLUMNS_REFRESH_SECONDS", 60)
+        with self._lock:
+            self._columns = None
+            self._built_at = None
+            self._changed = None
+
+    def build(self):
+        """Load the active catalogue into new columns and swap them in.
+
+        Returns False when another thread is already building. Products an
+        admin changed while the rows were being read are loaded again
+        afterwards, so the swap cannot undo them.
+        """
+        if not self._building.acquire(blocking=False):
+            return False
+        try:
+            from backend.product_columns import ProductColumns
+
+            with self._lock:
+                self._changed = set()
+            started = time.perf_counter()
+            rows = ALL_PRODUCTS.all({"category_id": None})
+            # GetAllProducts answers an empty catalogue with a status row
+            if rows and "status" in rows[0].keys():
+                rows = []
+            columns = ProductColumns.from_rows(rows)
+            with self._lock:
+                self._columns = columns
+                self._built_at = time.monotonic()
+                changed, self._changed = self._changed, None
+            for product_id in changed:
+                self.refresh_product(product_id)
+            logger.info(f"Catalog columns built: {len(columns)} products "
+                        f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return True
+        except Exception as e:
+            with self._lock:
+                self._changed = None
+            logger.error(f"Error building the catalog columns: {str(e)}")
+            return False
+        finally:
+            self._building.release()
+
+    def refresh_product(self, product_id):
+        """Re-read one product after an admin change; inactive products drop out."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._changed is not None:
+                self._changed.add(product_id)
+            if self._columns is None:
+                return  # whatever builds them first reads the product as it is now
+        try:
+            row = ACTIVE_PRODUCT.first({"product_id": product_id})
+        except Exception as e:
+            # The next read rebuilds the columns instead
+            logger.error(f"Error refreshing product {product_id} in the catalog columns: {str(e)}")
+            with self._lock:
+                self._built_at = None
+            return
+        with self._lock:
+            self._columns = self._columns.replace(product_id, row)
+
+    def page(self, filters, sort, after, limit):
+        """Products matching ``filters``, as ``ProductColumns.page`` lists them."""
+        columns = self._ensure_fresh()
+        return None if columns is None else columns.page(filters, sort, after, limit)
+
+    def matching(self, filters):
+        columns = self._ensure_fresh()
+        return None if columns is None else columns.matching(filters)
+
+    def facets(self, filters, buckets):
+        columns = self._ensure_fresh()
+        return None if columns is None else columns.facets(filters, buckets)
+
+    def _ensure_fresh(self):
+        built_at = self._built_at
+        if built_at is None or time.monotonic() - built_at >= self.refresh_interval:
+            self.build()
+        return self._columns if self._built_at is not None else None
+
+
+catalog_columns = CatalogColumns()
@@ -12,6 +12,77 @@ class Config:
     SESSION_COOKIE_SAMESITE = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')
     REMEMBER_COOKIE_DURATION = int(os.getenv('REMEMBER_COOKIE_DURATION', 86400))
     TOKEN_EXPIRATION_DAYS = int(os.getenv('TOKEN_EXPIRATION_DAYS', 1))
+    CORS_ORIGINS = [o.strip() for o in os.getenv(
+        'CORS_ORIGINS', 'http://localhost:5174,http://localhost:3000,http://localhost:5173'
+    ).split(',') if o.strip()]
+    CORS_ALLOW_HEADERS = [h.strip() for h in os.getenv(
+        'CORS_ALLOW_HEADERS', 'Content-Type,Authorization,X-Requested-With'
+    ).split(',') if h.strip()]
+    CORS_MAX_AGE = int(os.getenv('CORS_MAX_AGE', 3600))
+    LOG_LEVEL = os.getenv('LOG_LEVEL')
+    LOG_DEBUG_SAMPLE_PER_SECOND = int(os.getenv('LOG_DEBUG_SAMPLE_PER_SECOND', 10))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', 8))
+    QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 3))
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'True') == 'True'
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True') == 'True'
+    PROFILE_DIR = os.getenv('PROFILE_DIR')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))
+    SLOW_QUERY_ENABLED = os.getenv('SLOW_QUERY_ENABLED', 'True') == 'True'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG')
+    SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    SLOW_QUERY_LOG_BACKUPS = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 5))
+    SLOW_QUERY_SAMPLE_SIZE = int(os.getenv('SLOW_QUERY_SAMPLE_SIZE', 500))
+    AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', 300))
+    AUTH_CACHE_SIZE = int(os.getenv('AUTH_CACHE_SIZE', 10000))
+    CATALOG_CACHE_TTL = float(os.getenv('CATALOG_CACHE_TTL', 60))
+    CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', 256))
+    CATALOG_CACHE_MAX_BYTES = int(os.getenv('CATALOG_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    PRODUCTS_PAGE_SIZE = int(os.getenv('PRODUCTS_PAGE_SIZE', 24))
+    PRODUCTS_MAX_PAGE_SIZE = int(os.getenv('PRODUCTS_MAX_PAGE_SIZE', 100))
+    SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'True') == 'True'
+    SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv('SEARCH_INDEX_REFRESH_SECONDS', 300))
+    SEARCH_MAX_EXPANSIONS = int(os.getenv('SEARCH_MAX_EXPANSIONS', 50))
+    SEARCH_RESULTS_LIMIT = int(os.getenv('SEARCH_RESULTS_LIMIT', 20))
+    AUTOCOMPLETE_LIMIT = int(os.getenv('AUTOCOMPLETE_LIMIT', 8))
+    CATALOG_COLUMNS_ENABLED = os.getenv('CATALOG_COLUMNS_ENABLED', 'True') == 'True'
+    CATALOG_COLUMNS_REFRESH_SECONDS = float(os.getenv('CATALOG_COLUMNS_REFRESH_SECONDS', 60))
+    FACET_PRICE_BUCKETS = int(os.getenv('FACET_PRICE_BUCKETS', 10))
+    PRODUCT_DETAIL_CACHE_TTL = float(os.getenv('PRODUCT_DETAIL_CACHE_TTL', 30))
+    PRODUCT_DETAIL_CACHE_SIZE = int(os.getenv('PRODUCT_DETAIL_CACHE_SIZE', 1024))
+    CACHE_CONTROL = {
+        'product.get_products': os.getenv('CACHE_CONTROL_PRODUCTS', 'public, max-age=30, must-revalidate'),
+        'product.get_product_facets': os.getenv('CACHE_CONTROL_FACETS', 'public, max-age=30, must-revalidate'),
+        'product.get_categories': os.getenv('CACHE_CONTROL_CATEGORIES', 'public, max-age=300, must-revalidate'),
+        'bestsellers.get_bestsellers': os.getenv('CACHE_CONTROL_BESTSELLERS', 'public, max-age=60, must-revalidate'),
+    }
+    TOKEN_REVOCATION_REFRESH_SECONDS = float(os.getenv('TOKEN_REVOCATION_REFRESH_SECONDS', 5))
+    TOKEN_REVOCATION_OVERLAP_SECONDS = float(os.getenv('TOKEN_REVOCATION_OVERLAP_SECONDS', 60))
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0)) or None
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 0.5))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True') == 'True'
+    DB_FAST_EXECUTEMANY = os.getenv('DB_FAST_EXECUTEMANY', 'True') == 'True'
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 0)) or None
+    REPORTING_POOL_ENABLED = os.getenv('REPORTING_POOL_ENABLED', 'False') == 'True'
+    REPORTING_DATABASE_URL = os.getenv('REPORTING_DATABASE_URL')
+    REPORTING_POOL_SIZE = int(os.getenv('REPORTING_POOL_SIZE', 2))
+    REPORTING_MAX_OVERFLOW = int(os.getenv('REPORTING_MAX_OVERFLOW', 0))
+    REPORTING_POOL_TIMEOUT = float(os.getenv('REPORTING_POOL_TIMEOUT', 5))
+    REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+    READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
+    SCHEMA_CHECK = os.getenv('SCHEMA_CHECK', 'skip' if FLASK_ENV == 'production' else 'fingerprint')
+    SCHEMA_FINGERPRINT_FILE = os.getenv('SCHEMA_FINGERPRINT_FILE')
+    MIGRATE_ON_STARTUP = os.getenv('MIGRATE_ON_STARTUP', 'False') == 'True'
 
 # mahmoud elqalini
 # mahmoud ramadan
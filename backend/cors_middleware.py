@@ -1,55 +1,69 @@
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
 class CORSMiddleware:
-    def __init__(self, app):
+    """WSGI-level CORS handling for the whole application.
+
+    All header tuples are built once, per allowed origin, when the middleware
+    is created. Preflight (``OPTIONS``) requests are answered here without
+    entering Flask routing; other responses get the precomputed headers
+    appended. Requests from origins that are not allowed get no CORS headers,
+    so the browser blocks them.
+
+    Every response carries ``Vary: Origin``, including those to requests
+    with no ``Origin`` or a disallowed one, so a shared cache never hands a
+    response without CORS headers to an allowed origin, or the reverse.
+    """
+
+    def __init__(self, app, origins, methods=("GET", "POST", "PUT", "DELETE", "OPTIONS"),
+                 allow_headers=("Content-Type", "Authorization", "X-Requested-With"),
+                 expose_headers=(), max_age=3600, supports_credentials=True):
         self.app = app
-        self.allowed_origins = ["http://localhost:5174", "http://localhost:3000", "http://localhost:5173"]
-        self.allowed_methods = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
-        self.allowed_headers = ["Content-Type", "Authorization", "X-Requested-With"]
-        
+        self.origins = tuple(origins)
+
+        vary = [("Vary", "Origin")]
+        common = list(vary)
+        if supports_credentials:
+            common.append(("Access-Control-Allow-Credentials", "true"))
+
+        response_extra = list(common)
+        if expose_headers:
+            response_extra.append(("Access-Control-Expose-Headers", ", ".join(expose_headers)))
+
+        preflight_extra = common + [
+            ("Access-Control-Allow-Methods", ", ".join(methods)),
+            ("Access-Control-Allow-Headers", ", ".join(allow_headers)),
+            ("Access-Control-Max-Age", str(max_age)),
+            ("Content-Type", "text/plain"),
+            ("Content-Length", "0"),
+        ]
+
+        self._response_headers = {}
+        self._preflight_headers = {}
+        for origin in self.origins:
+            allow_origin = ("Access-Control-Allow-Origin", origin)
+            self._response_headers[origin] = tuple([allow_origin] + response_extra)
+            self._preflight_headers[origin] = [allow_origin] + preflight_extra
+
+        self._rejected_headers = tuple(vary)
+        self._rejected_preflight_headers = vary + [("Content-Type", "text/plain"), ("Content-Length", "0")]
+
+        logger.info(f"CORS enabled for origins: {', '.join(self.origins)}")
+
     def __call__(self, environ, start_response):
-        # Log the request
-        request_method = environ.get('REQUEST_METHOD')
-        path_info = environ.get('PATH_INFO')
-        origin = environ.get('HTTP_ORIGIN')
-        
-        logger.info(f"CORS Middleware: {request_method} {path_info} from {origin}")
-        
-        # Handle OPTIONS request
-        if request_method == 'OPTIONS':
-            headers = [
-                ('Access-Control-Allow-Origin', origin if origin in self.allowed_origins else self.allowed_origins[0]),
-                ('Access-Control-Allow-Methods', ', '.join(self.allowed_methods)),
-                ('Access-Control-Allow-Headers', ', '.join(self.allowed_headers)),
-                ('Access-Control-Allow-Credentials', 'true'),
-                ('Access-Control-Max-Age', '3600'),
-                ('Content-Type', 'text/plain'),
-                ('Content-Length', '0')
-            ]
-            start_response('200 OK', headers)
-            return [b'']
-            
-        def custom_start_response(status, headers, exc_info=None):
-            # Add CORS headers to every response
-            cors_headers = []
-            if origin in self.allowed_origins:
-                cors_headers.append(('Access-Control-Allow-Origin', origin))
-            else:
-                cors_headers.append(('Access-Control-Allow-Origin', self.allowed_origins[0]))
-                
-            cors_headers.extend([
-                ('Access-Control-Allow-Methods', ', '.join(self.allowed_methods)),
-                ('Access-Control-Allow-Headers', ', '.join(self.allowed_headers)),
-                ('Access-Control-Allow-Credentials', 'true')
-            ])
-            
-            # Combine original headers with CORS headers
-            new_headers = headers + cors_headers
-            return start_response(status, new_headers, exc_info)
-            
-        return self.app(environ, custom_start_response)
+        origin = environ.get("HTTP_ORIGIN")
+
+        if environ.get("REQUEST_METHOD") == "OPTIONS":
+            headers = self._preflight_headers.get(origin, self._rejected_preflight_headers)
+            start_response("200 OK", list(headers))
+            return [b""]
+
+        extra = self._response_headers.get(origin, self._rejected_headers)
+
+        def cors_start_response(status, headers, exc_info=None):
+            headers.extend(extra)
+            return start_response(status, headers, exc_info)
 
+        return self.app(environ, cors_start_response)
@@ -0,0 +1,279 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from backend.extensions import db
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+POOL_KEYS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle", "poolclass")
+
+
+def engine_options(uri, pool_size, max_overflow, pool_timeout, pool_recycle, pre_ping=True,
+                   fast_executemany=True, connect_timeout=None):
+    """``create_engine`` keyword arguments for ``uri``.
+
+    Queue sizing is skipped for SQLite, whose default pools take no size
+    arguments; the driver flags are only passed to pyodbc.
+    """
+    options = {"pool_pre_ping": pre_ping}
+    if not uri:
+        return options
+
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite":
+        options.update(pool_size=pool_size, max_overflow=max_overflow,
+                       pool_timeout=pool_timeout, pool_recycle=pool_recycle)
+    if url.get_driver_name() == "pyodbc":
+        options["fast_executemany"] = fast_executemany
+        if connect_timeout:
+            options["connect_args"] = {"timeout": connect_timeout}
+    return options
+
+
+def timed_pool(uri, options):
+    """Set ``options["poolclass"]`` to a ``_TimedPool`` of the class the engine would use.
+
+    An explicit ``poolclass`` is kept and wrapped; an explicit ``pool``
+    instance is left alone and its checkouts go untimed.
+    """
+    if not uri or "pool" in options:
+        return options
+    base = options.get("poolclass")
+    if base is None:
+        url = make_url(uri)
+        base = url.get_dialect().get_pool_class(url)
+    options["poolclass"] = _timed_pool_class(base)
+    return options
+
+
+_timed_pool_classes = {}
+
+
+def _timed_pool_class(base):
+    if issubclass(base, _TimedPool):
+        return base
+    cls = _timed_pool_classes.get(base)
+    if cls is None:
+        cls = _timed_pool_classes[base] = type(f"Timed{base.__name__}", (_TimedPool, base), {})
+    return cls
+
+
+class _TimedPool:
+    """Mixin timing ``Pool.connect()``, the checkout every engine connection goes through.
+
+    ``on_checkout(waited, timed_out)`` is set by ``DatabasePools.register``.
+    """
+
+    on_checkout = None
+
+    def connect(self):
+        on_checkout = self.on_checkout
+        if on_checkout is None:
+            return super().connect()
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            on_checkout(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool, which keeps being timed
+        pool = super().recreate()
+        pool.on_checkout = self.on_checkout
+        return pool
+
+
+class _PoolStats:
+    __slots__ = ("engine", "waits", "wait_total", "wait_max", "timeouts")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+
+class DatabasePools:
+    """Engine configuration, pool statistics and the optional reporting pool.
+
+    ``init_app`` turns the ``DB_*`` settings into ``SQLALCHEMY_ENGINE_OPTIONS``
+    (anything already set there explicitly wins) and makes the pool class a
+    ``_TimedPool``. Every registered pool has its checkout wait timed and
+    its size, checked-out and overflow counts published as gauges on
+    ``/metrics``.
+
+    With ``REPORTING_POOL_ENABLED`` a second, small engine is created for
+    statements declared with ``bind="reporting"`` (the admin dashboard
+    scans), so those can queue among themselves without taking the
+    connections checkout and cart requests need.
+    """
+
+    def __init__(self, app=None):
+        self.reporting_enabled = False
+        self._reporting_options = None
+        self._reporting_uri = None
+        self._reporting_engine = None
+        self._reporting_session = None
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._collecting = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        uri = config.get("SQLALCHEMY_DATABASE_URI")
+        explicit = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+        options = engine_options(
+            uri,
+            config.get("DB_POOL_SIZE", 10),
+            config.get("DB_MAX_OVERFLOW", 20),
+            config.get("DB_POOL_TIMEOUT", 10),
+            config.get("DB_POOL_RECYCLE", 1800),
+            config.get("DB_POOL_PRE_PING", True),
+            config.get("DB_FAST_EXECUTEMANY", True),
+            config.get("DB_CONNECT_TIMEOUT"),
+        )
+        options.update(explicit)
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = timed_pool(uri, options)
+
+        self.reporting_enabled = config.get("REPORTING_POOL_ENABLED", False)
+        self._dispose_reporting()
+        if self.reporting_enabled:
+            self._reporting_uri = config.get("REPORTING_DATABASE_URL") or uri
+            self._reporting_options = engine_options(
+                self._reporting_uri,
+                config.get("REPORTING_POOL_SIZE", 2),
+                config.get("REPORTING_MAX_OVERFLOW", 0),
+                config.get("REPORTING_POOL_TIMEOUT", 5),
+                config.get("DB_POOL_RECYCLE", 1800),
+                config.get("DB_POOL_PRE_PING", True),
+                config.get("DB_FAST_EXECUTEMANY", True),
+                config.get("DB_CONNECT_TIMEOUT"),
+            )
+            if not config.get("REPORTING_DATABASE_URL"):
+                # Same database: keep explicit driver options such as a custom creator.
+                self._reporting_options.update({k: v for k, v in explicit.items() if k not in POOL_KEYS})
+            timed_pool(self._reporting_uri, self._reporting_options)
+            app.teardown_appcontext(self._remove_reporting_session)
+
+        if not self._collecting:
+            metrics.register_collector(self._collect)
+            self._collecting = True
+
+    # Engines and sessions
+
+    def register(self, name, engine):
+        """Time checkouts from ``engine``'s pool and include it in the stats."""
+        pool = engine.pool
+        with self._lock:
+            registered = self._stats.get(name)
+            if registered is not None and registered.engine is engine:
+                return
+            stats = self._stats[name] = _PoolStats(engine)
+        if not isinstance(pool, _TimedPool):
+            logger.warning(f"The {name} pool is a {type(pool).__name__}, its checkouts are not timed")
+            return
+        labels = (("pool", name),)
+
+        def on_checkout(waited, timed_out):
+            with self._lock:
+                stats.waits += 1
+                stats.wait_total += waited
+                stats.wait_max = max(stats.wait_max, waited)
+                stats.timeouts += timed_out
+            if metrics.enabled:
+                metrics.observe("db_pool_checkout_wait_seconds", waited, labels)
+                if timed_out:
+                    metrics.inc("db_pool_checkout_timeouts_total", labels)
+
+        pool.on_checkout = on_checkout
+
+    def reporting_engine(self):
+        if not self.reporting_enabled:
+            return None
+        with self._lock:
+            engine = self._reporting_engine
+        if engine is None:
+            engine = create_engine(self._reporting_uri, **self._reporting_options)
+            with self._lock:
+                if self._reporting_engine is not None:
+                    engine.dispose()
+                    return self._reporting_engine
+                self._reporting_engine = engine
+                self._reporting_session = db.create_scoped_session({"bind": engine})
+            self.register("reporting", engine)
+            logger.info(f"Reporting pool created with {self._reporting_options.get('pool_size', 'default')} connections")
+        return engine
+
+    def session_for(self, bind):
+        """The session statements declared with ``bind`` should run in."""
+        if bind == "reporting" and self.reporting_engine() is not None:
+            return self._reporting_session
+        return db.session
+
+    def _remove_reporting_session(self, exc):
+        if self._reporting_session is not None:
+            self._reporting_session.remove()
+
+    def _dispose_reporting(self):
+        with self._lock:
+            engine, self._reporting_engine = self._reporting_engine, None
+            self._reporting_session = None
+            self._stats.pop("reporting", None)
+        if engine is not None:
+            engine.dispose()
+
+    # Reading
+
+    def stats(self):
+        with self._lock:
+            pools = list(self._stats.items())
+        result = {}
+        for name, stats in pools:
+            pool = stats.engine.pool
+            result[name] = {
+                "pool": _pool_class_name(pool),
+                "size": _call(pool, "size"),
+                "checked_out": _call(pool, "checkedout"),
+                "checked_in": _call(pool, "checkedin"),
+                "overflow": max(_call(pool, "overflow") or 0, 0),
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "timeout_s": _call(pool, "timeout"),
+                "checkouts": stats.waits,
+                "timeouts": stats.timeouts,
+                "wait_mean_ms": round(stats.wait_total / stats.waits * 1000, 3) if stats.waits else 0.0,
+                "wait_max_ms": round(stats.wait_max * 1000, 3),
+            }
+        return result
+
+    def _collect(self):
+        for name, pool in self.stats().items():
+            labels = (("pool", name),)
+            for key in ("size", "checked_out", "overflow"):
+                if pool[key] is not None:
+                    yield f"db_pool_{key}", labels, pool[key]
+
+
+def _pool_class_name(pool):
+    """The pool class, without the ``_TimedPool`` wrapper."""
+    return next(cls.__name__ for cls in type(pool).__mro__ if not issubclass(cls, _TimedPool))
+
+
+def _call(pool, method):
+    fn = getattr(pool, method, None)
+    return fn() if fn is not None else None
+
+
+db_pools = DatabasePools()
@@ -1,3 +1,32 @@
-from flask_sqlalchemy import SQLAlchemy
+from flask import g, has_request_context
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import orm
 
-db = SQLAlchemy()
+
+class RoutingSession(SignallingSession):
+    """Session that sends the reads of ``read_only`` requests to the replica.
+
+    Flushes, and sessions created with an explicit ``bind`` (the reporting
+    pool), keep using their usual engine. Whether a request may read from
+    the replica is decided by the app's ``read_router``.
+    """
+
+    def __init__(self, db, autocommit=False, autoflush=True, **options):
+        self._route_reads = options.get("bind") is None
+        SignallingSession.__init__(self, db, autocommit=autocommit, autoflush=autoflush, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._route_reads and not self._flushing and has_request_context() and g.get("db_read_only"):
+            router = self.app.extensions.get("read_router")
+            engine = router.engine_for_request() if router is not None else None
+            if engine is not None:
+                return engine
+        return SignallingSession.get_bind(self, mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+db = RoutingSQLAlchemy()
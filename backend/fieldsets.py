@@ -0,0 +1,24 @@
+def requested_fields(value, available):
+    """The fields a ``?fields=a,b,c`` argument selects, in ``available`` order.
+
+    Returns None when the argument is missing or empty, meaning every field.
+    Raises ``ValueError`` naming anything that is not in ``available``.
+    """
+    if not value:
+        return None
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names.difference(available)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(available)}")
+    return tuple(field for field in available if field in names) or None
+
+
+def pick(row, fields, convert=None):
+    """The JSON object for ``row`` with only ``fields``.
+
+    ``convert`` maps a field to a function applied to its value, for the
+    Decimal, date and flag columns the endpoints format.
+    """
+    convert = convert or {}
+    return {field: convert[field](getattr(row, field)) if field in convert else getattr(row, field)
+            for field in fields}
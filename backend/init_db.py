@@ -1,11 +1,17 @@
+import argparse
+
 from backend import create_app
 from backend.extensions import db
 from backend.models.User import User
 from backend.models.Category import Category
 from backend.models.Product import Product
+from backend.models.Wishlist import Wishlist  # noqa: F401  (registers the wishlist table)
+from backend.scale_data import SCALES, generate_scale_data
 from werkzeug.security import generate_password_hash
 
-def init_db():
+SIZE_OPTIONS = ("categories", "users", "products", "orders", "order_details", "reviews", "wishlist")
+
+def init_db(scale=None, seed=42, batch_size=10_000, **sizes):
     app = create_app()
     
     with app.app_context():
@@ -26,17 +32,17 @@ def init_db():
         
         # Create categories
         categories = [
-            Category(category_name="Cakes", description="Delicious cakes for all occasions"),
-            Category(category_name="Cookies", description="Freshly baked cookies"),
-            Category(category_name="Pastries", description="Flaky and delicious pastries"),
-            Category(category_name="Breads", description="Freshly baked breads")
+            Category(category_name="Cakes", category_description="Delicious cakes for all occasions"),
+            Category(category_name="Cookies", category_description="Freshly baked cookies"),
+            Category(category_name="Pastries", category_description="Flaky and delicious pastries"),
+            Category(category_name="Breads", category_description="Freshly baked breads")
         ]
         
         # Create products
         products = [
             Product(
                 product_name="Chocolate Cake",
-                description="Rich chocolate cake with chocolate frosting",
+                product_description="Rich chocolate cake with chocolate frosting",
                 price=25.99,
                 stock=10,
                 image_url="/uploads/chocolate_cake.jpg",
@@ -45,7 +51,7 @@ def init_db():
             ),
             Product(
                 product_name="Vanilla Cake",
-                description="Light and fluffy vanilla cake with vanilla frosting",
+                product_description="Light and fluffy vanilla cake with vanilla frosting",
                 price=22.99,
                 stock=15,
                 image_url="/uploads/vanilla_cake.jpg",
@@ -54,7 +60,7 @@ def init_db():
             ),
             Product(
                 product_name="Chocolate Chip Cookies",
-                description="Classic chocolate chip cookies",
+                product_description="Classic chocolate chip cookies",
                 price=12.99,
                 stock=20,
                 image_url="/uploads/chocolate_chip_cookies.jpg",
@@ -63,7 +69,7 @@ def init_db():
             ),
             Product(
                 product_name="Croissant",
-                description="Flaky and buttery croissants",
+                product_description="Flaky and buttery croissants",
                 price=3.99,
                 stock=30,
                 image_url="/uploads/croissant.jpg",
@@ -72,7 +78,7 @@ def init_db():
             ),
             Product(
                 product_name="Sourdough Bread",
-                description="Artisanal sourdough bread",
+                product_description="Artisanal sourdough bread",
                 price=6.99,
                 stock=25,
                 image_url="/uploads/sourdough_bread.jpg",
@@ -91,5 +97,18 @@ def init_db():
         
         print("Database initialized with sample data!")
 
+        # Optional bulk data on top of the samples, for testing at real volumes
+        if scale:
+            generated = generate_scale_data(db.engine, scale, seed=seed, batch_size=batch_size, **sizes)
+            print(f"Generated {scale} scale data, rows inserted: {generated}")
+
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Recreate the database with sample data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="also generate synthetic data of this size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    for table in SIZE_OPTIONS:
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, help=f"override the number of {table}")
+    args = parser.parse_args()
+
+    init_db(args.scale, args.seed, args.batch_size, **{table: getattr(args, table) for table in SIZE_OPTIONS})
\ No newline at end of file
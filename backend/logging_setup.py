@@ -0,0 +1,126 @@
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from backend.metrics import metrics
+
+DEFAULT_LEVELS = {
+    "development": "DEBUG",
+    "testing": "INFO",
+    "production": "WARNING",
+}
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listeners = []
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue, listener=None):
+        super().__init__(log_queue)
+        self.listener = listener
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count_dropped("queue_full")
+
+
+class DebugSampler(logging.Filter):
+    """Rate-limits DEBUG records per call site.
+
+    Each ``logger.debug`` line may emit at most ``per_second`` records per
+    second; the rest are dropped before they are formatted or queued, and
+    counted in ``log_records_dropped_total``. Records at INFO and above
+    always pass.
+    """
+
+    def __init__(self, per_second):
+        super().__init__()
+        self.per_second = per_second
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.per_second <= 0:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = int(time.monotonic())
+        with self._lock:
+            window, count = self._windows.get(key, (now, 0))
+            if window != now:
+                window, count = now, 0
+            if count >= self.per_second:
+                _count_dropped("sampled")
+                return False
+            self._windows[key] = (window, count + 1)
+        return True
+
+
+def _count_dropped(reason):
+    if metrics.enabled:
+        metrics.inc("log_records_dropped_total", (("reason", reason),))
+
+
+def make_async_handler(handler, max_queue_size=10000):
+    """Wrap ``handler`` so records are written by a background thread."""
+    log_queue = queue.Queue(max_queue_size)
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return DroppingQueueHandler(log_queue, listener)
+
+
+def close_async_handler(queue_handler):
+    """Flush and stop the background writer behind ``queue_handler`` and close its handlers."""
+    listener = queue_handler.listener
+    if listener in _listeners:
+        _listeners.remove(listener)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def configure_logging(app):
+    """Install the process-wide logging pipeline for ``app``.
+
+    Every logger propagates to the root logger, whose only handler pushes
+    records onto a bounded queue; a ``QueueListener`` thread formats them and
+    writes them to stderr, so request threads never block on log I/O.
+    """
+    env = app.config.get("FLASK_ENV", "production")
+    level = app.config.get("LOG_LEVEL") or DEFAULT_LEVELS.get(env, "INFO")
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = make_async_handler(stream_handler, app.config.get("LOG_QUEUE_SIZE", 10000))
+    queue_handler.addFilter(DebugSampler(app.config.get("LOG_DEBUG_SAMPLE_PER_SECOND", 10)))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        if isinstance(handler, DroppingQueueHandler):
+            close_async_handler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # Library loggers stay quiet unless explicitly asked for
+    logging.getLogger("werkzeug").setLevel(max(root.level, logging.INFO))
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+
+
+def stop_logging():
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_logging)
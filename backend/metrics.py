@@ -0,0 +1,279 @@
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_requests_total": ("counter", "Requests handled, by endpoint and status code."),
+    "http_request_errors_total": ("counter", "Requests that ended in a 5xx or an unhandled exception."),
+    "http_requests_in_flight": ("gauge", "Requests currently being handled."),
+    "http_request_duration_seconds": ("histogram", "Request latency by endpoint."),
+    "db_pool_checkout_wait_seconds": ("histogram", "Time spent waiting for a pooled DB connection."),
+    "db_pool_checkout_timeouts_total": ("counter", "Checkouts that gave up after the pool timeout."),
+    "db_pool_size": ("gauge", "Connections the pool keeps open."),
+    "db_pool_checked_out": ("gauge", "Pooled connections currently in use."),
+    "db_pool_overflow": ("gauge", "Connections open beyond the pool size."),
+    "catalog_cache_requests_total": ("counter", "Catalog requests by cache outcome (hit, miss, not_modified)."),
+    "product_detail_cache_requests_total": ("counter", "Product detail lookups by cache outcome (hit, miss)."),
+    "log_records_dropped_total": ("counter", "Log records dropped: DEBUG lines sampled out, or the log queue was full."),
+}
+
+
+class _Shard:
+    __slots__ = ("counters", "gauges", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+
+class Metrics:
+    """Process-local metrics registry with a lock-free recording path.
+
+    Every thread records into its own shard, so ``inc``/``observe`` are plain
+    dict updates; shards are only merged when the metrics are read. The
+    shards of threads that have exited are folded into one retired shard
+    whenever a new thread starts recording or the metrics are read, so a
+    server that starts a thread per request keeps a shard per live thread
+    rather than one per request served. With
+    ``METRICS_DIR`` set, each process periodically writes its merged
+    snapshot to ``<METRICS_DIR>/metrics-<pid>.json`` and ``collect()``
+    aggregates every file in the directory, which is how multiple worker
+    processes end up on one ``/metrics`` page.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.directory = None
+        self.flush_interval = 5
+        self._local = threading.local()
+        self._shards = []  # (thread, shard) of every thread that has recorded
+        self._retired = _Shard()
+        self._shards_lock = threading.Lock()
+        self._collectors = []
+        self._last_flush = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("METRICS_ENABLED", True)
+        self.directory = app.config.get("METRICS_DIR")
+        self.flush_interval = app.config.get("METRICS_FLUSH_INTERVAL", 5)
+        if not self.enabled:
+            return
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # Recording
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._retire_exited()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_exited(self):
+        """Fold the shards of exited threads into ``_retired``; call with ``_shards_lock`` held."""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                _merge_shard(self._retired, shard)
+        self._shards = live
+
+    def inc(self, name, labels=(), amount=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def add_gauge(self, name, labels=(), amount=1):
+        gauges = self._shard().gauges
+        key = (name, labels)
+        gauges[key] = gauges.get(key, 0) + amount
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        hist = histograms.get(key)
+        if hist is None:
+            # bucket counts, then +Inf, sum and count
+            hist = histograms[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+        hist[bisect.bisect_left(buckets, value)] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        self.add_gauge("http_requests_in_flight", (("endpoint", request.endpoint or "unmatched"),))
+
+    def _after_request(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+
+        endpoint = request.endpoint or "unmatched"
+        status = 500 if exc is not None else g.pop("metrics_status", 500)
+        labels = (("endpoint", endpoint),)
+
+        self.observe("http_request_duration_seconds", time.perf_counter() - started, labels)
+        self.inc("http_requests_total", labels + (("status", str(status)),))
+        if status >= 500:
+            self.inc("http_request_errors_total", labels)
+        self.add_gauge("http_requests_in_flight", labels, -1)
+
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def register_collector(self, collector):
+        """Add ``collector()`` gauges, yielded as ``(name, labels, value)``, to every snapshot."""
+        self._collectors.append(collector)
+
+    # Reading
+
+    def snapshot(self):
+        total = _Shard()
+        with self._shards_lock:
+            self._retire_exited()
+            # The retired shard only changes under the lock
+            _merge_shard(total, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            _merge_shard(total, shard)
+        counters, gauges, histograms = total.counters, total.gauges, total.histograms
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                gauges[(name, labels)] = gauges.get((name, labels), 0) + value
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        snap = self.snapshot()
+        path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as fh:
+                json.dump({kind: _encode(values) for kind, values in snap.items()}, fh)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot {path}: {str(e)}")
+
+    def collect(self):
+        if not self.directory:
+            return self.snapshot()
+
+        self.flush()
+        total = {"counters": {}, "gauges": {}, "histograms": {}}
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path) as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+
+            alive = _pid_alive(path)
+            for key, value in _decode(data.get("counters", [])):
+                total["counters"][key] = total["counters"].get(key, 0) + value
+            if alive:
+                for key, value in _decode(data.get("gauges", [])):
+                    total["gauges"][key] = total["gauges"].get(key, 0) + value
+            for key, hist in _decode(data.get("histograms", [])):
+                _merge_histogram(total["histograms"], key, hist)
+        return total
+
+    def render_prometheus(self):
+        data = self.collect()
+        series = {}
+        for kind in ("counters", "gauges", "histograms"):
+            for (name, labels), value in data[kind].items():
+                series.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(series):
+            metric_type, help_text = HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in sorted(series[name]):
+                if metric_type == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), value[:-2]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {value[-2]}")
+                    lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge_shard(target, shard):
+    for key, value in shard.counters.copy().items():
+        target.counters[key] = target.counters.get(key, 0) + value
+    for key, value in shard.gauges.copy().items():
+        target.gauges[key] = target.gauges.get(key, 0) + value
+    for key, hist in shard.histograms.copy().items():
+        _merge_histogram(target.histograms, key, list(hist))
+
+
+def _merge_histogram(target, key, hist):
+    existing = target.get(key)
+    if existing is None:
+        target[key] = hist
+    else:
+        for i, value in enumerate(hist):
+            existing[i] += value
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _encode(values):
+    return [[name, [list(label) for label in labels], value] for (name, labels), value in values.items()]
+
+
+def _decode(items):
+    for name, labels, value in items:
+        yield (name, tuple(tuple(label) for label in labels)), value
+
+
+def _pid_alive(path):
+    try:
+        pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+        os.kill(pid, 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+metrics = Metrics()
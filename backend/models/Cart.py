@@ -9,6 +9,10 @@ class Cart(db.Model):
     created_date = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     is_checked_out = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        db.Index('ix_cart_user_id_is_checked_out', 'user_id', 'is_checked_out'),
+    )
+
     # Relationships
     user = db.relationship('User', backref='carts', lazy=True)
     cart_details = db.relationship('CartDetails', backref='cart', lazy=True)
\ No newline at end of file
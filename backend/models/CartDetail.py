@@ -16,6 +16,8 @@ class CartDetails(db.Model):
     __table_args__ = (
         db.CheckConstraint('quantity > 0', name='check_quantity_positive'),
         db.UniqueConstraint('cart_id', 'product_id', name='UQ_Cart_Product'),
+        db.Index('ix_cart_details_cart_id', 'cart_id',
+                 mssql_include=['product_id', 'quantity', 'price', 'discount']),
     )
 
     # Relationships
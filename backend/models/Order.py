@@ -14,6 +14,8 @@ class Order(db.Model):
     # CHECK constraint for status
     __table_args__ = (
         db.CheckConstraint("status IN ('Pending', 'Shipped', 'Delivered')", name='check_status'),
+        db.Index('ix_orders_user_id_order_date', 'user_id', 'order_date',
+                 mssql_include=['total_amount', 'status']),
     )
     
     # Relationships
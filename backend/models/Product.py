@@ -14,6 +14,13 @@ class Product(db.Model):
     discount = db.Column(db.Float, nullable=False, default=0)
     is_active = db.Column(db.Boolean, nullable=False, default=True)
     # Removed created_at and updated_at as they don't exist in the database
+
+    __table_args__ = (
+        db.Index('ix_products_product_name', 'product_name'),
+        db.Index('ix_products_price', 'price'),
+        db.Index('ix_products_category_id_is_active_price', 'category_id', 'is_active', 'price'),
+        db.Index('ix_products_category_id_is_active_product_name', 'category_id', 'is_active', 'product_name'),
+    )
     
     # Relationships
     category = db.relationship('Category', backref=db.backref('products', lazy=True))
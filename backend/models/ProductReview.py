@@ -14,6 +14,8 @@ class ProductReview(db.Model):
    # CHECK constraint for rating
     __table_args__ = (
         db.CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating'),
+        db.Index('ix_product_reviews_product_id_review_date', 'product_id', 'review_date',
+                 mssql_include=['user_id', 'rating']),
     )
     
     # Relationships
@@ -6,4 +6,5 @@ from .OrderDetail import OrderDetail
 from .Payment import Payment
 from .Product import Product
 from .ProductReview import ProductReview
+from .RevokedToken import RevokedToken
 from .User import User
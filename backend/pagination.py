@@ -0,0 +1,26 @@
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """Opaque, URL-safe token for a keyset position (sort name, key, id, ...).
+
+    Values that JSON cannot hold exactly, such as ``Decimal`` prices, are
+    stored as strings; the caller converts them back after decoding.
+    """
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor, length):
+    """The ``length`` values ``encode_cursor`` packed into ``cursor``.
+
+    Raises ``ValueError`` for anything that is not such a token.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,83 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated and the call should be shed."""
+
+
+class PasswordHasher:
+    """Runs PBKDF2 hashing on a bounded thread pool.
+
+    hashlib releases the GIL while it hashes, so the pool gives real
+    parallelism, and limiting in-flight hashes keeps a login burst from
+    taking every CPU away from cart and catalog requests. Callers that cannot
+    get a slot within ``PASSWORD_HASH_QUEUE_TIMEOUT`` seconds get
+    ``PasswordHasherBusy`` and should answer 503.
+    """
+
+    def __init__(self, app=None):
+        self.method = "pbkdf2:sha256"
+        self.workers = 1
+        self.max_pending = 1
+        self.queue_timeout = 0
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256")
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 1
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING") or self.workers * 4
+        self.queue_timeout = app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 0.5)
+        self.shutdown()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split("$", 1)[0] != self._normalized_method()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _normalized_method(self):
+        if self.method.startswith("pbkdf2:") and self.method.count(":") == 1:
+            return f"{self.method}:{DEFAULT_PBKDF2_ITERATIONS}"
+        return self.method
+
+    def _get_executor(self):
+        # Created on first use so pre-forking servers don't copy pool threads
+        # into their workers.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("Password hashing pool is saturated")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+
+password_hasher = PasswordHasher()
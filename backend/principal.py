@@ -0,0 +1,56 @@
+from backend.models.User import User
+
+
+class Principal:
+    """Immutable identity of the caller, handed to ``token_required`` handlers.
+
+    Carries only what the hot-path handlers read (``id``, ``username`` and
+    ``user_role``). Handlers that need the full ORM row, e.g. to change and
+    commit it, call ``to_user()``.
+    """
+
+    __slots__ = ("id", "username", "user_role")
+
+    def __init__(self, id, username, user_role):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "username", username)
+        object.__setattr__(self, "user_role", user_role)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row[0], row[1], row[2])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Principal is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Principal is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Principal):
+            return NotImplemented
+        return (self.id, self.username, self.user_role) == (other.id, other.username, other.user_role)
+
+    def __hash__(self):
+        return hash((self.id, self.username, self.user_role))
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.username} ({self.user_role})>"
+
+    @property
+    def is_admin(self):
+        return self.user_role.lower() == "admin"
+
+    def to_user(self):
+        # Query.get() checks the session identity map first, so repeated
+        # calls within one request only hit the database once.
+        return User.query.get(self.id)
+
+
+def load_principal(session, user_id):
+    row = (
+        session.query(User.id, User.username, User.user_role)
+        .filter(User.id == user_id)
+        .first()
+    )
+    return Principal.from_row(row) if row else None
@@ -0,0 +1,213 @@
+from collections import namedtuple
+
+import numpy as np
+
+from backend.statements import PRODUCT_PAGE_FIELDS, PRODUCT_SORTS
+
+# The columns filters, facets and pages are computed on, by the field they hold
+COLUMN_TYPES = {
+    "id": np.int64,
+    "price": np.float64,
+    "discount": np.float64,
+    "stock": np.int64,
+    "category_id": np.int64,
+    "product_name": object,
+}
+
+# Sorts compare these fields through a key, as the database collation does
+SORT_KEYS = {
+    "product_name": str.casefold,  # SQL Server collations are case-insensitive
+}
+
+Product = namedtuple("Product", PRODUCT_PAGE_FIELDS)
+
+
+def product_record(row):
+    """The listed fields of a ``GetAllProducts`` row, with JSON-ready numbers."""
+    values = {field: getattr(row, field) for field in PRODUCT_PAGE_FIELDS}
+    values["price"] = float(values["price"])
+    values["discount"] = float(values["discount"] or 0)
+    values["stock"] = values["stock"] or 0
+    return Product(**values)
+
+
+class ProductColumns:
+    """The active catalogue as NumPy columns, one position per product, in id order.
+
+    ``products`` holds the record each position lists, and ``columns`` the
+    arrays filters run on, so a filter is a vectorized mask over whole
+    columns and the id index is a binary search of the sorted ``id`` column.
+    A ``ProductColumns`` never changes once built: ``replace`` returns a new
+    one, so readers can keep using the one they hold while a product is
+    updated.
+    """
+
+    def __init__(self, products, columns, categories):
+        self.products = products
+        self.columns = columns
+        self.categories = categories  # category id -> name
+        self._orders = {}
+        self._sort_columns = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        products = sorted((product_record(row) for row in rows), key=lambda product: product.id)
+        columns = {field: np.array([getattr(product, field) for product in products], dtype=dtype)
+                   for field, dtype in COLUMN_TYPES.items()}
+        categories = {product.category_id: product.category_name for product in products}
+        return cls(products, columns, categories)
+
+    def __len__(self):
+        return len(self.products)
+
+    def position(self, product_id):
+        """Where ``product_id`` is, or None when it is not in the catalogue."""
+        position = int(np.searchsorted(self.columns["id"], product_id))
+        if position < len(self.products) and self.products[position].id == product_id:
+            return position
+        return None
+
+    def replace(self, product_id, row):
+        """A copy with ``product_id`` taken from ``row``, or dropped when ``row`` is None."""
+        position = self.position(product_id)
+        products = list(self.products)
+        categories = dict(self.categories)
+        if row is None:
+            if position is None:
+                return self
+            del products[position]
+            columns = {field: np.delete(column, position) for field, column in self.columns.items()}
+            return ProductColumns(products, columns, categories)
+
+        product = product_record(row)
+        categories[product.category_id] = product.category_name
+        if position is None:
+            position = int(np.searchsorted(self.columns["id"], product_id))
+            products.insert(position, product)
+            columns = {field: np.insert(column, position, np.array(getattr(product, field), dtype=column.dtype))
+                       for field, column in self.columns.items()}
+        else:
+            products[position] = product
+            columns = {field: column.copy() for field, column in self.columns.items()}
+            for field, column in columns.items():
+                column[position] = getattr(product, field)
+        return ProductColumns(products, columns, categories)
+
+    def page(self, filters, sort, after, limit):
+        """Up to ``limit`` products matching ``filters`` in ``sort`` order.
+
+        ``after`` is the ``(key, id)`` of the last product of the previous
+        page, as the keyset cursor of ``GET /products`` holds it.
+        """
+        mask = self._combine(self._masks(**filters))
+        if after is not None:
+            mask &= self._beyond(sort, *after)
+        order = self._order(sort)
+        return [self.products[position] for position in order[mask[order]][:limit]]
+
+    def matching(self, filters):
+        """Every product matching ``filters``, in id order."""
+        return [self.products[position] for position in np.flatnonzero(self._combine(self._masks(**filters)))]
+
+    def facets(self, filters, buckets):
+        """How many products match ``filters``, and the counts each facet offers.
+
+        Each facet is counted with every filter but its own, so the counts
+        say how many products picking a value would show.
+        """
+        masks = self._masks(**filters)
+        columns = self.columns
+
+        categories, counts = np.unique(columns["category_id"][self._combine(masks, "category_id")],
+                                       return_counts=True)
+        by_category = sorted(
+            ({"category_id": int(category_id), "category_name": self.categories.get(int(category_id)),
+              "count": int(count)} for category_id, count in zip(categories, counts)),
+            key=lambda facet: (-facet["count"], facet["category_id"]),
+        )
+
+        return {
+            "total": int(self._combine(masks).sum()),
+            "facets": {
+                "category": by_category,
+                "discounted": _flag_counts(columns["discount"] > 0, self._combine(masks, "discounted")),
+                "in_stock": _flag_counts(columns["stock"] > 0, self._combine(masks, "in_stock")),
+                "price": _histogram(columns["price"][self._combine(masks, "price")], buckets),
+            },
+        }
+
+    def _masks(self, category_id=None, min_price=None, max_price=None, discounted=None, in_stock=None):
+        columns = self.columns
+        masks = {}
+        if category_id is not None:
+            masks["category_id"] = columns["category_id"] == category_id
+        if min_price is not None or max_price is not None:
+            price = columns["price"]
+            masks["price"] = np.ones(len(self), dtype=bool)
+            if min_price is not None:
+                masks["price"] &= price >= min_price
+            if max_price is not None:
+                masks["price"] &= price <= max_price
+        if discounted is not None:
+            masks["discounted"] = (columns["discount"] > 0) == discounted
+        if in_stock is not None:
+            masks["in_stock"] = (columns["stock"] > 0) == in_stock
+        return masks
+
+    def _combine(self, masks, skip=None):
+        mask = np.ones(len(self), dtype=bool)
+        for name, facet_mask in masks.items():
+            if name != skip:
+                mask &= facet_mask
+        return mask
+
+    def _beyond(self, sort, key, after_id):
+        _, descending, field = PRODUCT_SORTS[sort]
+        ids = self.columns["id"]
+        if field is None:
+            return ids < after_id if descending else ids > after_id
+        values = self._sort_column(field)
+        if field in SORT_KEYS:
+            key = SORT_KEYS[field](key)
+        if descending:
+            return (values < key) | ((values == key) & (ids < after_id))
+        return (values > key) | ((values == key) & (ids > after_id))
+
+    def _order(self, sort):
+        """Every position in ``sort`` order, ties broken on the id like the SQL pages."""
+        order = self._orders.get(sort)
+        if order is None:
+            _, descending, field = PRODUCT_SORTS[sort]
+            # Positions are in id order already, so a stable sort on the key breaks ties on the id
+            order = np.argsort(self._sort_column(field or "id"), kind="stable")
+            if descending:
+                order = order[::-1]
+            self._orders[sort] = order
+        return order
+
+
+    def _sort_column(self, field):
+        """The column ``field`` sorts on, through its ``SORT_KEYS`` key if it has one."""
+        if field not in SORT_KEYS:
+            return self.columns[field]
+        column = self._sort_columns.get(field)
+        if column is None:
+            key = SORT_KEYS[field]
+            column = self._sort_columns[field] = np.array([key(value) for value in self.columns[field]], dtype=object)
+        return column
+
+
+def _flag_counts(flag, mask):
+    return {"true": int((flag & mask).sum()), "false": int((~flag & mask).sum())}
+
+
+def _histogram(prices, buckets):
+    if not len(prices):
+        return {"min": None, "max": None, "buckets": []}
+    counts, edges = np.histogram(prices, bins=buckets)
+    return {
+        "min": float(prices.min()),
+        "max": float(prices.max()),
+        "buckets": [{"from": round(float(low), 2), "to": round(float(high), 2), "count": int(count)}
+                    for low, high, count in zip(edges[:-1], edges[1:], counts)],
+    }
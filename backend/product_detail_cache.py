@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+from backend.metrics import metrics
+
+
+class ProductDetailCache:
+    """Per-process LRU/TTL cache of the product-level part of ``GET /product/<name>``.
+
+    Entries are keyed by ``key(product_name, page, per_page)`` and hold the
+    formatted product (with its rating summary) and that page of reviews,
+    everything the detail page shows except the caller's ``can_review``
+    flag, which the route still checks per request. The review routes
+    ``invalidate`` their product after they commit and the admin product
+    routes ``clear`` the cache; like ``CatalogCache`` a generation counter
+    stops a request that read the rows before such a change from storing
+    them afterwards.
+
+    Other workers, the stock that orders take and reviewers renaming
+    themselves catch up once entries reach ``PRODUCT_DETAIL_CACHE_TTL``.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 0
+        self.maxsize = 0
+        self.version = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("PRODUCT_DETAIL_CACHE_TTL", 30)
+        self.maxsize = app.config.get("PRODUCT_DETAIL_CACHE_SIZE", 1024)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.maxsize > 0
+
+    @staticmethod
+    def key(product_name, page, per_page):
+        """The entry key for one page of a product, however its name was cased."""
+        return (_name(product_name), page, per_page)
+
+    def get(self, key):
+        """The cached ``(product, reviews)`` for ``key``, or None."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                _count("miss")
+                return None
+            self._entries.move_to_end(key)
+        _count("hit")
+        return entry[0]
+
+    def put(self, key, version, value):
+        """Store ``value``, read while the cache was at ``version``."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, product_name):
+        """Drop every page of one product after its reviews changed."""
+        with self._lock:
+            self.version += 1
+            name = _name(product_name)
+            for key in [key for key in self._entries if key[0] == name]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _name(product_name):
+    # SQL Server matches the name case-insensitively and ignoring trailing spaces
+    return product_name.rstrip(" ").casefold()
+
+
+def _count(result):
+    if metrics.enabled:
+        metrics.inc("product_detail_cache_requests_total", (("result", result),))
+
+
+product_detail_cache = ProductDetailCache()
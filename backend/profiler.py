@@ -0,0 +1,157 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import threading
+import uuid
+from datetime import datetime
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_FLAG = b"_profile="
+PROFILE_NAME_RE = re.compile(r"^[\w.-]+\.pstats$")
+
+
+class RequestProfiler:
+    """Runs a single request under cProfile when an admin asks for it.
+
+    A request is profiled when it carries ``X-Profile: 1`` or ``?_profile=1``
+    and an admin token. The stats are written to ``PROFILE_DIR`` and the file
+    name is returned in the ``X-Profile-Id`` response header. Requests
+    without the flag only pay for a header lookup and a substring check.
+
+    Only one request per process is profiled at a time (Python 3.12 refuses
+    to enable a second profiler); a request asking while another is being
+    profiled runs unprofiled and says so in ``X-Profile-Skipped``.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.directory = None
+        self.max_files = 200
+        self._active = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("PROFILING_ENABLED", True)
+        self.directory = app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+        self.max_files = app.config.get("PROFILE_MAX_FILES", 200)
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _requested(self):
+        if request.headers.get(PROFILE_HEADER) == "1":
+            return True
+        return PROFILE_QUERY_FLAG in request.query_string and request.args.get("_profile") == "1"
+
+    def _before_request(self):
+        if not self._requested():
+            return None
+
+        # Imported here because the admin routes import this module
+        from backend.routes.auth import authenticate_request
+
+        current_user, error = authenticate_request()
+        if error is not None or current_user.user_role.lower() != "admin":
+            logger.warning("Ignoring profiling request without an admin token")
+            return None
+
+        if not self._active.acquire(blocking=False):
+            logger.info(f"Not profiling {request.method} {request.path}: another request is being profiled")
+            g.request_profile_skipped = True
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (not one of ours) is already running
+            self._active.release()
+            logger.warning(f"Not profiling {request.method} {request.path}: {str(e)}")
+            g.request_profile_skipped = True
+            return None
+        g.request_profile = profile
+        return None
+
+    def _after_request(self, response):
+        if g.pop("request_profile_skipped", False):
+            response.headers["X-Profile-Skipped"] = "busy"
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return response
+
+        profile.disable()
+        self._active.release()
+        try:
+            name = self._save(profile)
+            response.headers["X-Profile-Id"] = name
+        except OSError as e:
+            logger.error(f"Could not save request profile: {str(e)}")
+        return response
+
+    def _teardown_request(self, exc):
+        # The request failed before after_request could stop the profiler
+        profile = g.pop("request_profile", None)
+        if profile is not None:
+            profile.disable()
+            self._active.release()
+
+    def _save(self, profile):
+        os.makedirs(self.directory, exist_ok=True)
+        endpoint = (request.endpoint or "unmatched").replace(".", "-")
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S}_{endpoint}_{uuid.uuid4().hex[:8]}.pstats"
+        profile.dump_stats(os.path.join(self.directory, name))
+        logger.info(f"Saved profile {name} for {request.method} {request.path}")
+        self._prune()
+        return name
+
+    def _prune(self):
+        profiles = self.list_profiles()
+        for entry in profiles[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, entry["name"]))
+            except OSError:
+                pass
+
+    def list_profiles(self):
+        """Saved profiles, newest first."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not PROFILE_NAME_RE.match(name):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            profiles.append({
+                "name": name,
+                "size": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+            })
+        profiles.sort(key=lambda entry: entry["name"], reverse=True)
+        return profiles
+
+    def path_for(self, name):
+        if not PROFILE_NAME_RE.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def render_text(self, name, sort="cumulative", limit=50):
+        stream = io.StringIO()
+        stats = pstats.Stats(self.path_for(name), stream=stream)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+request_profiler = RequestProfiler()
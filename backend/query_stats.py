@@ -0,0 +1,96 @@
+import logging
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_listening = False
+
+
+class RequestQueryStats:
+    """SQL statements and database time accumulated by one request."""
+
+    __slots__ = ("started", "count", "db_time", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        self.statements[statement] += 1
+
+
+def current_stats():
+    if has_request_context():
+        return g.get("query_stats")
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def init_app(app):
+    """Count statements per request and report them in ``Server-Timing``.
+
+    Listeners are attached to the ``Engine`` class, so every engine and
+    bind the app creates is covered.
+    """
+    global _listening
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+    budget = app.config.get("QUERY_BUDGET", 8)
+    repeat_threshold = app.config.get("QUERY_REPEAT_THRESHOLD", 3)
+    server_timing = app.config.get("SERVER_TIMING_ENABLED", True)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = RequestQueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_time * 1000
+
+        if server_timing:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={db_ms:.2f}, app;dur={total_ms - db_ms:.2f}, queries;desc="{stats.count}"',
+            )
+
+        if budget and stats.count > budget:
+            logger.warning(
+                f"{request.endpoint} made {stats.count} queries (budget {budget}, db {db_ms:.1f}ms)"
+            )
+
+        if repeat_threshold:
+            for statement, times in stats.statements.items():
+                if times >= repeat_threshold:
+                    logger.warning(
+                        f"Possible N+1 in {request.endpoint}: statement ran {times} times: "
+                        f"{' '.join(statement.split())[:200]}"
+                    )
+
+        return response
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from functools import wraps
+
+from flask import g
+from sqlalchemy import create_engine
+
+from backend.db_pool import db_pools, engine_options, timed_pool
+
+logger = logging.getLogger(__name__)
+
+
+class ReadRouter:
+    """Sends the queries of ``read_only`` endpoints to a replica database.
+
+    Disabled unless ``REPLICA_DATABASE_URL`` is set. The replica engine uses
+    the ``DB_*`` pool settings, with ``REPLICA_ENGINE_OPTIONS`` applied on
+    top, and shows up as the ``replica`` pool in the pool stats.
+
+    A user who just wrote through a ``pins_reads`` endpoint (cart changes,
+    checkout, reviews) is pinned to the primary for
+    ``READ_YOUR_WRITES_SECONDS``, so their own order, cart or review is never
+    read from a replica that has not caught up yet. Pins are kept per process: size the window for the replication
+    lag plus the time a client takes to come back to the same worker.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.pin_seconds = 5
+        self._uri = None
+        self._options = None
+        self._engine = None
+        self._pins = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self._uri = config.get("REPLICA_DATABASE_URL")
+        self.enabled = bool(self._uri)
+        self.pin_seconds = config.get("READ_YOUR_WRITES_SECONDS", 5)
+        self._dispose()
+        with self._lock:
+            self._pins = {}
+        app.extensions["read_router"] = self
+        if not self.enabled:
+            return
+
+        self._options = engine_options(
+            self._uri,
+            config.get("DB_POOL_SIZE", 10),
+            config.get("DB_MAX_OVERFLOW", 20),
+            config.get("DB_POOL_TIMEOUT", 10),
+            config.get("DB_POOL_RECYCLE", 1800),
+            config.get("DB_POOL_PRE_PING", True),
+            config.get("DB_FAST_EXECUTEMANY", True),
+            config.get("DB_CONNECT_TIMEOUT"),
+        )
+        self._options.update(config.get("REPLICA_ENGINE_OPTIONS") or {})
+        timed_pool(self._uri, self._options)
+
+    def replica_engine(self):
+        if not self.enabled:
+            return None
+        engine = self._engine
+        if engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = create_engine(self._uri, **self._options)
+                    db_pools.register("replica", self._engine)
+                    logger.info("Replica engine created")
+                engine = self._engine
+        return engine
+
+    def engine_for_request(self):
+        """The replica engine, or None when this request must use the primary."""
+        if not self.enabled:
+            return None
+        user = g.get("current_user")
+        if user is not None and self.is_pinned(user.id):
+            return None
+        return self.replica_engine()
+
+    def pin(self, user_id):
+        if not self.enabled or user_id is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._pins) > 10000:
+                self._pins = {uid: until for uid, until in self._pins.items() if until > now}
+            self._pins[user_id] = now + self.pin_seconds
+
+    def is_pinned(self, user_id):
+        until = self._pins.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def _dispose(self):
+        with self._lock:
+            engine, self._engine = self._engine, None
+        if engine is not None:
+            engine.dispose()
+
+
+def read_only(f):
+    """Let the endpoint's queries go to the replica."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+def pins_reads(f):
+    """Pin the calling user to the primary after a successful write."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        response = f(*args, **kwargs)
+        user = g.get("current_user")
+        if user is not None and _status(response) < 400:
+            read_router.pin(user.id)
+        return response
+
+    return decorated
+
+
+def _status(response):
+    if isinstance(response, tuple):
+        return response[1] if len(response) > 1 and isinstance(response[1], int) else 200
+    return getattr(response, "status_code", 200)
+
+
+read_router = ReadRouter()
@@ -0,0 +1,106 @@
+import calendar
+import datetime
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.extensions import db
+from backend.models.RevokedToken import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """In-process mirror of the ``revoked_tokens`` table.
+
+    ``is_revoked`` is a set lookup. The mirror is refreshed incrementally
+    at most once every ``TOKEN_REVOCATION_REFRESH_SECONDS``, so a token
+    revoked in another worker is rejected here within that interval without
+    a query per request. Entries are forgotten once the token they revoke
+    has expired.
+
+    Each refresh re-reads every row revoked since the previous refresh
+    started, less ``TOKEN_REVOCATION_OVERLAP_SECONDS``. Ids are not a safe
+    high-water mark, because a lower id can commit after a higher one has
+    been read; the overlap covers rows that commit late and clock skew
+    between the workers stamping ``revoked_at``. When the database cannot
+    be read, the set already loaded keeps being used.
+    """
+
+    def __init__(self, app=None):
+        self.refresh_interval = 5
+        self.overlap = 60
+        self._revoked = {}
+        self._since = None
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get("TOKEN_REVOCATION_REFRESH_SECONDS", 5)
+        self.overlap = app.config.get("TOKEN_REVOCATION_OVERLAP_SECONDS", 60)
+        with self._lock:
+            self._revoked = {}
+            self._since = None
+            self._last_refresh = 0.0
+
+    def is_revoked(self, jti):
+        if jti is None:
+            return False
+        if time.monotonic() - self._last_refresh >= self.refresh_interval:
+            self.refresh()
+        return jti in self._revoked
+
+    def revoke(self, jti, user_id, expires_at):
+        """Persist a revocation and apply it locally right away.
+
+        ``expires_at`` is the token's ``exp`` claim (seconds since the epoch).
+        """
+        expires = datetime.datetime.utcfromtimestamp(expires_at)
+        now = datetime.datetime.utcnow()
+
+        RevokedToken.query.filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+        if RevokedToken.query.filter_by(jti=jti).first() is None:
+            db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires))
+        db.session.commit()
+
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def refresh(self):
+        # Only one thread refreshes; the others keep using the current set.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            started = datetime.datetime.utcnow()
+            query = db.session.query(RevokedToken.jti, RevokedToken.expires_at)
+            if self._since is not None:
+                query = query.filter(RevokedToken.revoked_at >= self._since)
+            try:
+                rows = query.all()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.error(f"Error refreshing the token revocation list, keeping {len(self._revoked)} entries: {str(e)}")
+                self._last_refresh = time.monotonic()
+                return
+
+            now = time.time()
+            revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            for jti, expires in rows:
+                exp = calendar.timegm(expires.timetuple())
+                if exp > now:
+                    revoked[jti] = exp
+            self._revoked = revoked
+            self._since = started - datetime.timedelta(seconds=self.overlap)
+            self._last_refresh = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+revocation_list = RevocationList()
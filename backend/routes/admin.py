@@ -1,12 +1,8 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_wtf import FlaskForm
-from wtforms import StringField, FloatField, IntegerField
-from wtforms.validators import DataRequired, NumberRange
+from flask import Blueprint, request, jsonify, current_app, send_file, Response
 from datetime import datetime
 # from sqlalchemy.exc import SQLAlchemyError
 import uuid
 import os
-from werkzeug.security import generate_password_hash
 from werkzeug.utils import secure_filename
 import logging
 from sqlalchemy import text
@@ -16,6 +12,36 @@ from backend.models.Product import Product
 from backend.models.Category import Category
 from backend.models.User import User
 from backend.extensions import db
+from backend.auth_cache import auth_cache
+from backend.catalog_cache import catalog_cache
+from backend.catalog_columns import catalog_columns
+from backend.product_detail_cache import product_detail_cache
+from backend.db_pool import db_pools
+from backend.fieldsets import pick, requested_fields
+from backend.passwords import password_hasher, PasswordHasherBusy
+from backend.profiler import request_profiler
+from backend.read_routing import read_only
+from backend.search_index import search_index
+from backend.slow_queries import slow_query_log
+from backend.statements import (
+    ADD_NEW_PRODUCT,
+    ADMIN_PRODUCTS,
+    ADMIN_USERS,
+    ALL_USERS,
+    COUNT_PRODUCTS,
+    COUNT_USERS,
+    DELETE_USER,
+    ORDER_STATS,
+    PING,
+    PRODUCT_BY_ID,
+    PRODUCT_BY_NAME,
+    PRODUCT_NAME,
+    PRODUCTS_TABLE_EXISTS,
+    RECENT_ORDERS,
+    SET_PRODUCT_VISIBILITY,
+    UPDATE_PRODUCT,
+    USER_NAME,
+)
 from backend.routes.auth import token_required
 
 # Setup logging
@@ -27,59 +53,6 @@ admin_bp = Blueprint('admin', __name__)
 def check_admin(user):
     return user.user_role.lower() == 'admin'
 
-class AddProductForm(FlaskForm):
-    class Meta:
-        csrf = False  
-
-    product_name = StringField("Product Name", validators=[DataRequired()])
-    description = StringField("Description")
-    price = FloatField(
-        "Price",
-        validators=[
-            DataRequired(),
-            NumberRange(min=0.01, message="Price must be greater than 0"),
-        ],
-    )
-    stock = IntegerField(
-        "Stock",
-        validators=[
-            DataRequired(),
-            NumberRange(min=0, message="Stock cannot be negative"),
-        ],
-    )
-    category_id = IntegerField("Category ID", validators=[DataRequired()])
-    image_url = StringField("Image URL")
-    discount = FloatField(
-        "Discount",
-        validators=[
-            NumberRange(min=0, max=100, message="Discount must be between 0 and 100"),
-        ],
-    )
-
-class UpdatePriceForm(FlaskForm):
-    class Meta:
-        csrf = False
-
-    new_price = FloatField(
-        "New Price",
-        validators=[
-            DataRequired(),
-            NumberRange(min=0.01, message="Price must be greater than 0"),
-        ],
-    )
-
-class UpdateDiscountForm(FlaskForm):
-    class Meta:
-        csrf = False
-
-    new_discount = FloatField(
-        "New Discount",
-        validators=[
-            DataRequired(),
-            NumberRange(min=0, max=100, message="Discount must be between 0 and 100"),
-        ],
-    )
-
 @admin_bp.route("/admin/upload-image", methods=["POST"])
 @token_required
 def upload_image(current_user):
@@ -222,6 +195,7 @@ def upload_product_image(current_user):
 
 @admin_bp.route("/admin", methods=["GET"])
 @token_required
+@read_only
 def admin_dashboard(current_user):
     if not check_admin(current_user):
         logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
@@ -229,30 +203,18 @@ def admin_dashboard(current_user):
     
     try:
         # Get product count
-        product_count_query = text("SELECT COUNT(*) FROM products")
-        product_count = db.session.execute(product_count_query).scalar() or 0
+        product_count = COUNT_PRODUCTS.scalar() or 0
         
         # Get user count
-        user_count_query = text("SELECT COUNT(*) FROM users")
-        user_count = db.session.execute(user_count_query).scalar() or 0
+        user_count = COUNT_USERS.scalar() or 0
         
         # Get order count and total revenue
-        order_stats_query = text("""
-            SELECT COUNT(*) as order_count, COALESCE(SUM(total_amount), 0) as total_revenue 
-            FROM orders
-        """)
-        order_stats = db.session.execute(order_stats_query).fetchone()
+        order_stats = ORDER_STATS.first()
         order_count = order_stats.order_count if order_stats else 0
         total_revenue = float(order_stats.total_revenue) if order_stats and order_stats.total_revenue else 0
         
         # Get recent activity (last 5 orders) - using TOP instead of LIMIT for SQL Server
-        recent_activity_query = text("""
-            SELECT TOP 5 o.id, o.user_id, u.username, o.order_date, o.total_amount, o.status
-            FROM orders o
-            JOIN users u ON o.user_id = u.id
-            ORDER BY o.order_date DESC
-        """)
-        recent_activity_result = db.session.execute(recent_activity_query).fetchall()
+        recent_activity_result = RECENT_ORDERS.all()
         
         recent_activity = []
         for row in recent_activity_result:
@@ -283,6 +245,13 @@ def admin_dashboard(current_user):
         logger.error(traceback.format_exc())
         return jsonify({"message": f"Error: {str(e)}"}), 500
 ############################################################################################################################################
+ADMIN_PRODUCT_CONVERT = {
+    "price": lambda value: float(value) if value is not None else 0.0,
+    "stock": lambda value: value if value is not None else 0,
+    "is_active": bool,
+    "discount": lambda value: float(value) if value is not None else 0.0,
+}
+
 @admin_bp.route("/admin/products", methods=["GET"])
 @token_required
 def admin_get_products(current_user):
@@ -292,21 +261,21 @@ def admin_get_products(current_user):
         logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
         return jsonify({"message": "Unauthorized access"}), 403
     
+    # Sparse fieldset: only the columns the client asked for
+    try:
+        fields = requested_fields(request.args.get("fields"), tuple(ADMIN_PRODUCTS.columns))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
     try:
         # First, check if we can execute a simple query
         logger.info("Testing database connection")
-        test_query = text("SELECT 1")
-        db.session.execute(test_query)
+        PING.execute()
         logger.info("Database connection successful")
         
         # Now check if the products table exists - use SQL Server syntax
         logger.info("Checking if products table exists")
-        table_check_query = text("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_TYPE = 'BASE TABLE' AND TABLE_NAME = 'products'
-        """)
-        table_exists = db.session.execute(table_check_query).fetchone()
+        table_exists = PRODUCTS_TABLE_EXISTS.first()
         
         if not table_exists:
             logger.error("Products table does not exist")
@@ -318,31 +287,13 @@ def admin_get_products(current_user):
         logger.info("Products table exists, proceeding with query")
         
         # Continue with the original query...
-        products_query = text("""
-            SELECT p.*, c.category_name 
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            ORDER BY p.id DESC""")
-        
-        products_result = db.session.execute(products_query).fetchall()
+        products_result = ADMIN_PRODUCTS(fields).all()
         logger.info(f"Found {len(products_result) if products_result else 0} products")
         
         products = []
         for row in products_result:
             try:
-                logger.debug(f"Processing product row: {row}")
-                product = {
-                    "id": row.id,
-                    "product_name": row.product_name,
-                    "description": row.product_description,
-                    "price": float(row.price) if row.price is not None else 0.0,
-                    "stock": row.stock if row.stock is not None else 0,
-                    "category_id": row.category_id,
-                    "category_name": row.category_name,
-                    "image_url": row.image_url,
-                    "is_active": bool(row.is_active) if hasattr(row, 'is_active') else True,
-                    "discount": float(row.discount) if hasattr(row, 'discount') and row.discount is not None else 0.0
-                }
+                product = pick(row, fields or tuple(ADMIN_PRODUCTS.columns), ADMIN_PRODUCT_CONVERT)
                 products.append(product)
             except Exception as row_error:
                 logger.error(f"Error processing product row: {str(row_error)}")
@@ -372,17 +323,25 @@ def admin_get_users(current_user):
         logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
         return jsonify({"message": "Unauthorized access"}), 403
     
+    # Sparse fieldset: only the columns the client asked for
+    try:
+        fields = requested_fields(request.args.get("fields"), tuple(ADMIN_USERS.columns))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
     try:
         # Test database connection
         logger.info("Testing database connection")
-        test_query = text("SELECT 1")
-        db.session.execute(test_query)
+        PING.execute()
         logger.info("Database connection successful")
         
-        # Call the Stored Procedure
-        result = db.session.execute(text("EXEC GetAllUsers")).fetchall()
+        # Call the Stored Procedure, or select just the requested columns
+        result = ALL_USERS.all() if fields is None else ADMIN_USERS(fields).all()
         
         # Process the result
+        if not result and fields is not None:
+            logger.info("No users found")
+            return jsonify({"success": True, "users": []}), 200
         if not result:
             logger.error("No result returned from GetAllUsers procedure")
             return jsonify({
@@ -403,16 +362,8 @@ def admin_get_users(current_user):
         users = []
         for row in result:
             try:
-                user = {
-                    "id": row.id,
-                    "username": row.username,
-                    "email": row.email,
-                    "full_name": row.full_name,
-                    "user_address": row.user_address,
-                    "phone_number": row.phone_number,
-                    "user_role": row.user_role
-                    # Note: created_at and last_login are not returned by the Stored Procedure
-                }
+                # Note: created_at and last_login are not returned by the Stored Procedure
+                user = pick(row, fields or tuple(ADMIN_USERS.columns))
                 users.append(user)
             except Exception as row_error:
                 logger.error(f"Error processing user row: {str(row_error)}")
@@ -455,23 +406,14 @@ def toggle_product_visibility(current_user, product_id):
     
     try:
         
-        product_result = db.session.execute(
-            text("SELECT product_name FROM products WHERE id = :product_id"),
-            {"product_id": product_id}
-        ).fetchone()
+        product_result = PRODUCT_NAME.first({"product_id": product_id})
         
         if not product_result:
             logger.warning(f"Product not found for ID: {product_id}")
             return jsonify({"message": "Product not found"}), 404
         
         
-        update_query = text("""
-            UPDATE products 
-            SET is_active = :is_active
-            WHERE id = :product_id""")
-        
-        db.session.execute(
-            update_query,
+        SET_PRODUCT_VISIBILITY.execute(
             {
                 "product_id": product_id,
                 "is_active": is_active
@@ -479,6 +421,10 @@ def toggle_product_visibility(current_user, product_id):
         )
         
         db.session.commit()
+        catalog_columns.refresh_product(product_id)
+        catalog_cache.bump()
+        product_detail_cache.clear()
+        search_index.refresh_product(product_id)
         logger.info(f"Product {product_id} visibility updated to {is_active}")
         return jsonify({"message": "Product visibility updated successfully"}), 200
         
@@ -509,10 +455,7 @@ def update_product(current_user, product_id):
     
     try:
         # Check if product exists
-        product_result = db.session.execute(
-            text("SELECT * FROM products WHERE id = :product_id"),
-            {"product_id": product_id}
-        ).fetchone()
+        product_result = PRODUCT_BY_ID.first({"product_id": product_id})
         
         if not product_result:
             logger.warning(f"Product not found for ID: {product_id}")
@@ -532,21 +475,13 @@ def update_product(current_user, product_id):
         }
         
         # Call the Stored Procedure
-        db.session.execute(
-            text("EXEC UpdateProduct "
-                 "@product_id = :product_id, "
-                 "@product_name = :product_name, "
-                 "@product_description = :product_description, "
-                 "@price = :price, "
-                 "@stock = :stock, "
-                 "@category_id = :category_id, "
-                 "@image_url = :image_url, "
-                 "@discount = :discount, "
-                 "@is_active = :is_active"),
-            params
-        )
+        UPDATE_PRODUCT.execute(params)
         
         db.session.commit()
+        catalog_columns.refresh_product(product_id)
+        catalog_cache.bump()
+        product_detail_cache.clear()
+        search_index.refresh_product(product_id)
         logger.info(f"Product {product_id} updated successfully")
         return jsonify({"success": True, "message": "Product updated successfully"}), 200
         
@@ -571,13 +506,11 @@ def delete_user(current_user, user_id):
     
     try:
         # Call the Stored Procedure
-        result = db.session.execute(
-            text("EXEC DeleteUser @UserID = :user_id"),
-            {"user_id": user_id}
-        ).fetchone()
+        result = DELETE_USER.first({"user_id": user_id})
         
         # Commit the transaction
         db.session.commit()
+        auth_cache.invalidate_user(user_id)
         
         # Process the result from the Stored Procedure
         if not result:
@@ -627,8 +560,7 @@ def update_user(current_user, user_id):
     
     try:
         # Check if the user exists
-        user_check_query = text("SELECT id, username FROM users WHERE id = :user_id")
-        user = db.session.execute(user_check_query, {"user_id": user_id}).fetchone()
+        user = USER_NAME.first({"user_id": user_id})
         
         if not user:
             logger.warning(f"User not found: {user_id}")
@@ -666,7 +598,7 @@ def update_user(current_user, user_id):
         # Handle password update separately (only if provided)
         if "password" in data and data["password"]:
             # Hash the password
-            hashed_password = generate_password_hash(data["password"])
+            hashed_password = password_hasher.hash(data["password"])
             update_fields.append("password_hash = :password_hash")
             params["password_hash"] = hashed_password
         
@@ -683,6 +615,7 @@ def update_user(current_user, user_id):
         
         db.session.execute(update_query, params)
         db.session.commit()
+        auth_cache.invalidate_user(user_id)
         
         logger.info(f"User {user_id} ({user.username}) updated successfully")
         return jsonify({
@@ -690,6 +623,10 @@ def update_user(current_user, user_id):
             "message": f"User {user.username} updated successfully"
         }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        logger.warning("User update rejected, password hashing pool is saturated")
+        return jsonify({"success": False, "message": "Server is busy, please try again"}), 503, {"Retry-After": "1"}
     except Exception as e:
         db.session.rollback()
         import traceback
@@ -716,7 +653,7 @@ def add_product(current_user):
             return jsonify({"success": False, "message": "Invalid JSON format"}), 400
         
         data = request.get_json()
-        logger.info(f"Received product data: {data}")
+        logger.info(f"Received product data for: {data.get('product_name')}")
         
         # Basic validation
         required_fields = ['product_name', 'price', 'stock', 'category_id']
@@ -740,17 +677,7 @@ def add_product(current_user):
         }
         
         # Call the Stored Procedure
-        result = db.session.execute(
-            text("EXEC AddNewProduct "
-                 "@product_name = :product_name, "
-                 "@description = :description, "
-                 "@price = :price, "
-                 "@stock = :stock, "
-                 "@category_id = :category_id, "
-                 "@image_url = :image_url, "
-                 "@discount = :discount"),
-            params
-        ).fetchone()
+        result = ADD_NEW_PRODUCT.first(params)
         
         # Commit the transaction
         db.session.commit()
@@ -768,20 +695,17 @@ def add_product(current_user):
             return jsonify({"success": False, "message": message}), 400
         
         # Fetch the product details (either new or updated)
-        product_query = text("""
-            SELECT id, product_name, product_description, price, stock, 
-                   category_id, image_url, discount, is_active 
-            FROM products 
-            WHERE product_name = :product_name
-        """)
-        product = db.session.execute(
-            product_query, {"product_name": params["product_name"]}
-        ).fetchone()
+        product = PRODUCT_BY_NAME.first({"product_name": params["product_name"]})
         
         if not product:
             logger.error("Product not found after adding/updating")
             return jsonify({"success": False, "message": "Product not found after operation"}), 500
         
+        # Refreshed before the cache moves on, so no filtered page is cached from the old columns
+        catalog_columns.refresh_product(product.id)
+        catalog_cache.bump()
+        product_detail_cache.clear()
+        search_index.refresh_product(product.id)
         logger.info(f"Product processed successfully: {product.id}")
         return jsonify({
             "success": True,
@@ -808,6 +732,82 @@ def add_product(current_user):
         logger.error(f"Error adding product: {str(e)}")
         return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
 #############################################################################################################################################
+@admin_bp.route("/admin/profiles", methods=["GET"])
+@token_required
+def list_profiles(current_user):
+    if not check_admin(current_user):
+        logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    return jsonify({
+        "success": True,
+        "enabled": request_profiler.enabled,
+        "profiles": request_profiler.list_profiles()
+    }), 200
+#############################################################################################################################################
+@admin_bp.route("/admin/profiles/<string:name>", methods=["GET"])
+@token_required
+def download_profile(current_user, name):
+    if not check_admin(current_user):
+        logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    path = request_profiler.path_for(name)
+    if path is None:
+        return jsonify({"success": False, "message": "Profile not found"}), 404
+
+    # ?format=text renders the top functions instead of the raw pstats dump
+    if request.args.get("format") == "text":
+        sort = request.args.get("sort", "cumulative")
+        if sort not in ("cumulative", "tottime", "calls", "ncalls"):
+            return jsonify({"success": False, "message": f"Invalid sort: {sort}"}), 400
+        limit = request.args.get("limit", default=50, type=int)
+        return Response(request_profiler.render_text(name, sort, limit), mimetype="text/plain")
+
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name)
+#############################################################################################################################################
+@admin_bp.route("/admin/query-stats", methods=["GET"])
+@token_required
+def get_query_stats(current_user):
+    if not check_admin(current_user):
+        logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "mean", "p50", "p95", "p99", "max", "calls"):
+        return jsonify({"success": False, "message": f"Invalid sort: {sort}"}), 400
+    limit = request.args.get("limit", default=20, type=int)
+
+    return jsonify({
+        "success": True,
+        "enabled": slow_query_log.enabled,
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "fingerprints": slow_query_log.top(limit, sort)
+    }), 200
+#############################################################################################################################################
+@admin_bp.route("/admin/query-stats", methods=["DELETE"])
+@token_required
+def reset_query_stats(current_user):
+    if not check_admin(current_user):
+        logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    slow_query_log.reset()
+    return jsonify({"success": True, "message": "Query stats reset"}), 200
+#############################################################################################################################################
+@admin_bp.route("/admin/pool-stats", methods=["GET"])
+@token_required
+def get_pool_stats(current_user):
+    if not check_admin(current_user):
+        logger.warning(f"Unauthorized access attempt for user_id: {current_user.id}")
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    return jsonify({
+        "success": True,
+        "reporting_pool": db_pools.reporting_enabled,
+        "pools": db_pools.stats()
+    }), 200
+#############################################################################################################################################
 
 
 # mahmoud elqalini
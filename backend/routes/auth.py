@@ -1,22 +1,39 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from backend.extensions import db
+from backend.auth_cache import auth_cache
+from backend.passwords import password_hasher, PasswordHasherBusy
+from backend.principal import load_principal
+from backend.revocation import revocation_list
 from backend.models import User
 from backend.models import Order
 import jwt
 import logging
 import datetime
+import uuid
 from flask import current_app as app
 from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
 
 
 auth_bp = Blueprint("auth", __name__)
 
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
+def _issue_token(user_id):
+    now = datetime.datetime.utcnow()
+    return jwt.encode(
+        {
+            "user_id": user_id,
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "exp": now + datetime.timedelta(days=app.config["TOKEN_EXPIRATION_DAYS"]),
+        },
+        app.config["SECRET_KEY"],
+        algorithm="HS256",
+    )
+
+
 
 @auth_bp.route("/signup", methods=["POST"])
 def signup():
@@ -29,7 +46,7 @@ def signup():
         user_address = data.get("user_address")
         phone_number = data.get("phone_number")
         user_role = data.get("user_role", "").strip().lower()
-        logger.debug(f"Received signup data: {data}")
+        logger.debug(f"Received signup request for username: {username}")
 
         if not username or not password or not email:
             logger.warning("Missing required fields")
@@ -43,7 +60,7 @@ def signup():
             logger.warning(f"Invalid role value: {user_role}")
             return jsonify({"message": "Invalid role value"}), 400
 
-        hashed_password = generate_password_hash(password)
+        hashed_password = password_hasher.hash(password)
 
         new_user = User(
             username=username,
@@ -59,8 +76,11 @@ def signup():
         db.session.commit()
         return jsonify({"message": "User created successfully"}), 201
 
+    except PasswordHasherBusy:
+        logger.warning("Signup rejected, password hashing pool is saturated")
+        return jsonify({"message": "Server is busy, please try again"}), 503, {"Retry-After": "1"}
     except Exception as e:
-        print("Error occurred:", str(e))
+        logger.error(f"Signup error: {str(e)}")
         return jsonify({"message": "Internal Server Error"}), 500
 
 
@@ -73,15 +93,12 @@ def login():
             return jsonify({"message": "Invalid JSON format"}), 400
 
         data = request.get_json(force=True)
-        logger.debug(f"Received data: {data}")
 
         username = data.get("username")
         password = data.get("pass_word")
 
         if not username or not password:
-            logger.warning(
-                f"Missing username or password: username={username}, password={password}"
-            )
+            logger.warning(f"Missing username or password: username={username}")
             return jsonify({"message": "Missing username or password"}), 400
 
         
@@ -89,7 +106,7 @@ def login():
             admin_user = User.query.filter_by(username="admin").first()
             if not admin_user:
                 
-                hashed_password = generate_password_hash("admin")
+                hashed_password = password_hasher.hash("admin")
                 admin_user = User(
                     username="admin",
                     pass_word=hashed_password,
@@ -101,15 +118,7 @@ def login():
                 db.session.commit()
 
             
-            token = jwt.encode(
-                {
-                    "user_id": admin_user.id,
-                    "exp": datetime.datetime.utcnow()
-                    + datetime.timedelta(days=app.config["TOKEN_EXPIRATION_DAYS"]),
-                },
-                app.config["SECRET_KEY"],
-                algorithm="HS256",
-            )
+            token = _issue_token(admin_user.id)
 
             
             admin_response = {
@@ -121,23 +130,21 @@ def login():
                     "role": "admin",
                 },
             }
-            logger.info(f"Admin login response: {admin_response}")
+            logger.info(f"Admin {admin_user.id} logged in")
 
             return jsonify(admin_response), 200
 
         user = User.query.filter_by(username=username).first()
 
-        if user and check_password_hash(user.pass_word, password):
+        if user and password_hasher.verify(user.pass_word, password):
+            # Upgrade hashes created with an older work factor
+            if password_hasher.needs_rehash(user.pass_word):
+                user.pass_word = password_hasher.hash(password)
+                db.session.commit()
+                logger.info(f"Rehashed password for user {user.id}")
+
             # Create token
-            token = jwt.encode(
-                {
-                    "user_id": user.id,
-                    "exp": datetime.datetime.utcnow()
-                    + datetime.timedelta(days=app.config["TOKEN_EXPIRATION_DAYS"]),
-                },
-                app.config["SECRET_KEY"],
-                algorithm="HS256",
-            )
+            token = _issue_token(user.id)
             
             # Make sure we're including the correct user role field
             user_response = {
@@ -151,50 +158,77 @@ def login():
                 },
             }
             
-            logger.info(f"User login response: {user_response}")
+            logger.info(f"User {user.id} logged in")
             return jsonify(user_response), 200
         else:
             logger.warning(f"Invalid credentials for username: {username}")
             return jsonify({"message": "Invalid credentials"}), 401
 
+    except PasswordHasherBusy:
+        logger.warning("Login rejected, password hashing pool is saturated")
+        return jsonify({"message": "Server is busy, please try again"}), 503, {"Retry-After": "1"}
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         return jsonify({"message": "Internal Server Error"}), 500
 
 
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-
-        if "Authorization" in request.headers:
-            try:
-                auth_header = request.headers["Authorization"]
-                logger.debug(f"Auth header: {auth_header[:15]}...")
-                token = auth_header.split()[1]
-            except IndexError:
-                logger.warning("Invalid Authorization header format")
-                return jsonify({"message": "Invalid Authorization header format"}), 401
+def authenticate_request():
+    """Resolve the caller from the Authorization header.
 
-        if not token:
-            logger.warning("Token is missing")
-            return jsonify({"message": "Token is missing!"}), 401
+    Returns ``(principal, None)`` on success or ``(None, error_response)``.
+    """
+    token = None
 
+    if "Authorization" in request.headers:
         try:
-            data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
-            logger.debug(f"Decoded token data: {data}")
-            current_user = User.query.get(data["user_id"])
-            if current_user is None:
-                logger.warning(f"User not found for ID: {data['user_id']}")
-                return jsonify({"message": "User not found"}), 401
-        except jwt.ExpiredSignatureError:
-            logger.warning("Token has expired")
-            return jsonify({"message": "Token has expired!"}), 401
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid token: {str(e)}")
-            return jsonify({"message": "Token is invalid!"}), 401
+            auth_header = request.headers["Authorization"]
+            token = auth_header.split()[1]
+        except IndexError:
+            logger.warning("Invalid Authorization header format")
+            return None, (jsonify({"message": "Invalid Authorization header format"}), 401)
+
+    if not token:
+        logger.warning("Token is missing")
+        return None, (jsonify({"message": "Token is missing!"}), 401)
+
+    cached = auth_cache.get(token)
+    if cached is not None:
+        current_user, jti = cached
+        if revocation_list.is_revoked(jti):
+            logger.warning(f"Revoked token used by user {current_user.id}")
+            auth_cache.invalidate_token(token)
+            return None, (jsonify({"message": "Token has been revoked!"}), 401)
+        return current_user, None
+
+    try:
+        data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+        logger.debug(f"Decoded token for user {data['user_id']}")
+        if revocation_list.is_revoked(data.get("jti")):
+            logger.warning(f"Revoked token used by user {data['user_id']}")
+            return None, (jsonify({"message": "Token has been revoked!"}), 401)
+        current_user = load_principal(db.session, data["user_id"])
+        if current_user is None:
+            logger.warning(f"User not found for ID: {data['user_id']}")
+            return None, (jsonify({"message": "User not found"}), 401)
+        auth_cache.put(token, current_user.id, current_user, data.get("exp"), data.get("jti"))
+    except jwt.ExpiredSignatureError:
+        logger.warning("Token has expired")
+        return None, (jsonify({"message": "Token has expired!"}), 401)
+    except jwt.InvalidTokenError as e:
+        logger.warning(f"Invalid token: {str(e)}")
+        return None, (jsonify({"message": "Token is invalid!"}), 401)
+
+    return current_user, None
+
 
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        current_user, error = authenticate_request()
+        if error is not None:
+            return error
+        g.current_user = current_user
         return f(current_user, *args, **kwargs)
 
     return decorated
@@ -205,7 +239,13 @@ def token_required(f):
 @token_required
 def logout(current_user):
     try:
-        
+        token = request.headers["Authorization"].split()[1]
+        data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+
+        if data.get("jti"):
+            revocation_list.revoke(data["jti"], current_user.id, data["exp"])
+        auth_cache.invalidate_token(token)
+
         logger.info(f"User {current_user.id} logged out")
         return (
             jsonify({"message": "Logout successful. Please discard your token."}),
@@ -221,12 +261,13 @@ def logout(current_user):
 @token_required
 def profile(current_user):
     try:
+        user = current_user.to_user()
         user_data = {
             "id": current_user.id,
             "username": current_user.username,
-            "email": current_user.email,
-            "phone": current_user.phone_number,
-            "address": current_user.user_address,
+            "email": user.email,
+            "phone": user.phone_number,
+            "address": user.user_address,
             "number_of_orders": Order.query.filter_by(user_id=current_user.id).count(),
         }
 
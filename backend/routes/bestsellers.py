@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify
-from sqlalchemy import text
-from backend.extensions import db  # Changed from backend.models.db
+from backend.catalog_cache import catalog_response
+from backend.read_routing import read_only
+from backend.statements import BESTSELLERS, PING, SAMPLE_PRODUCT
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,36 +9,22 @@ logger = logging.getLogger(__name__)
 bestsellers_bp = Blueprint('bestsellers', __name__)
 
 @bestsellers_bp.route('/bestsellers', methods=['GET'])
+@catalog_response(lambda: ('bestsellers',))
+@read_only
 def get_bestsellers():
     try:
         logger.info("Bestsellers endpoint called")
         
         # First, check if we can execute a simple query to verify connection
-        test_query = text("SELECT 1 AS test")
-        test_result = db.session.execute(test_query).fetchone()
+        test_result = PING.first()
         logger.info(f"Test query result: {test_result}")
         
         # Get the column names from the database schema
-        schema_query = text("""
-            SELECT TOP 1 * FROM products
-        """)
-        schema_result = db.session.execute(schema_query).fetchone()
+        schema_result = SAMPLE_PRODUCT.first()
         logger.info(f"Available columns: {schema_result.keys()}")
         
         # Use a simpler approach - get the most recent products
-        # Updated column names based on your database schema
-        products_query = text("""
-            SELECT TOP 8 p.id, p.product_name, p.product_description, p.price, 
-                   ISNULL(p.discount, 0) as discount, 
-                   p.stock, p.image_url, 
-                   p.category_id, c.category_name
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.is_active = 1
-            ORDER BY p.id DESC
-        """)
-        
-        products_result = db.session.execute(products_query).fetchall()
+        products_result = BESTSELLERS.all()
         
         products = []
         for product in products_result:
@@ -63,7 +50,7 @@ def get_bestsellers():
             'message': 'Failed to fetch bestsellers',
             'error': str(e),
             'products': []
-        }), 200  # Return 200 with empty products instead of 500
+        }), 200, {'Cache-Control': 'no-store'}  # Return 200 with empty products instead of 500
 
 
 
@@ -2,6 +2,17 @@ from flask import Blueprint, request, jsonify
 from sqlalchemy.exc import SQLAlchemyError
 from backend.routes.auth import token_required  # Ensure correct import
 from backend.extensions import db
+from backend.read_routing import pins_reads
+from backend.statements import (
+    ACTIVE_CART,
+    ADD_TO_CART,
+    CART_ITEM,
+    CART_ITEM_OWNER,
+    CART_ITEM_QUANTITY,
+    CART_ITEMS,
+    REMOVE_CART_ITEM,
+    SET_CART_ITEM_QUANTITY,
+)
 from backend.models import Cart
 from backend.models import CartDetail
 from decimal import Decimal
@@ -9,7 +20,6 @@ import logging
 
 
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 cart_bp = Blueprint("cart", __name__)
@@ -17,6 +27,7 @@ cart_bp = Blueprint("cart", __name__)
 
 @cart_bp.route("/cart/add", methods=["POST"])
 @token_required
+@pins_reads
 def add_to_cart(current_user):
     if not request.is_json:
         logger.error("Invalid JSON format in request")
@@ -30,8 +41,7 @@ def add_to_cart(current_user):
         logger.error("Missing product_id or quantity in request")
         return jsonify({"message": "Product ID and quantity are required"}), 400
     try:
-        result = db.session.execute(
-            "EXEC AddToCart @UserID=:user_id, @ProductID=:product_id, @Quantity=:quantity",
+        result = ADD_TO_CART.execute(
             {
                 "user_id": current_user.id,
                 "product_id": product_id,
@@ -67,12 +77,7 @@ def add_to_cart(current_user):
 def view_cart(current_user):
     try:
         # First, check if the user has an active cart
-        cart_query = """
-        SELECT id FROM cart 
-        WHERE user_id = :user_id AND is_checked_out = 0
-        """
-        cart_result = db.session.execute(cart_query, {"user_id": current_user.id})
-        cart = cart_result.fetchone()
+        cart = ACTIVE_CART.first({"user_id": current_user.id})
         
         # If no active cart, return empty response
         if not cart:
@@ -88,25 +93,7 @@ def view_cart(current_user):
         logger.debug(f"Found active cart with ID: {cart_id} for user {current_user.id}")
         
         # Get cart items with explicit column names
-        items_query = """
-        SELECT 
-            cd.id as cart_item_id,
-            p.id as product_id,
-            p.product_name,
-            cd.quantity,
-            p.price as unit_price,
-            p.discount,
-            (p.price * (1 - p.discount/100.0) * cd.quantity) as item_total
-        FROM 
-            cart_details cd
-        JOIN 
-            products p ON cd.product_id = p.id
-        WHERE 
-            cd.cart_id = :cart_id
-        """
-        
-        items_result = db.session.execute(items_query, {"cart_id": cart_id})
-        items = items_result.fetchall()
+        items = CART_ITEMS.all({"cart_id": cart_id})
         
         if not items:
             logger.info(f"Cart {cart_id} is empty for user {current_user.id}")
@@ -122,9 +109,6 @@ def view_cart(current_user):
         total_price = 0
         
         for item in items:
-            # Debug the raw item data
-            logger.debug(f"Raw cart item data: {item}")
-            
             # Create a dictionary with explicit keys
             item_dict = {
                 "cart_item_id": item[0],  # This should be the cart_details.id
@@ -136,9 +120,6 @@ def view_cart(current_user):
                 "item_total": float(item[6]) if isinstance(item[6], Decimal) else item[6]
             }
             
-            # Debug the formatted item
-            logger.debug(f"Formatted cart item: {item_dict}")
-            
             formatted_items.append(item_dict)
             total_price += item_dict["item_total"]
             
@@ -163,6 +144,7 @@ def view_cart(current_user):
 
 @cart_bp.route("/cart/update", methods=["POST"])
 @token_required
+@pins_reads
 def update_cart_item_quantity(current_user):
     if not request.is_json:
         logger.error("Invalid JSON format in request")
@@ -182,27 +164,14 @@ def update_cart_item_quantity(current_user):
             return jsonify({"success": False, "message": "Cart item ID and change value are required"}), 400
 
         # Check if the cart item exists
-        cart_item_check = db.session.execute(
-            "SELECT id FROM cart_details WHERE id = :cart_item_id",
-            {"cart_item_id": cart_item_id}
-        ).fetchone()
+        cart_item_check = CART_ITEM.first({"cart_item_id": cart_item_id})
         
         if not cart_item_check:
             logger.error(f"Cart item with ID {cart_item_id} not found")
             return jsonify({"success": False, "message": f"Cart item with ID {cart_item_id} not found"}), 404
 
         # Check if the cart item belongs to the current user
-        cart_check_query = """
-        SELECT c.user_id 
-        FROM cart_details cd
-        JOIN cart c ON cd.cart_id = c.id
-        WHERE cd.id = :cart_item_id
-        """
-        
-        cart_check = db.session.execute(
-            cart_check_query,
-            {"cart_item_id": cart_item_id},
-        ).fetchone()
+        cart_check = CART_ITEM_OWNER.first({"cart_item_id": cart_item_id})
         
         logger.debug(f"Cart check result: {cart_check}")
 
@@ -217,10 +186,7 @@ def update_cart_item_quantity(current_user):
             return jsonify({"success": False, "message": "Unauthorized access to cart item"}), 403
 
         # Get current quantity
-        current_quantity = db.session.execute(
-            "SELECT quantity FROM cart_details WHERE id = :cart_item_id",
-            {"cart_item_id": cart_item_id}
-        ).scalar()
+        current_quantity = CART_ITEM_QUANTITY.scalar({"cart_item_id": cart_item_id})
         
         new_quantity = current_quantity + change
         
@@ -229,10 +195,7 @@ def update_cart_item_quantity(current_user):
             return jsonify({"success": False, "message": "Quantity must be greater than 0"}), 400
             
         # Update the quantity
-        db.session.execute(
-            "UPDATE cart_details SET quantity = :new_quantity WHERE id = :cart_item_id",
-            {"cart_item_id": cart_item_id, "new_quantity": new_quantity}
-        )
+        SET_CART_ITEM_QUANTITY.execute({"cart_item_id": cart_item_id, "new_quantity": new_quantity})
         
         db.session.commit()
         logger.info(f"Updated quantity for cart item {cart_item_id} to {new_quantity}")
@@ -256,6 +219,7 @@ def update_cart_item_quantity(current_user):
 
 @cart_bp.route("/cart/remove", methods=["POST"])
 @token_required
+@pins_reads
 def remove_from_cart(current_user):
     if not request.is_json:
         logger.error("Invalid JSON format in request")
@@ -273,27 +237,14 @@ def remove_from_cart(current_user):
             return jsonify({"success": False, "message": "Cart item ID is required"}), 400
 
         # Check if the cart item exists
-        cart_item_check = db.session.execute(
-            "SELECT id FROM cart_details WHERE id = :cart_item_id",
-            {"cart_item_id": cart_item_id}
-        ).fetchone()
+        cart_item_check = CART_ITEM.first({"cart_item_id": cart_item_id})
         
         if not cart_item_check:
             logger.error(f"Cart item with ID {cart_item_id} not found")
             return jsonify({"success": False, "message": f"Cart item with ID {cart_item_id} not found"}), 404
 
         # Check if the cart item belongs to the current user
-        cart_check_query = """
-        SELECT c.user_id 
-        FROM cart_details cd
-        JOIN cart c ON cd.cart_id = c.id
-        WHERE cd.id = :cart_item_id
-        """
-        
-        cart_check = db.session.execute(
-            cart_check_query,
-            {"cart_item_id": cart_item_id},
-        ).fetchone()
+        cart_check = CART_ITEM_OWNER.first({"cart_item_id": cart_item_id})
         
         logger.debug(f"Cart check result: {cart_check}")
 
@@ -307,17 +258,8 @@ def remove_from_cart(current_user):
             )
             return jsonify({"success": False, "message": "Unauthorized access to cart item"}), 403
 
-        # Instead of using a stored procedure, let's use a direct SQL query for debugging
         try:
-            delete_query = """
-            DELETE FROM cart_details
-            WHERE id = :cart_item_id
-            """
-            
-            result = db.session.execute(
-                delete_query,
-                {"cart_item_id": cart_item_id}
-            )
+            result = REMOVE_CART_ITEM.execute({"cart_item_id": cart_item_id})
             
             affected_rows = result.rowcount
             db.session.commit()
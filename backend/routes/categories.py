@@ -1,12 +1,11 @@
 from flask import Blueprint, jsonify, request
+from backend.catalog_cache import catalog_cache
 from backend.extensions import db
 from backend.models.Category import Category
 from backend.routes.auth import token_required  # Ensure correct import
 from sqlalchemy.sql import text
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 categories_bp = Blueprint("categories", __name__)
@@ -18,20 +17,15 @@ def get_categories():
         categories_query = text("SELECT id, category_name FROM categories")
         result = db.session.execute(categories_query).fetchall()
         
-        # Debug the raw result
-        logger.debug(f"Raw categories query result: {result}")
-        
         formatted_categories = []
         for row in result:
-            # Debug each row
-            logger.debug(f"Category row: {row}")
             category = {
                 'id': row.id,
                 'category_name': row.category_name  # Make sure this matches the column name in your database
             }
             formatted_categories.append(category)
             
-        logger.info(f"Formatted categories: {formatted_categories}")
+        logger.info(f"Retrieved {len(formatted_categories)} categories")
         return jsonify({'categories': formatted_categories}), 200
     except Exception as e:
         logger.error(f"Error retrieving categories: {str(e)}")
@@ -129,6 +123,7 @@ def create_category(current_user):
         new_category = Category(category_name=category_name)
         db.session.add(new_category)
         db.session.commit()
+        catalog_cache.bump()
         
         return jsonify({
             'message': 'Category created successfully',
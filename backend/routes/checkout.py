@@ -2,10 +2,17 @@ from flask import Blueprint, request, jsonify
 from sqlalchemy.exc import SQLAlchemyError
 from backend.routes.auth import token_required  # Ensure correct import
 from backend.extensions import db
+from backend.read_routing import pins_reads
+from backend.statements import (
+    ACTIVE_CART,
+    CART_TOTAL,
+    CHECKOUT_ITEMS,
+    CREATE_ORDER,
+    ORDER_DETAILS,
+    ORDER_ITEMS,
+)
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 checkout_bp = Blueprint('checkout', __name__)
@@ -16,6 +23,7 @@ def check_admin(current_user):
 #################################################### create_order ####################################################  
 @checkout_bp.route('/checkout', methods=['POST'])
 @token_required
+@pins_reads
 def create_order(current_user):
     if not request.is_json:
         logger.error("Invalid JSON format in request")
@@ -34,10 +42,7 @@ def create_order(current_user):
 
     try:
         # Get active cart for the user
-        cart = db.session.execute(
-            "SELECT id FROM Cart WHERE user_id = :user_id AND is_checked_out = 0",
-            {"user_id": current_user.id}
-        ).fetchone()
+        cart = ACTIVE_CART.first({"user_id": current_user.id})
 
         if not cart:
             logger.warning(f"No active cart found for user {current_user.id}")
@@ -49,13 +54,10 @@ def create_order(current_user):
         cart_id = cart[0]
         
         # Calculate total amount from cart_details, considering discount
-        total_amount = db.session.execute(
-            "SELECT SUM(quantity * price * (1 - discount / 100)) FROM cart_details WHERE cart_id = :cart_id",
-            {"cart_id": cart_id}
-        ).scalar()
+        total_amount = CART_TOTAL.scalar({"cart_id": cart_id})
 
         total_amount = float(total_amount) if total_amount is not None else 0.00
-        print(f"Total amount: {total_amount}")
+        logger.debug(f"Cart {cart_id} total amount: {total_amount}")
 
         if total_amount <= 0:
             logger.warning(f"Cart is empty or total amount is zero for user {current_user.id}")
@@ -65,8 +67,7 @@ def create_order(current_user):
             }), 400
 
         # Execute stored procedure to create order
-        result = db.session.execute(
-            "EXEC CreateOrder @UserID=:user_id, @ShippingAddress=:shipping_address, @TotalAmount=:total_amount, @PaymentMethod=:payment_method",
+        rows = CREATE_ORDER.all(
             {
                 "user_id": current_user.id,
                 "shipping_address": shipping_address,
@@ -74,14 +75,13 @@ def create_order(current_user):
                 "payment_method": payment_method
             }
         )
-        rows = result.fetchall()
         db.session.commit()
     
         # Check if we got a result
         if rows:
             row = rows[0]  # Take the first row (assuming single result)
             status, status_code, message, order_id = row
-            print(f"CreateOrder result: {status}, {status_code}, {message}, {order_id}")
+            logger.debug(f"CreateOrder result: {status}, {status_code}, {message}, {order_id}")
             if status == 'success':
                 logger.info(f"Order {order_id} created successfully for user {current_user.id}")
                 return jsonify({
@@ -125,10 +125,7 @@ def create_order(current_user):
 def get_order_details(current_user, order_id):
     try:
         # Execute the Stored Procedure to get order details
-        result = db.session.execute(
-            "EXEC GetOrderDetails @order_id=:order_id",
-            {"order_id": order_id}
-        )
+        result = ORDER_DETAILS.execute({"order_id": order_id})
         order_row = result.fetchone()
 
         # Check if the stored procedure returned a failure status
@@ -164,10 +161,7 @@ def get_order_details(current_user, order_id):
         result.close()
 
         # Fetch order items
-        result = db.session.execute(
-            "EXEC GetOrderItems @order_id=:order_id",
-            {"order_id": order_id}
-        )
+        result = ORDER_ITEMS.execute({"order_id": order_id})
         order_items = []
         for row in result.fetchall():
             order_items.append({
@@ -205,10 +199,7 @@ def get_order_details(current_user, order_id):
 def checkout(current_user):
     try:
         # Get active cart for the user
-        cart = db.session.execute(
-            "SELECT id FROM Cart WHERE user_id = :user_id AND is_checked_out = 0",
-            {"user_id": current_user.id}
-        ).fetchone()
+        cart = ACTIVE_CART.first({"user_id": current_user.id})
 
         if not cart:
             logger.warning(f"No active cart found for user {current_user.id}")
@@ -220,15 +211,8 @@ def checkout(current_user):
         cart_id = cart[0]
 
         # Fetch cart items
-        result = db.session.execute(
-            "SELECT p.product_name, cd.quantity, cd.price, cd.discount "
-            "FROM cart_details cd "
-            "JOIN products p ON cd.product_id = p.id "
-            "WHERE cd.cart_id = :cart_id",
-            {"cart_id": cart_id}
-        )
         cart_items = []
-        for row in result.fetchall():
+        for row in CHECKOUT_ITEMS.all({"cart_id": cart_id}):
             cart_items.append({
                 "product_name": row[0],
                 "quantity": int(row[1]),
@@ -236,13 +220,9 @@ def checkout(current_user):
                 "discount": float(row[3]) if row[3] is not None else 0.0,
                 "total_price": float(row[1] * row[2] * (1 - row[3] / 100)) if row[2] and row[3] is not None else 0.0
             })
-        result.close()
 
         # Calculate total amount
-        total_amount = db.session.execute(
-            "SELECT SUM(quantity * price * (1 - discount / 100)) FROM cart_details WHERE cart_id = :cart_id",
-            {"cart_id": cart_id}
-        ).scalar()
+        total_amount = CART_TOTAL.scalar({"cart_id": cart_id})
 
         total_amount = float(total_amount) if total_amount is not None else 0.00
 
@@ -0,0 +1,21 @@
+from flask import Blueprint, Response, jsonify
+from backend.metrics import metrics
+from backend.routes.auth import token_required
+import logging
+
+logger = logging.getLogger(__name__)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@token_required
+def get_metrics(current_user):
+    if current_user.user_role.lower() != 'admin':
+        logger.warning(f"Unauthorized metrics access attempt for user_id: {current_user.id}")
+        return jsonify({'message': 'Unauthorized access'}), 403
+
+    if not metrics.enabled:
+        return jsonify({'message': 'Metrics are disabled'}), 404
+
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -1,12 +1,13 @@
 from flask import Blueprint, jsonify, request
 from backend.extensions import db
+from backend.fieldsets import pick, requested_fields
+from backend.read_routing import read_only
+from backend.statements import CANCEL_ORDER, ORDER_DETAILS_FOR_CALLER, ORDER_ITEMS, USER_ORDER_FIELDS, USER_ORDERS
 import logging
 from decimal import Decimal
 from sqlalchemy.exc import SQLAlchemyError
 from backend.routes.auth import token_required  # Ensure correct import
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 order_bp = Blueprint('order', __name__)
@@ -21,10 +22,7 @@ def manage_order(current_user, order_id):
     if request.method == 'GET':
         try:
             logger.debug(f"Fetching details for order ID: {order_id}")
-            result = db.session.execute(
-                """
-                EXEC GetOrderDetails @order_id=:order_id, @caller_user_id=:caller_user_id, @is_admin=:is_admin
-                """,
+            result = ORDER_DETAILS_FOR_CALLER.execute(
                 {
                     "order_id": order_id,
                     "caller_user_id": current_user.id,
@@ -58,10 +56,7 @@ def manage_order(current_user, order_id):
             result.close()
 
             logger.debug(f"Fetching items for order ID: {order_id}")
-            result = db.session.execute(
-                "EXEC GetOrderItems @order_id=:order_id",
-                {"order_id": order_id}
-            )
+            result = ORDER_ITEMS.execute({"order_id": order_id})
             order_items = []
             for row in result.fetchall():
                 order_items.append({
@@ -88,10 +83,7 @@ def manage_order(current_user, order_id):
     elif request.method == 'DELETE':
         try:
             logger.debug(f"Attempting to cancel order ID: {order_id}")
-            result = db.session.execute(
-                """
-                EXEC GetOrderDetails @order_id=:order_id, @caller_user_id=:caller_user_id, @is_admin=:is_admin
-                """,
+            result = ORDER_DETAILS_FOR_CALLER.execute(
                 {
                     "order_id": order_id,
                     "caller_user_id": current_user.id,
@@ -107,10 +99,7 @@ def manage_order(current_user, order_id):
             if order_row['status'] in ['shipped', 'delivered']:
                 return jsonify({'message': 'Cannot cancel order in this status'}), 403
 
-            result = db.session.execute(
-                "EXEC CancelOrder @order_id=:order_id",
-                {"order_id": order_id}
-            )
+            result = CANCEL_ORDER.execute({"order_id": order_id})
             row = result.fetchone()
             if row and row['status'] == 'success':
                 db.session.commit()
@@ -129,21 +118,27 @@ def manage_order(current_user, order_id):
             return jsonify({'message': 'Error canceling order', 'error': str(e)}), 500
 #######################################################################list_orders_of_user########################################################
 
+ORDER_CONVERT = {
+    "total_amount": lambda value: float(value) if isinstance(value, Decimal) else value,
+    "order_date": str,
+}
+
 @order_bp.route('/orders', methods=['GET'])
 @token_required
+@read_only
 def list_orders_of_user(current_user):
     try:
-        result = db.session.execute(
-            "EXEC GetAllOrders @user_id=:user_id",
-            {"user_id": current_user.id}
-        )
-        orders = result.fetchall()
-        formatted_orders = [{
-            "id": row[0],
-            "total_amount": float(row[1]) if isinstance(row[1], Decimal) else row[1],
-            "status": row[2],
-            "order_date": str(row[3])
-        } for row in orders]
+        # Sparse fieldset: only the columns the client asked for
+        try:
+            fields = requested_fields(request.args.get('fields'), tuple(USER_ORDER_FIELDS.columns))
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        if fields is None:
+            orders = USER_ORDERS.all({"user_id": current_user.id})
+        else:
+            orders = USER_ORDER_FIELDS(fields).all({"user_id": current_user.id})
+        formatted_orders = [pick(row, fields or tuple(USER_ORDER_FIELDS.columns), ORDER_CONVERT) for row in orders]
         logger.info(f"Found {len(formatted_orders)} orders for user {current_user.id}")
         return jsonify({'orders': formatted_orders}), 200
     except SQLAlchemyError as e:
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app
 from backend.extensions import db
 from backend.models import Payment, Order
+from backend.statements import ORDER_LINE_ITEMS, PENDING_ORDER
 from datetime import datetime
-import stripe
 from backend.routes.auth import token_required
 import logging
 
@@ -13,6 +13,9 @@ payment_bp = Blueprint('payment', __name__)
 @payment_bp.route('/create-checkout-session', methods=['POST'])
 @token_required
 def create_checkout_session(current_user):
+    # stripe takes a noticeable share of startup; import it on the first payment instead
+    import stripe
+
     try:
         logger.info(f"Creating checkout session for user {current_user.id}")
         
@@ -35,16 +38,7 @@ def create_checkout_session(current_user):
         logger.info(f"Getting details for order {order_id}")
         
         # Get order details
-        order_query = """
-        SELECT o.id, o.total_amount, o.shipping_address
-        FROM orders o
-        WHERE o.id = :order_id AND o.user_id = :user_id AND o.status = 'Pending'
-        """
-        
-        order_result = db.session.execute(
-            order_query, 
-            {"order_id": order_id, "user_id": current_user.id}
-        ).fetchone()
+        order_result = PENDING_ORDER.first({"order_id": order_id, "user_id": current_user.id})
         
         if not order_result:
             logger.error(f"Order {order_id} not found or not pending for user {current_user.id}")
@@ -54,14 +48,7 @@ def create_checkout_session(current_user):
         order_id, total_amount, shipping_address = order_result
         
         # Get order items
-        items_query = """
-        SELECT p.product_name, od.quantity, od.price, od.discount
-        FROM order_details od
-        JOIN products p ON od.product_id = p.id
-        WHERE od.order_id = :order_id
-        """
-        
-        items_result = db.session.execute(items_query, {"order_id": order_id}).fetchall()
+        items_result = ORDER_LINE_ITEMS.all({"order_id": order_id})
         logger.info(f"Found {len(items_result)} items for order {order_id}")
         
         # Create line items for Stripe
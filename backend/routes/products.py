@@ -1,14 +1,29 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
+from backend.catalog_cache import catalog_response
+from backend.catalog_columns import MAX_PRICE_BUCKETS, catalog_columns
 from backend.extensions import db
+from backend.fieldsets import pick, requested_fields
+from backend.pagination import decode_cursor, encode_cursor
+from backend.product_detail_cache import product_detail_cache
+from backend.read_routing import pins_reads, read_only
+from backend.search_index import search_index
+from backend.statements import (
+    ADD_PRODUCT_REVIEW,
+    ALL_CATEGORIES,
+    ALL_PRODUCTS,
+    DELETE_PRODUCT_REVIEW,
+    PRODUCT_DETAIL_PAGE,
+    PRODUCT_PAGE_FIELDS,
+    PRODUCT_PAGES,
+    PRODUCT_SORTS,
+    USER_REVIEWED_PRODUCT,
+)
 import logging
 from sqlalchemy.exc import SQLAlchemyError
 from backend.routes.auth import token_required  # Ensure correct import
-from sqlalchemy import text
 from decimal import Decimal
 
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 product_bp = Blueprint('product', __name__)
 
@@ -16,41 +31,74 @@ product_bp = Blueprint('product', __name__)
 #############################################################################get_products#########################################################    
 
 @product_bp.route('/products', methods=['GET'])
+@catalog_response(lambda: ('products',) + tuple(sorted(request.args.items(multi=True))))
+@read_only
 def get_products():
     try:
         # Fetch category_id of query parameters (optional)
         category_id = request.args.get('category_id', default=None, type=int)
 
-        # Perform the stored procedure with category_id passed
-        # Modify the stored procedure to only return active products
-        result = db.session.execute(
-            "EXEC GetAllProducts @category_id = :category_id, @only_active = 1",
-            {'category_id': category_id}
-        )
-        products = result.fetchall()
-
-        # Check the status of "fail"
-        if products and 'status' in products[0].keys() and products[0]['status'] == 'fail':
-            logger.info(f"No products found for category_id {category_id if category_id else 'all'}: {products[0]['message']}")
-            return jsonify({'message': products[0]['message'], 'status_code': products[0]['StatusCode']}), 200
-
-        # Product menu configuration
-        formatted_products = []
-        for row in products:
-            formatted_products.append({
-                "id": row[0],
-                "product_name": row[1],
-                "product_description": row[2],
-                "price": float(row[3]) if isinstance(row[3], Decimal) else row[3],
-                "stock": row[4],
-                "category_id": row[5],
-                "category_name": row[6],
-                "image_url": row[7],
-                "discount": float(row[8]) if isinstance(row[8], Decimal) else row[8]
-            })
-        
-        logger.info(f"Retrieved {len(formatted_products)} products for category_id {category_id if category_id else 'all'}")
-        return jsonify({'products': formatted_products}), 200
+        # Sparse fieldset: only the columns the client asked for
+        try:
+            fields = requested_fields(request.args.get('fields'), PRODUCT_PAGE_FIELDS)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        try:
+            filters = product_filters()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # The original unpaged list, for clients that ask for it explicitly
+        if request.args.get('all', '').lower() in ('1', 'true', 'yes'):
+            if has_column_filters(filters):
+                return get_filtered_products(filters, fields)
+            return get_all_products(category_id, fields)
+
+        sort = request.args.get('sort', default='newest')
+        if sort not in PRODUCT_SORTS:
+            return jsonify({'message': f"Invalid sort: {sort}. Use one of {', '.join(PRODUCT_SORTS)}"}), 400
+
+        limit = request.args.get('limit', default=current_app.config['PRODUCTS_PAGE_SIZE'], type=int)
+        if limit < 1:
+            return jsonify({'message': 'limit must be at least 1'}), 400
+        limit = min(limit, current_app.config['PRODUCTS_MAX_PAGE_SIZE'])
+
+        # One row more than the page, to know whether there is a next one
+        params = {'category_id': category_id, 'limit': limit + 1}
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                params['after_key'], params['after_id'] = parse_cursor(cursor, sort)
+            except ValueError:
+                return jsonify({'message': 'Invalid cursor'}), 400
+
+        field = PRODUCT_SORTS[sort][2]
+        if has_column_filters(filters):
+            # Price, discount and stock filters run on the in-memory catalog columns
+            if not catalog_columns.enabled:
+                return jsonify({'message': 'Product filters are disabled'}), 503
+            after = None
+            if cursor:
+                after_key = params['after_key']
+                after = (float(after_key) if isinstance(after_key, Decimal) else after_key, params['after_id'])
+            rows = catalog_columns.page(filters, sort, after, limit + 1)
+            if rows is None:
+                return jsonify({'message': 'Product filters are not available right now'}), 503
+        else:
+            # The cursor needs the id and sort key even when they are not returned
+            selected = None if fields is None else {'id', field, *fields}
+            rows = PRODUCT_PAGES[sort, bool(cursor), category_id is not None](selected).all(params)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort, getattr(rows[-1], field) if field else None, rows[-1].id)
+
+        logger.info(f"Retrieved {len(rows)} products for category_id {category_id if category_id else 'all'}, sort {sort}")
+        return jsonify({
+            'products': [format_product(row, fields) for row in rows],
+            'page': {'sort': sort, 'limit': limit, 'next_cursor': next_cursor}
+        }), 200
 
     except SQLAlchemyError as e:
         logger.error(f"SQLAlchemy error fetching products: {str(e)}")
@@ -58,10 +106,180 @@ def get_products():
     except Exception as e:
         logger.error(f"General error fetching products: {str(e)}")
         return jsonify({'message': 'Error flowing products', 'error': str(e)}), 500
+
+
+def get_all_products(category_id, fields=None):
+    # Perform the stored procedure with category_id passed
+    # Modify the stored procedure to only return active products
+    products = ALL_PRODUCTS.all({'category_id': category_id})
+
+    # Check the status of "fail"
+    if products and 'status' in products[0].keys() and products[0]['status'] == 'fail':
+        logger.info(f"No products found for category_id {category_id if category_id else 'all'}: {products[0]['message']}")
+        return jsonify({'message': products[0]['message'], 'status_code': products[0]['StatusCode']}), 200
+
+    # Product menu configuration
+    # GetAllProducts always returns every column; only the JSON is narrowed
+    formatted_products = [format_product(row, fields) for row in products]
+
+    logger.info(f"Retrieved {len(formatted_products)} products for category_id {category_id if category_id else 'all'}")
+    return jsonify({'products': formatted_products}), 200
+
+
+def get_filtered_products(filters, fields=None):
+    # The unpaged list with price, discount or stock filters, from the catalog columns
+    if not catalog_columns.enabled:
+        return jsonify({'message': 'Product filters are disabled'}), 503
+    products = catalog_columns.matching(filters)
+    if products is None:
+        return jsonify({'message': 'Product filters are not available right now'}), 503
+
+    # Answer an empty match the way GetAllProducts does
+    if not products:
+        logger.info(f"No products found for filters {filters}")
+        return jsonify({'message': 'No products found.', 'status_code': 1}), 200
+
+    logger.info(f"Retrieved {len(products)} products for filters {filters}")
+    return jsonify({'products': [format_product(row, fields) for row in products]}), 200
+
+
+PRODUCT_CONVERT = {
+    "price": lambda value: float(value) if isinstance(value, Decimal) else value,
+    "discount": lambda value: float(value) if isinstance(value, Decimal) else value,
+}
+
+
+def format_product(row, fields=None):
+    return pick(row, fields or PRODUCT_PAGE_FIELDS, PRODUCT_CONVERT)
+
+
+def parse_cursor(cursor, sort):
+    """``(after_key, after_id)`` from a cursor issued for the same sort."""
+    cursor_sort, key, last_id = decode_cursor(cursor, 3)
+    if cursor_sort != sort:
+        raise ValueError("Cursor belongs to another sort")
+    field = PRODUCT_SORTS[sort][2]
+    if field in ('price', 'discount'):
+        key = Decimal(str(key))
+    elif field is not None and not isinstance(key, str):
+        raise ValueError("Invalid cursor key")
+    return key, int(last_id)
+
+
+def product_filters():
+    """The catalog filters of the request, None where a filter is not given.
+
+    Raises ``ValueError`` for a flag that is neither true nor false.
+    """
+    filters = {
+        'category_id': request.args.get('category_id', default=None, type=int),
+        'min_price': request.args.get('min_price', default=None, type=float),
+        'max_price': request.args.get('max_price', default=None, type=float),
+    }
+    for name in ('discounted', 'in_stock'):
+        value = request.args.get(name, '').lower()
+        if value in ('1', 'true', 'yes'):
+            filters[name] = True
+        elif value in ('0', 'false', 'no'):
+            filters[name] = False
+        elif value:
+            raise ValueError(f"{name} must be true or false")
+        else:
+            filters[name] = None
+    return filters
+
+
+def has_column_filters(filters):
+    """Whether ``filters`` need the catalog columns, beyond the category SQL can filter on."""
+    return any(value is not None for name, value in filters.items() if name != 'category_id')
+#############################################################################get_product_facets#########################################################    
+
+@product_bp.route('/products/facets', methods=['GET'])
+@catalog_response(lambda: ('facets',) + tuple(sorted(request.args.items(multi=True))))
+def get_product_facets():
+    if not catalog_columns.enabled:
+        return jsonify({'message': 'Product facets are disabled'}), 503
+
+    try:
+        filters = product_filters()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    buckets = request.args.get('buckets', default=current_app.config['FACET_PRICE_BUCKETS'], type=int)
+    if buckets < 1:
+        return jsonify({'message': 'buckets must be at least 1'}), 400
+    buckets = min(buckets, MAX_PRICE_BUCKETS)
+
+    try:
+        facets = catalog_columns.facets(filters, buckets)
+        if facets is None:
+            return jsonify({'message': 'Product facets are not available right now'}), 503
+
+        logger.info(f"Computed facets for {facets['total']} products")
+        return jsonify(facets), 200
+
+    except Exception as e:
+        logger.error(f"Error computing product facets: {str(e)}")
+        return jsonify({'message': 'Error computing product facets', 'error': str(e)}), 500
+#############################################################################search_products#########################################################    
+
+@product_bp.route('/products/search', methods=['GET'])
+def search_products():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'message': 'q is required'}), 400
+    if not search_index.enabled:
+        return jsonify({'message': 'Search is disabled'}), 503
+
+    category_id = request.args.get('category_id', default=None, type=int)
+    min_price = request.args.get('min_price', default=None, type=float)
+    max_price = request.args.get('max_price', default=None, type=float)
+    limit = request.args.get('limit', default=current_app.config['SEARCH_RESULTS_LIMIT'], type=int)
+    if limit < 1:
+        return jsonify({'message': 'limit must be at least 1'}), 400
+    limit = min(limit, current_app.config['PRODUCTS_MAX_PAGE_SIZE'])
+
+    try:
+        found = search_index.search(query, limit, category_id=category_id, min_price=min_price, max_price=max_price)
+        if found is None:
+            return jsonify({'message': 'Search is not available right now'}), 503
+
+        products, total = found
+        logger.info(f"Search for '{query}' matched {total} products")
+        return jsonify({'query': query, 'total': total, 'products': products}), 200
+
+    except Exception as e:
+        logger.error(f"Error searching products: {str(e)}")
+        return jsonify({'message': 'Error searching products', 'error': str(e)}), 500
+
+
+@product_bp.route('/products/autocomplete', methods=['GET'])
+def autocomplete_products():
+    prefix = request.args.get('q', '')
+    if not prefix.strip():
+        return jsonify({'suggestions': []}), 200
+    if not search_index.enabled:
+        return jsonify({'message': 'Search is disabled'}), 503
+
+    limit = request.args.get('limit', default=current_app.config['AUTOCOMPLETE_LIMIT'], type=int)
+    if limit < 1:
+        return jsonify({'message': 'limit must be at least 1'}), 400
+    limit = min(limit, current_app.config['PRODUCTS_MAX_PAGE_SIZE'])
+
+    try:
+        suggestions = search_index.autocomplete(prefix, limit)
+        if suggestions is None:
+            return jsonify({'message': 'Search is not available right now'}), 503
+        return jsonify({'suggestions': suggestions}), 200
+
+    except Exception as e:
+        logger.error(f"Error completing '{prefix}': {str(e)}")
+        return jsonify({'message': 'Error completing search', 'error': str(e)}), 500
 #############################################################################get_product_details#########################################################    
 
 @product_bp.route('/product/<string:product_name>', methods=['GET'])
 @token_required
+@read_only
 def get_product_details(current_user, product_name):
     try:
         # Pagination parameters
@@ -77,100 +295,41 @@ def get_product_details(current_user, product_name):
                 'status_code': 4
             }), 400
 
-        # Fetch Product Details
-        logger.debug(f"Fetching product details for: {product_name}")
-        product_result = db.session.execute(text("""
-            EXEC GetProductDetails @ProductName = :product_name
-        """), {'product_name': product_name})
-        product_row = product_result.fetchone()
-
-        # Close the result set
-        product_result.close()
+        # The product, its rating and the reviews page are the same for every user
+        cache_key = product_detail_cache.key(product_name, page, per_page)
+        cached = product_detail_cache.get(cache_key)
+        if cached is not None:
+            product_details, reviews = cached
+            # Check if the user can add a review
+            existing_review = USER_REVIEWED_PRODUCT.first(
+                {'product_id': product_details['product_id'], 'user_id': current_user.id}
+            )
+            can_review = not existing_review
+        else:
+            logger.debug(f"Fetching product details and reviews for: {product_name}, page: {page}, per_page: {per_page}")
+            version = product_detail_cache.version
+            rows = PRODUCT_DETAIL_PAGE.all({
+                'product_name': product_name,
+                'user_id': current_user.id,
+                'offset': (page - 1) * per_page,
+                'per_page': per_page
+            })
 
-        # Check if product exists or if there's a failure status
-        if not product_row:
-            logger.warning(f"Product not found: {product_name}")
-            return jsonify({
-                'status': 'fail',
-                'message': 'Product not found',
-                'status_code': 2
-            }), 404
+            # Check if product exists
+            if not rows:
+                logger.warning(f"Product not found: {product_name}")
+                return jsonify({
+                    'status': 'fail',
+                    'message': 'Product not found',
+                    'status_code': 2
+                }), 404
 
-        if 'status' in product_row.keys() and product_row['status'] == 'fail':
-            logger.warning(f"Failed to fetch product details for {product_name}: {product_row['message']}")
-            return jsonify({
-                'status': 'fail',
-                'message': product_row['message'],
-                'status_code': product_row['StatusCode']
-            }), 404
-
-        # Format product details
-        discounted_price = float(product_row['price']) * (1 - float(product_row['discount']) / 100)
-        product_details = {
-            'product_id': product_row['product_id'],
-            'product_name': product_row['product_name'],
-            'description': product_row['product_description'],
-            'price': float(product_row['price']) if isinstance(product_row['price'], Decimal) else product_row['price'],
-            'discounted_price': round(discounted_price, 2),
-            'stock': product_row['stock'],
-            'stock_status': 'In Stock' if product_row['stock'] > 0 else 'Out of Stock',
-            'category_name': product_row['category_name'],
-            'image_url': product_row['image_url'],
-            'discount': float(product_row['discount']) if isinstance(product_row['discount'], Decimal) else product_row['discount']
-        }
-
-        # Fetch reviews
-        logger.debug(f"Fetching reviews for product: {product_name}, page: {page}, per_page: {per_page}")
-        reviews_result = db.session.execute(text("""
-            EXEC GetReviewsForSpecificProduct 
-                @ProductName = :product_name,
-                @Page = :page,
-                @PerPage = :per_page
-        """), {'product_name': product_name, 'page': page, 'per_page': per_page})
-
-        reviews = []
-        reviews_status_row = None
-        for row in reviews_result:
-            if 'status' in row.keys():
-                reviews_status_row = row
-            else:
-                reviews.append({
-                    'product_id': row['product_id'],
-                    'product_name': row['product_name'],
-                    'user_id': row['user_id'],
-                    'username': row['username'],
-                    'rating': float(row['rating']) if isinstance(row['rating'], Decimal) else row['rating'],
-                    'review_text': row['review_text'],
-                    'review_date': str(row['review_date']),
-                    'photo_url': row['photo_url']
-                })
-        reviews_result.close()
-
-        if reviews_status_row and reviews_status_row['status'] == 'fail':
-            logger.info(f"No reviews found for product {product_name}: {reviews_status_row['message']}")
-            reviews = []
-
-        # Fetch average rating and total reviews
-        avg_rating_result = db.session.execute(text("""
-            SELECT 
-                AVG(CAST(rating AS FLOAT)) AS average_rating,
-                COUNT(rating) AS total_reviews
-            FROM product_reviews
-            WHERE product_id = :product_id
-        """), {'product_id': product_row['product_id']}).fetchone()
-
-        product_details['average_rating'] = round(avg_rating_result['average_rating'], 1) if avg_rating_result['average_rating'] else 0
-        product_details['total_reviews'] = avg_rating_result['total_reviews']
-
-        # Check if the user can add a review
-        existing_review = db.session.execute(
-            "SELECT 1 FROM product_reviews WHERE product_id = :product_id AND user_id = :user_id",
-            {'product_id': product_row['product_id'], 'user_id': current_user.id}
-        ).fetchone()
-        can_review = not existing_review
+            product_details, reviews = format_product_page(rows)
+            product_detail_cache.put(cache_key, version, (product_details, reviews))
+            can_review = not rows[0].user_reviewed
 
         # Pagination
-        total_reviews = avg_rating_result['total_reviews']
+        total_reviews = product_details['total_reviews']
         total_pages = (total_reviews + per_page - 1) // per_page if total_reviews > 0 else 1
 
         logger.info(f"Retrieved product details and {len(reviews)} reviews for product: {product_name}, page: {page}")
@@ -195,10 +354,50 @@ def get_product_details(current_user, product_name):
     except Exception as e:
         logger.error(f"General error fetching product details for {product_name}: {str(e)}")
         return jsonify({'status': 'fail', 'message': f'Server error: {str(e)}'}), 500
+
+
+def format_product_page(rows):
+    """``(product_details, reviews)`` from the rows of ``PRODUCT_DETAIL_PAGE``."""
+    product_row = rows[0]
+
+    # Format product details
+    price = float(product_row.price) if isinstance(product_row.price, Decimal) else product_row.price
+    discount = float(product_row.discount) if isinstance(product_row.discount, Decimal) else product_row.discount
+    product_details = {
+        'product_id': product_row.product_id,
+        'product_name': product_row.product_name,
+        'description': product_row.product_description,
+        'price': price,
+        'discounted_price': round(float(price) * (1 - float(discount) / 100), 2),
+        'stock': product_row.stock,
+        'stock_status': 'In Stock' if product_row.stock > 0 else 'Out of Stock',
+        'category_name': product_row.category_name,
+        'image_url': product_row.image_url,
+        'discount': discount,
+        'average_rating': round(product_row.average_rating, 1) if product_row.average_rating else 0,
+        'total_reviews': product_row.total_reviews
+    }
+
+    # The page is ordered inside the query, but the join does not have to keep that order
+    review_rows = sorted((row for row in rows if row.review_user_id is not None),
+                         key=lambda row: row.review_date, reverse=True)
+    reviews = [{
+        'product_id': product_row.product_id,
+        'product_name': product_row.product_name,
+        'user_id': row.review_user_id,
+        'username': row.review_username,
+        'rating': float(row.rating) if isinstance(row.rating, Decimal) else row.rating,
+        'review_text': row.review_text,
+        'review_date': str(row.review_date),
+        'photo_url': product_row.image_url
+    } for row in review_rows]
+
+    return product_details, reviews
 #############################################################################add_product_review#########################################################    
 
 @product_bp.route('/product/<string:product_name>/review', methods=['POST'])
 @token_required
+@pins_reads
 def add_product_review(current_user, product_name):
 
     try:
@@ -209,8 +408,7 @@ def add_product_review(current_user, product_name):
         username = current_user.username  # Use the username of the token
 
         # Perform an action to add the review
-        result = db.session.execute(
-            "EXEC AddProductReview @ProductName=:product_name, @Username=:username, @Rating=:rating, @ReviewText=:review_text",
+        result = ADD_PRODUCT_REVIEW.execute(
             {
                 'product_name': product_name,
                 'username': username,
@@ -227,6 +425,7 @@ def add_product_review(current_user, product_name):
         # If successful, return audit details
         if row and row['status'] == 'success':
             db.session.commit()
+            product_detail_cache.invalidate(product_name)
             logger.info(f"Review added by user {current_user.id} for product {product_name}")
             return jsonify({
                 'status': row['status'],
@@ -254,12 +453,12 @@ def add_product_review(current_user, product_name):
 #############################################################################delete_review#########################################################    
 @product_bp.route('/product/<string:product_name>/review', methods=['DELETE'])
 @token_required
+@pins_reads
 def delete_review(current_user, product_name):
 
     try:
 
-        result = db.session.execute(
-            "EXEC DeleteProductReview @ProductName=:product_name, @Username=:username",
+        result = DELETE_PRODUCT_REVIEW.execute(
             {
                 "product_name": product_name,
                 "username": current_user.username 
@@ -268,6 +467,7 @@ def delete_review(current_user, product_name):
         row = result.fetchone()
         if row and row[0] == 'success':
             db.session.commit()
+            product_detail_cache.invalidate(product_name)
             logger.info(f"Review deleted for product {product_name} by user {current_user.username }")
             return jsonify({'message': row[2]}), 200
         else:
@@ -288,14 +488,14 @@ def delete_review(current_user, product_name):
 # mahmoud
 
 @product_bp.route('/categories', methods=['GET'])
+@catalog_response(lambda: ('categories',))
+@read_only
 def get_categories():
     """Get all categories"""
     try:
         logger.info("Fetching all categories")
         
-        # Execute direct SQL query
-        result = db.session.execute("SELECT id, category_name FROM categories")
-        categories = result.fetchall()
+        categories = ALL_CATEGORIES.all()
         
         # Format the response
         formatted_categories = []
@@ -1,12 +1,11 @@
 from flask import Blueprint, jsonify, request
 from backend.extensions import db
+from backend.auth_cache import auth_cache
+from backend.passwords import password_hasher, PasswordHasherBusy
 from backend.models.User import User
 from backend.routes.auth import token_required  # Ensure correct import
 import logging
-from werkzeug.security import generate_password_hash, check_password_hash
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 profile_bp = Blueprint("profile", __name__)
@@ -15,14 +14,15 @@ profile_bp = Blueprint("profile", __name__)
 @token_required
 def get_profile(current_user):
     try:
+        user = current_user.to_user()
         user_data = {
-            'id': current_user.id,
-            'username': current_user.username,
-            'email': current_user.email,
-            'full_name': current_user.full_name,
-            'user_address': current_user.user_address,
-            'phone_number': current_user.phone_number,
-            'user_role': current_user.user_role
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'full_name': user.full_name,
+            'user_address': user.user_address,
+            'phone_number': user.phone_number,
+            'user_role': user.user_role
         }
         
         return jsonify({
@@ -43,34 +43,43 @@ def get_profile(current_user):
 def update_profile(current_user):
     try:
         data = request.get_json()
+        user = current_user.to_user()
         
         # Update user fields
         if 'full_name' in data:
-            current_user.full_name = data['full_name']
+            user.full_name = data['full_name']
         if 'user_address' in data:
-            current_user.user_address = data['user_address']
+            user.user_address = data['user_address']
         if 'phone_number' in data:
-            current_user.phone_number = data['phone_number']
+            user.phone_number = data['phone_number']
         if 'email' in data:
-            current_user.email = data['email']
+            user.email = data['email']
             
         # Update password if provided
         if 'current_password' in data and 'new_password' in data:
-            if not check_password_hash(current_user.pass_word, data['current_password']):
+            if not password_hasher.verify(user.pass_word, data['current_password']):
                 return jsonify({
                     'success': False,
                     'message': 'Current password is incorrect'
                 }), 400
                 
-            current_user.pass_word = generate_password_hash(data['new_password'])
+            user.pass_word = password_hasher.hash(data['new_password'])
             
         db.session.commit()
+        auth_cache.invalidate_user(current_user.id)
         
         return jsonify({
             'success': True,
             'message': 'Profile updated successfully'
         }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        logger.warning("Profile update rejected, password hashing pool is saturated")
+        return jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again'
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating profile: {str(e)}")
@@ -6,8 +6,6 @@ from backend.models.Wishlist import Wishlist  # Import the Wishlist model
 from backend.routes.auth import token_required
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 wishlist_bp = Blueprint("wishlist", __name__)
@@ -0,0 +1,299 @@
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+
+from backend.models import Category, Order, OrderDetail, Payment, Product, ProductReview, User
+from backend.models.Wishlist import Wishlist
+
+logger = logging.getLogger(__name__)
+
+SCALES = {
+    "small": {
+        "categories": 12, "users": 5_000, "products": 2_000, "orders": 20_000,
+        "order_details": 80_000, "reviews": 20_000, "wishlist": 10_000,
+    },
+    "medium": {
+        "categories": 25, "users": 50_000, "products": 20_000, "orders": 500_000,
+        "order_details": 2_000_000, "reviews": 200_000, "wishlist": 100_000,
+    },
+    "production": {
+        "categories": 40, "users": 500_000, "products": 200_000, "orders": 5_000_000,
+        "order_details": 20_000_000, "reviews": 2_000_000, "wishlist": 1_000_000,
+    },
+}
+
+FLAVOURS = ("Chocolate", "Vanilla", "Red Velvet", "Lemon", "Strawberry", "Caramel", "Pistachio",
+            "Carrot", "Coffee", "Coconut", "Hazelnut", "Raspberry", "Mango", "Matcha", "Cinnamon")
+KINDS = ("Cake", "Cupcake", "Cheesecake", "Tart", "Brownie", "Cookie", "Croissant", "Muffin",
+         "Macaron", "Eclair", "Donut", "Roll", "Loaf", "Pie")
+ORDER_STATUSES = (("Delivered", 80), ("Shipped", 12), ("Pending", 8))
+PAYMENT_METHODS = (("Credit Card", 55), ("PayPal", 20), ("Cash on Delivery", 15), ("Bank Transfer", 7),
+                   ("Gift Card", 3))
+RATINGS = ((5, 45), (4, 30), (3, 12), (2, 6), (1, 7))
+
+
+class ScaleDataGenerator:
+    """Bulk-loads synthetic catalogue, customer and order data.
+
+    Rows are written with Core ``insert()`` in ``batch_size`` chunks
+    (``executemany``) inside one transaction per batch, never through ORM
+    objects. Every random choice comes from a single ``random.Random(seed)``,
+    so the same sizes and seed always produce the same data.
+
+    The data is skewed the way a shop's is: product popularity (orders,
+    reviews, wishlists) follows a Zipf distribution over a shuffled product
+    order, and ``heavy_user_share`` of the users place ``heavy_order_share``
+    of the orders. IDs are assigned explicitly after the current maximum of
+    each table, so the generator can run against a database that already has
+    data.
+    """
+
+    def __init__(self, engine, sizes, seed=42, batch_size=10_000, zipf_s=1.1,
+                 heavy_user_share=0.01, heavy_order_share=0.3, password="password"):
+        self.engine = engine
+        self.sizes = sizes
+        self.seed = seed
+        self.batch_size = batch_size
+        self.zipf_s = zipf_s
+        self.heavy_user_share = heavy_user_share
+        self.heavy_order_share = heavy_order_share
+        self.password = password
+        self.rng = random.Random(seed)
+        self.now = datetime(2025, 1, 1)
+
+    def run(self):
+        """Generate every table; returns the rows actually inserted, by table."""
+        started = time.perf_counter()
+        self.category_ids = self._categories()
+        self.user_ids = self._users()
+        self.product_ids, self.prices, self.discounts = self._products()
+        self.product_weights = self._zipf_weights(len(self.product_ids))
+        self.user_weights = self._user_weights(len(self.user_ids))
+        inserted = {"categories": len(self.category_ids), "users": len(self.user_ids),
+                    "products": len(self.product_ids)}
+        inserted.update(self._orders())
+        inserted["reviews"] = self._reviews()
+        inserted["wishlist"] = self._wishlist()
+        logger.info(f"Generated scale data in {time.perf_counter() - started:.1f}s")
+        return inserted
+
+    # Helpers
+
+    def _next_id(self, table):
+        with self.engine.connect() as conn:
+            return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def _insert(self, table, rows):
+        with self.engine.begin() as conn:
+            conn.execute(table.insert(), rows)
+
+    def _insert_batched(self, table, rows, total):
+        """Insert the ``rows`` iterator in batches, logging progress."""
+        started = time.perf_counter()
+        batch, written = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._insert(table, batch)
+                written += len(batch)
+                batch = []
+                if written % (self.batch_size * 50) == 0:
+                    logger.info(f"{table.name}: {written:,}/{total:,}")
+        if batch:
+            self._insert(table, batch)
+            written += len(batch)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"{table.name}: {written:,} rows in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+        return written
+
+    def _zipf_weights(self, n):
+        """Cumulative Zipf weights over a shuffled ranking of ``n`` items."""
+        ranks = list(range(1, n + 1))
+        self.rng.shuffle(ranks)
+        return list(accumulate(1.0 / rank ** self.zipf_s for rank in ranks))
+
+    def _user_weights(self, n):
+        heavy = max(1, int(n * self.heavy_user_share))
+        light = n - heavy
+        if light == 0:
+            return list(accumulate([1.0] * n))
+        # Weight heavy users so they account for heavy_order_share of all picks
+        heavy_weight = self.heavy_order_share * light / ((1 - self.heavy_order_share) * heavy)
+        weights = [heavy_weight] * heavy + [1.0] * light
+        self.rng.shuffle(weights)
+        return list(accumulate(weights))
+
+    def _pick(self, population, cum_weights, k):
+        return self.rng.choices(population, cum_weights=cum_weights, k=k)
+
+    def _weighted(self, options):
+        values = [value for value, _ in options]
+        weights = [weight for _, weight in options]
+        return lambda: self.rng.choices(values, weights)[0]
+
+    def _date(self, days_back=730):
+        return self.now - timedelta(seconds=self.rng.randrange(days_back * 86400))
+
+    # Tables
+
+    def _categories(self):
+        table = Category.__table__
+        first = self._next_id(table)
+        count = self.sizes.get("categories", 0)
+        self._insert_batched(table, (
+            {"id": first + i, "category_name": f"{KINDS[i % len(KINDS)]}s {i // len(KINDS) + 1}",
+             "category_description": f"Synthetic category {i}"}
+            for i in range(count)
+        ), count)
+        return list(range(first, first + count))
+
+    def _users(self):
+        table = User.__table__
+        first = self._next_id(table)
+        count = self.sizes.get("users", 0)
+        hashed = generate_password_hash(self.password)
+        self._insert_batched(table, (
+            {"id": uid, "username": f"scale_user_{uid}", "pass_word": hashed, "email": f"scale_user_{uid}@example.com",
+             "full_name": f"Scale User {uid}", "user_address": f"{uid % 999 + 1} Synthetic Street",
+             "phone_number": f"+1555{uid % 10_000_000:07d}", "user_role": "Customer"}
+            for uid in range(first, first + count)
+        ), count)
+        return list(range(first, first + count))
+
+    def _products(self):
+        table = Product.__table__
+        first = self._next_id(table)
+        count = self.sizes.get("products", 0)
+        prices = [round(self.rng.lognormvariate(3.0, 0.6), 2) for _ in range(count)]
+        discounts = [self.rng.choice((0, 0, 0, 0, 5, 10, 15, 20, 25)) for _ in range(count)]
+        self._insert_batched(table, (
+            {"id": first + i, "product_name": f"{FLAVOURS[i % len(FLAVOURS)]} {KINDS[(i // len(FLAVOURS)) % len(KINDS)]} #{first + i}",
+             "product_description": f"Synthetic product {first + i}", "price": prices[i],
+             "stock": self.rng.randrange(0, 500), "category_id": self.category_ids[i % len(self.category_ids)],
+             "image_url": f"/static/uploads/synthetic_{i % 50}.jpg", "discount": discounts[i],
+             "is_active": self.rng.random() > 0.05}
+            for i in range(count)
+        ), count)
+        return list(range(first, first + count)), prices, discounts
+
+    def _orders(self):
+        orders, details, payments = Order.__table__, OrderDetail.__table__, Payment.__table__
+        count = self.sizes.get("orders", 0)
+        if not count or not self.user_ids or not self.product_ids:
+            return {"orders": 0, "order_details": 0, "payments": 0}
+
+        first_order, first_detail, first_payment = (self._next_id(orders), self._next_id(details),
+                                                    self._next_id(payments))
+        mean_items = max(1.0, self.sizes.get("order_details", count) / count)
+        status = self._weighted(ORDER_STATUSES)
+        method = self._weighted(PAYMENT_METHODS)
+        index = range(len(self.product_ids))
+        started = time.perf_counter()
+
+        detail_id = first_detail
+        order_batch, detail_batch, payment_batch = [], [], []
+        for offset, user_id in enumerate(self._pick_users(count)):
+            order_id = first_order + offset
+            items = min(len(index), max(1, round(self.rng.expovariate(1 / mean_items))))
+            total = 0.0
+            for i in set(self._pick(index, self.product_weights, items)):
+                quantity = self.rng.choice((1, 1, 1, 2, 2, 3, 4))
+                total += quantity * self.prices[i] * (1 - self.discounts[i] / 100)
+                detail_batch.append({"id": detail_id, "order_id": order_id, "product_id": self.product_ids[i],
+                                     "quantity": quantity, "price": self.prices[i], "discount": self.discounts[i]})
+                detail_id += 1
+
+            order_date = self._date()
+            order_status = status()
+            order_batch.append({"id": order_id, "user_id": user_id, "order_date": order_date,
+                                "total_amount": round(total, 2), "shipping_address": f"{user_id % 999 + 1} Synthetic Street",
+                                "status": order_status})
+            payment_batch.append({"id": first_payment + offset, "order_id": order_id, "payment_date": order_date,
+                                  "amount": round(total, 2), "payment_method": method(),
+                                  "status": "Pending" if order_status == "Pending" else "Completed"})
+
+            if len(order_batch) >= self.batch_size:
+                self._flush_orders(order_batch, detail_batch, payment_batch)
+                if (offset + 1) % (self.batch_size * 50) == 0:
+                    logger.info(f"orders: {offset + 1:,}/{count:,}")
+                order_batch, detail_batch, payment_batch = [], [], []
+
+        if order_batch:
+            self._flush_orders(order_batch, detail_batch, payment_batch)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"orders: {count:,} orders, {detail_id - first_detail:,} order_details and {count:,} payments "
+                    f"in {elapsed:.1f}s")
+        return {"orders": count, "order_details": detail_id - first_detail, "payments": count}
+
+    def _pick_users(self, count):
+        remaining = count
+        while remaining:
+            k = min(remaining, self.batch_size)
+            yield from self._pick(self.user_ids, self.user_weights, k)
+            remaining -= k
+
+    def _flush_orders(self, order_batch, detail_batch, payment_batch):
+        with self.engine.begin() as conn:
+            conn.execute(Order.__table__.insert(), order_batch)
+            conn.execute(OrderDetail.__table__.insert(), detail_batch)
+            conn.execute(Payment.__table__.insert(), payment_batch)
+
+    def _pairs(self, count):
+        """Unique (product, user) pairs: Zipf over products, skewed over users."""
+        seen = set()
+        attempts = 0
+        user_count = len(self.user_ids)
+        while len(seen) < count and attempts < count * 5:
+            k = min(self.batch_size, count - len(seen))
+            attempts += k
+            products = self._pick(range(len(self.product_ids)), self.product_weights, k)
+            users = self._pick(range(user_count), self.user_weights, k)
+            for p, u in zip(products, users):
+                key = p * user_count + u
+                if key not in seen:
+                    seen.add(key)
+                    yield self.product_ids[p], self.user_ids[u]
+
+    def _reviews(self):
+        table = ProductReview.__table__
+        count = self.sizes.get("reviews", 0)
+        if not count or not self.user_ids or not self.product_ids:
+            return 0
+        first = self._next_id(table)
+        rating = self._weighted(RATINGS)
+        return self._insert_batched(table, (
+            {"id": first + i, "product_id": product_id, "user_id": user_id, "rating": rating(),
+             "review_text": f"Synthetic review {first + i}", "review_date": self._date()}
+            for i, (product_id, user_id) in enumerate(self._pairs(count))
+        ), count)
+
+    def _wishlist(self):
+        table = Wishlist.__table__
+        count = self.sizes.get("wishlist", 0)
+        if not count or not self.user_ids or not self.product_ids:
+            return 0
+        first = self._next_id(table)
+        return self._insert_batched(table, (
+            {"id": first + i, "user_id": user_id, "product_id": product_id}
+            for i, (product_id, user_id) in enumerate(self._pairs(count))
+        ), count)
+
+
+def generate_scale_data(engine, scale="small", seed=42, batch_size=10_000, **sizes):
+    """Generate a ``SCALES`` preset, with any table size overridden by keyword.
+
+    Returns the rows inserted per table, which can fall short of the sizes
+    asked for: order details are drawn per order and reviews and wishlist
+    entries are unique (product, user) pairs.
+    """
+    merged = dict(SCALES[scale])
+    merged.update({name: value for name, value in sizes.items() if value is not None})
+    logger.info(f"Generating {scale} scale data (seed {seed}): {merged}")
+    return ScaleDataGenerator(engine, merged, seed=seed, batch_size=batch_size).run()
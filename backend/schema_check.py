@@ -0,0 +1,74 @@
+import hashlib
+import json
+import logging
+import os
+
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from backend.extensions import db
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CHECK_MODES = ("create_all", "fingerprint", "skip")
+
+
+def schema_fingerprint(metadata, engine):
+    """Hash of the DDL ``create_all`` would emit, plus the database it targets.
+
+    The DDL is compiled for the engine's dialect rather than taken from
+    ``repr(table)``, which includes the addresses of Python-side column
+    defaults and so changes from one process to the next. The password
+    never makes it into the hash (``repr`` of a URL masks it).
+    """
+    digest = hashlib.sha256(repr(engine.url).encode())
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    return digest.hexdigest()
+
+
+def ensure_schema(app):
+    """Make sure the mapped tables exist, as cheaply as ``SCHEMA_CHECK`` allows.
+
+    * ``create_all``  - run ``db.create_all()`` on every boot, which checks
+      each table against the database.
+    * ``fingerprint`` - only run it when the models (or the database URI)
+      changed since the fingerprint stored in ``SCHEMA_FINGERPRINT_FILE``
+      was written. A database emptied behind the app's back is not noticed;
+      switch to ``create_all`` once to recover.
+    * ``skip``        - never touch the schema; migrations own it.
+
+    Must be called inside an app context.
+    """
+    mode = app.config.get("SCHEMA_CHECK", "fingerprint")
+    if mode not in SCHEMA_CHECK_MODES:
+        raise ValueError(f"SCHEMA_CHECK must be one of {', '.join(SCHEMA_CHECK_MODES)}, got {mode!r}")
+
+    if mode == "skip":
+        logger.debug("Schema check skipped")
+        return
+    if mode == "create_all":
+        db.create_all()
+        return
+
+    path = app.config.get("SCHEMA_FINGERPRINT_FILE") or os.path.join(app.instance_path, "schema_fingerprint.json")
+    fingerprint = schema_fingerprint(db.metadata, db.engine)
+    try:
+        with open(path) as fh:
+            if json.load(fh).get("fingerprint") == fingerprint:
+                logger.debug("Schema fingerprint unchanged, skipping create_all")
+                return
+    except (OSError, ValueError):
+        pass
+
+    db.create_all()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump({"fingerprint": fingerprint, "tables": sorted(db.metadata.tables)}, fh)
+        os.replace(tmp_path, path)
+        logger.info(f"Schema created/verified, fingerprint stored in {path}")
+    except OSError as e:
+        logger.warning(f"Could not write schema fingerprint {path}: {str(e)}")
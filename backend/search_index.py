@@ -0,0 +1,358 @@
+import heapq
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from decimal import Decimal
+
+from backend.statements import ACTIVE_PRODUCT, SEARCH_DOCUMENTS
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+
+# How much a word counts for, by the field it appears in
+FIELD_WEIGHTS = (("product_name", 3.0), ("category_name", 2.0), ("product_description", 1.0))
+
+# Shortest last word that search also matches as a prefix
+MIN_PREFIX = 2
+
+# Most candidates one autocomplete lookup examines before it settles for what it found
+SCAN_LIMIT = 500
+
+# Fields whose words are offered as completions
+SUGGEST_FIELDS = ("product_name", "category_name")
+
+RESULT_FIELDS = ("id", "product_name", "price", "discount", "stock", "image_url", "category_id", "category_name")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold()) if text else []
+
+
+class _Node:
+    __slots__ = ("children", "count", "best")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0  # products whose name or category has the word ending here
+        self.best = 0   # the highest count anywhere below (and at) this node
+
+
+class _Trie:
+    """Prefix trie over the name and category words of the catalogue.
+
+    Every node knows the highest product count below it, so ``expand``
+    walks best-first and yields the most common completions of a prefix
+    without visiting the rest of the subtree.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+
+    def set(self, word, count):
+        path = [self.root]
+        for char in word:
+            child = path[-1].children.get(char)
+            if child is None:
+                if not count:
+                    return
+                child = path[-1].children[char] = _Node()
+            path.append(child)
+        path[-1].count = count
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            node.best = max([node.count] + [child.best for child in node.children.values()])
+            if depth and not node.best:
+                del path[depth - 1].children[word[depth - 1]]
+
+    def expand(self, prefix, limit):
+        """Up to ``limit`` words starting with ``prefix``, most common first."""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        order = itertools.count()
+        heap = [(-node.best, next(order), prefix, node)]
+        words = []
+        while heap and len(words) < limit:
+            _, _, text, node = heapq.heappop(heap)
+            if node is None:
+                words.append(text)
+                continue
+            if node.count:
+                heapq.heappush(heap, (-node.count, next(order), text, None))
+            for char, child in node.children.items():
+                heapq.heappush(heap, (-child.best, next(order), text + char, child))
+        return words
+
+
+class _Catalog:
+    """One generation of the index: documents, postings and the trie."""
+
+    def __init__(self):
+        self.products = {}   # product id -> the JSON the endpoints return
+        self.words = {}      # product id -> ({word: weight}, {suggested word: weight})
+        self.postings = {}   # word -> {product id: weight}
+        self.ranked = {}     # suggested word -> [(-weight, product id)], best first
+        self.trie = _Trie()
+
+    @classmethod
+    def from_rows(cls, rows):
+        catalog = cls()
+        for row in rows:
+            catalog.add(row, sort=False)
+        for word, ranked in catalog.ranked.items():
+            ranked.sort()
+            catalog.trie.set(word, len(ranked))
+        return catalog
+
+    def add(self, row, sort=True):
+        product = {field: float(getattr(row, field)) if isinstance(getattr(row, field), Decimal)
+                   else getattr(row, field) for field in RESULT_FIELDS}
+        weights, suggested = {}, {}
+        for field, weight in FIELD_WEIGHTS:
+            for word in tokenize(getattr(row, field)):
+                weights[word] = weights.get(word, 0) + weight
+                if field in SUGGEST_FIELDS:
+                    suggested[word] = suggested.get(word, 0) + weight
+
+        self.products[row.id] = product
+        self.words[row.id] = (weights, suggested)
+        for word, weight in weights.items():
+            self.postings.setdefault(word, {})[row.id] = weight
+        for word, weight in suggested.items():
+            entry = (-weight, row.id)
+            ranked = self.ranked.setdefault(word, [])
+            if sort:
+                insort(ranked, entry)
+                self.trie.set(word, len(ranked))
+            else:
+                ranked.append(entry)
+
+    def remove(self, product_id):
+        product = self.products.pop(product_id, None)
+        if product is None:
+            return
+        weights, suggested = self.words.pop(product_id)
+        for word in weights:
+            postings = self.postings[word]
+            del postings[product_id]
+            if not postings:
+                del self.postings[word]
+        for word, weight in suggested.items():
+            ranked = self.ranked[word]
+            del ranked[bisect_left(ranked, (-weight, product_id))]
+            if not ranked:
+                del self.ranked[word]
+            self.trie.set(word, len(ranked))
+
+    def search(self, query, max_expansions, limit, category_id=None, min_price=None, max_price=None):
+        """The best ``limit`` matches for every word of ``query``, and how many matched.
+
+        The last word also matches as a prefix of name and category words
+        (search as you type) once it is ``MIN_PREFIX`` characters long. Each
+        word scores its best matching term, weighted by field and by how
+        rare the term is.
+        """
+        words = tokenize(query)
+        if not words:
+            return [], 0
+
+        total = len(self.products)
+        alternatives = []
+        for position, word in enumerate(words):
+            terms = [word] if word in self.postings else []
+            if position == len(words) - 1 and len(word) >= MIN_PREFIX:
+                terms += [term for term in self.trie.expand(word, max_expansions) if term != word]
+            postings = [(self.postings[term], math.log(1 + total / len(self.postings[term]))) for term in terms]
+            if not postings and position and position == len(words) - 1 and len(word) < MIN_PREFIX:
+                break  # a letter typed after the last word narrows nothing yet
+            if not postings:
+                return [], 0
+            alternatives.append(postings)
+
+        # Start from the rarest word and only look the candidates up in the others
+        alternatives.sort(key=lambda postings: sum(len(p) for p, _ in postings))
+        (postings, idf), *others = alternatives[0]
+        scores = {product_id: weight * idf for product_id, weight in postings.items()}
+        for postings, idf in others:
+            for product_id, weight in postings.items():
+                if weight * idf > scores.get(product_id, 0):
+                    scores[product_id] = weight * idf
+
+        if category_id is not None or min_price is not None or max_price is not None:
+            products = self.products
+            scores = {product_id: score for product_id, score in scores.items()
+                      if (category_id is None or products[product_id]["category_id"] == category_id)
+                      and (min_price is None or products[product_id]["price"] >= min_price)
+                      and (max_price is None or products[product_id]["price"] <= max_price)}
+
+        for word_postings in alternatives[1:]:
+            best = {}
+            for postings, idf in word_postings:
+                for product_id in scores.keys() & postings.keys():
+                    if postings[product_id] * idf > best.get(product_id, 0):
+                        best[product_id] = postings[product_id] * idf
+            scores = {product_id: scores[product_id] + score for product_id, score in best.items()}
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [dict(self.products[product_id], score=round(score, 3)) for product_id, score in best], len(scores)
+
+    def autocomplete(self, prefix, max_expansions, limit):
+        """Products whose name or category has a word starting with the last word of ``prefix``.
+
+        The earlier words must all appear in the product. A lone prefix reads
+        the ranked lists of its completions; otherwise the ranked list of the
+        rarest earlier word is walked. Either way the lookup stops as soon as
+        it has ``limit`` products, or after ``SCAN_LIMIT`` candidates.
+        """
+        words = tokenize(prefix)
+        if not words:
+            return []
+        *required, last = words
+        if any(word not in self.postings for word in required):
+            return []
+
+        if not required:
+            streams = [self.ranked[word] for word in self.trie.expand(last, max_expansions)]
+            matches = (product_id for _, product_id in heapq.merge(*streams))
+        else:
+            required.sort(key=lambda word: len(self.postings[word]))
+            anchor, others = required[0], [self.postings[word] for word in required[1:]]
+            if anchor in self.ranked:
+                candidates = (product_id for _, product_id in self.ranked[anchor])
+            else:
+                candidates = sorted(self.postings[anchor])
+            matches = (product_id for product_id in itertools.islice(candidates, SCAN_LIMIT)
+                       if all(product_id in postings for postings in others)
+                       and any(word.startswith(last) for word in self.words[product_id][1]))
+
+        seen, products = set(), []
+        for product_id in matches:
+            if product_id in seen:
+                continue
+            seen.add(product_id)
+            product = self.products[product_id]
+            products.append({field: product[field] for field in ("id", "product_name", "category_name")})
+            if len(products) == limit:
+                break
+        return products
+
+
+class SearchIndex:
+    """In-process full-text index of the active catalogue.
+
+    An inverted index over ``product_name``, ``product_description`` and
+    ``category_name`` answers ``/products/search``, and a prefix trie over
+    the name and category words answers ``/products/autocomplete``; neither
+    touches the database. The index is built when the app starts, and the
+    admin product routes update it incrementally after they commit.
+
+    Other workers hear nothing of those updates, so the first lookup that
+    finds the index ``SEARCH_INDEX_REFRESH_SECONDS`` old rebuilds it; lookups
+    on other threads keep using the current index meanwhile. Lookups return
+    None while no index could be built (the database was unreachable).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.refresh_interval = 300
+        self.max_expansions = 50
+        self._catalog = _Catalog()
+        self._built_at = None
+        self._changed = None
+        self._lock = threading.RLock()
+        self._building = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("SEARCH_INDEX_ENABLED", True)
+        self.refresh_interval = app.config.get("SEARCH_INDEX_REFRESH_SECONDS", 300)
+        self.max_expansions = app.config.get("SEARCH_MAX_EXPANSIONS", 50)
+        with self._lock:
+            self._catalog = _Catalog()
+            self._built_at = None
+            self._changed = None
+
+    def build(self):
+        """Load the active catalogue into a new index and swap it in.
+
+        Returns False when another thread is already building. Products an
+        admin changed while the rows were being read are loaded again
+        afterwards, so the swap cannot undo them.
+        """
+        if not self._building.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                self._changed = set()
+            started = time.perf_counter()
+            catalog = _Catalog.from_rows(SEARCH_DOCUMENTS.all())
+            with self._lock:
+                self._catalog = catalog
+                self._built_at = time.monotonic()
+                changed, self._changed = self._changed, None
+            for product_id in changed:
+                self.refresh_product(product_id)
+            logger.info(f"Search index built: {len(catalog.products)} products, {len(catalog.postings)} terms "
+                        f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return True
+        except Exception as e:
+            with self._lock:
+                self._changed = None
+            logger.error(f"Error building the search index: {str(e)}")
+            return False
+        finally:
+            self._building.release()
+
+    def refresh_product(self, product_id):
+        """Re-read one product after an admin change; inactive products drop out."""
+        if not self.enabled:
+            return
+        try:
+            row = ACTIVE_PRODUCT.first({"product_id": product_id})
+        except Exception as e:
+            # The next lookup rebuilds the whole index instead
+            logger.error(f"Error refreshing product {product_id} in the search index: {str(e)}")
+            with self._lock:
+                self._built_at = None
+            return
+        with self._lock:
+            if self._changed is not None:
+                self._changed.add(product_id)
+            self._catalog.remove(product_id)
+            if row is not None:
+                self._catalog.add(row)
+
+    def search(self, query, limit, category_id=None, min_price=None, max_price=None):
+        """``(products, total)`` for ``query``, best match first."""
+        if not self._ensure_fresh():
+            return None
+        with self._lock:
+            return self._catalog.search(query, self.max_expansions, limit, category_id, min_price, max_price)
+
+    def autocomplete(self, prefix, limit):
+        if not self._ensure_fresh():
+            return None
+        with self._lock:
+            return self._catalog.autocomplete(prefix, self.max_expansions, limit)
+
+    def __len__(self):
+        return len(self._catalog.products)
+
+    def _ensure_fresh(self):
+        built_at = self._built_at
+        if built_at is None or time.monotonic() - built_at >= self.refresh_interval:
+            self.build()
+        return self._built_at is not None
+
+
+search_index = SearchIndex()
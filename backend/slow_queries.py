@@ -0,0 +1,197 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.logging_setup import close_async_handler, make_async_handler
+
+logger = logging.getLogger(__name__)
+
+EXEC_RE = re.compile(r"^\s*EXEC(?:UTE)?\s+([\w.\[\]]+)", re.IGNORECASE)
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"(?<![\w@:])-?\d+(?:\.\d+)?\b")
+PLACEHOLDER_RE = re.compile(r"(?::\w+|%\(\w+\)s|%s|\?)")
+IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+SPACE_RE = re.compile(r"\s+")
+
+MAX_FINGERPRINT_CACHE = 2048
+
+
+def fingerprint(statement):
+    """Group ``statement`` with every other call of the same query.
+
+    Stored procedure calls collapse to ``EXEC <name>``; anything else has its
+    literals and bind placeholders replaced with ``?`` and whitespace folded.
+    """
+    match = EXEC_RE.match(statement)
+    if match:
+        return f"EXEC {match.group(1).replace('[', '').replace(']', '')}"
+
+    normalized = STRING_RE.sub("?", statement)
+    normalized = NUMBER_RE.sub("?", normalized)
+    normalized = PLACEHOLDER_RE.sub("?", normalized)
+    normalized = IN_LIST_RE.sub("(?+)", normalized)
+    return SPACE_RE.sub(" ", normalized).strip()[:500]
+
+
+def parameter_shape(parameters, executemany=False):
+    """Names and types of the bound parameters, never their values."""
+    if executemany and parameters:
+        return {"rows": len(parameters), "each": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class _FingerprintStats:
+    __slots__ = ("calls", "total", "max", "slow", "samples")
+
+    def __init__(self, sample_size):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.samples = deque(maxlen=sample_size)
+
+
+class SlowQueryLog:
+    """Per-fingerprint latency stats plus a log of statements over a threshold.
+
+    Every statement is timed and grouped by ``fingerprint()``; the last
+    ``SLOW_QUERY_SAMPLE_SIZE`` timings of each fingerprint are kept for
+    percentiles. Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are
+    written, with their parameter shape but no values, to a rotating log.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.threshold = 0.2
+        self.sample_size = 500
+        self.max_fingerprints = 1000
+        self._stats = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self._log = logging.getLogger("backend.slow_queries.log")
+        self._log.propagate = False
+        self._handler = None
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("SLOW_QUERY_ENABLED", True)
+        self.threshold = app.config.get("SLOW_QUERY_THRESHOLD_MS", 200) / 1000
+        self.sample_size = app.config.get("SLOW_QUERY_SAMPLE_SIZE", 500)
+        self.max_fingerprints = app.config.get("SLOW_QUERY_MAX_FINGERPRINTS", 1000)
+        if not self.enabled:
+            return
+
+        path = app.config.get("SLOW_QUERY_LOG") or os.path.join(app.instance_path, "slow_queries.log")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_handler = RotatingFileHandler(
+            path,
+            maxBytes=app.config.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024),
+            backupCount=app.config.get("SLOW_QUERY_LOG_BACKUPS", 5),
+        )
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        # A later app replaces the log file of the one before it
+        if self._handler is not None:
+            self._log.removeHandler(self._handler)
+            close_async_handler(self._handler)
+        self._handler = make_async_handler(file_handler)
+        self._log.addHandler(self._handler)
+        self._log.setLevel(logging.INFO)
+
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._listening = True
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["slow_query_start_time"].pop()
+        if not self.enabled:
+            return
+
+        key = self._fingerprint(statement)
+        slow = elapsed >= self.threshold
+        self.record(key, elapsed, slow)
+
+        if slow:
+            endpoint = request.endpoint if has_request_context() else None
+            self._log.info(
+                f"{elapsed * 1000:.1f}ms fingerprint={key!r} endpoint={endpoint} "
+                f"params={parameter_shape(parameters, executemany)}"
+            )
+
+    def _fingerprint(self, statement):
+        key = self._fingerprints.get(statement)
+        if key is None:
+            key = fingerprint(statement)
+            if len(self._fingerprints) >= MAX_FINGERPRINT_CACHE:
+                self._fingerprints.clear()
+            self._fingerprints[statement] = key
+        return key
+
+    def record(self, key, elapsed, slow=False):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    key = "(other)"
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = _FingerprintStats(self.sample_size)
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.slow += slow
+            stats.samples.append(elapsed)
+
+    def top(self, limit=20, sort="total"):
+        """Fingerprints ordered by ``sort`` (total, mean, p50, p95, p99, max or calls)."""
+        with self._lock:
+            items = [(key, stats.calls, stats.total, stats.max, stats.slow, sorted(stats.samples))
+                     for key, stats in self._stats.items()]
+
+        rows = []
+        for key, calls, total, max_elapsed, slow, samples in items:
+            rows.append({
+                "fingerprint": key,
+                "calls": calls,
+                "slow_calls": slow,
+                "total_ms": round(total * 1000, 2),
+                "mean_ms": round(total / calls * 1000, 2),
+                "p50_ms": round(_percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(_percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+                "max_ms": round(max_elapsed * 1000, 2),
+            })
+        sort_key = "calls" if sort == "calls" else f"{sort}_ms"
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,603 @@
+import threading
+from collections import namedtuple
+
+from sqlalchemy import Integer, Numeric, String, bindparam, text
+
+from backend.db_pool import db_pools
+
+STATEMENTS = {}
+
+
+class Statement:
+    """A named SQL statement, compiled once when this module is imported.
+
+    The ``text()`` clause carries typed bind parameters, so every request
+    executes the very same construct: SQLAlchemy's compiled cache keys on
+    it and the driver always sees identical SQL it can keep prepared.
+    Parameters without a declared type (flags taken straight from request
+    JSON) are bound as given.
+
+    Statements declared with ``fields`` return their rows from ``all()``
+    and ``first()`` as slotted records (namedtuples) instead of ``Row``.
+    ``bind="reporting"`` runs a statement on the reporting pool when one
+    is configured.
+    """
+
+    __slots__ = ("name", "sql", "clause", "record", "bind")
+
+    def __init__(self, name, sql, fields=None, bind=None, **types):
+        if name in STATEMENTS:
+            raise ValueError(f"Statement {name} is already registered")
+        self.name = name
+        self.sql = sql
+        self.clause = text(sql).bindparams(*(bindparam(key, type_=type_) for key, type_ in types.items()))
+        self.record = namedtuple(_record_name(name), fields) if fields else None
+        self.bind = bind
+        STATEMENTS[name] = self
+
+    def __repr__(self):
+        return f"<Statement {self.name}>"
+
+    def execute(self, params=None, session=None):
+        return (session or db_pools.session_for(self.bind)).execute(self.clause, params or {})
+
+    def all(self, params=None, session=None):
+        result = self.execute(params, session)
+        if self.record is None:
+            return result.fetchall()
+        make = self.record._make
+        return [make(row) for row in result]
+
+    def first(self, params=None, session=None):
+        row = self.execute(params, session).first()
+        if row is None or self.record is None:
+            return row
+        return self.record._make(row)
+
+    def scalar(self, params=None, session=None):
+        return self.execute(params, session).scalar()
+
+
+class Projection:
+    """A ``SELECT`` whose column list a request can narrow (sparse fieldsets).
+
+    ``columns`` maps each field, in response order, to its SQL expression,
+    and ``sql`` holds a ``{columns}`` placeholder for the select list. The
+    full projection is registered as ``name`` when the module is imported;
+    a narrower one is built the first time a subset is asked for and
+    registered as ``name[field,...]``, so each subset is still a single
+    compiled statement whose records carry only the selected fields.
+    """
+
+    def __init__(self, name, sql, columns, bind=None, **types):
+        self.name = name
+        self.sql = sql
+        self.columns = columns
+        self.bind = bind
+        self.types = types
+        self.full = self._build(name, tuple(columns))
+        self._subsets = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<Projection {self.name}>"
+
+    def __call__(self, fields=None):
+        """The statement selecting ``fields`` (any order), or every column for None."""
+        if fields is None:
+            return self.full
+        selected = tuple(field for field in self.columns if field in fields)
+        if len(selected) == len(self.columns):
+            return self.full
+        statement = self._subsets.get(selected)
+        if statement is None:
+            with self._lock:
+                statement = self._subsets.get(selected)
+                if statement is None:
+                    statement = self._build(f"{self.name}[{','.join(selected)}]", selected)
+                    self._subsets[selected] = statement
+        return statement
+
+    def _build(self, name, fields):
+        select = ", ".join(_select_item(self.columns[field], field) for field in fields)
+        return Statement(name, self.sql.replace("{columns}", select), fields=fields, bind=self.bind, **self.types)
+
+
+def _select_item(expression, field):
+    return expression if expression.split(".")[-1] == field else f"{expression} AS {field}"
+
+
+def _record_name(name):
+    name = name.split("[")[0]
+    return "".join(part.title() for part in name.replace(".", "_").split("_")) + "Record"
+
+
+Money = Numeric(10, 2)
+Percent = Numeric(5, 2)
+
+PING = Statement("ping", "SELECT 1")
+
+# Cart
+
+ACTIVE_CART = Statement(
+    "cart.active_for_user",
+    "SELECT id FROM cart WHERE user_id = :user_id AND is_checked_out = 0",
+    user_id=Integer,
+)
+
+ADD_TO_CART = Statement(
+    "cart.add",
+    "EXEC AddToCart @UserID=:user_id, @ProductID=:product_id, @Quantity=:quantity",
+    user_id=Integer, product_id=Integer, quantity=Integer,
+)
+
+CART_ITEMS = Statement(
+    "cart.items",
+    """
+    SELECT
+        cd.id as cart_item_id,
+        p.id as product_id,
+        p.product_name,
+        cd.quantity,
+        p.price as unit_price,
+        p.discount,
+        (p.price * (1 - p.discount/100.0) * cd.quantity) as item_total
+    FROM
+        cart_details cd
+    JOIN
+        products p ON cd.product_id = p.id
+    WHERE
+        cd.cart_id = :cart_id
+    """,
+    fields=("cart_item_id", "product_id", "product_name", "quantity", "unit_price", "discount", "item_total"),
+    cart_id=Integer,
+)
+
+CART_ITEM = Statement(
+    "cart.item_exists",
+    "SELECT id FROM cart_details WHERE id = :cart_item_id",
+    cart_item_id=Integer,
+)
+
+CART_ITEM_OWNER = Statement(
+    "cart.item_owner",
+    """
+    SELECT c.user_id
+    FROM cart_details cd
+    JOIN cart c ON cd.cart_id = c.id
+    WHERE cd.id = :cart_item_id
+    """,
+    cart_item_id=Integer,
+)
+
+CART_ITEM_QUANTITY = Statement(
+    "cart.item_quantity",
+    "SELECT quantity FROM cart_details WHERE id = :cart_item_id",
+    cart_item_id=Integer,
+)
+
+SET_CART_ITEM_QUANTITY = Statement(
+    "cart.set_item_quantity",
+    "UPDATE cart_details SET quantity = :new_quantity WHERE id = :cart_item_id",
+    cart_item_id=Integer, new_quantity=Integer,
+)
+
+REMOVE_CART_ITEM = Statement(
+    "cart.remove_item",
+    "DELETE FROM cart_details WHERE id = :cart_item_id",
+    cart_item_id=Integer,
+)
+
+CART_TOTAL = Statement(
+    "cart.total",
+    "SELECT SUM(quantity * price * (1 - discount / 100)) FROM cart_details WHERE cart_id = :cart_id",
+    cart_id=Integer,
+)
+
+CHECKOUT_ITEMS = Statement(
+    "cart.checkout_items",
+    "SELECT p.product_name, cd.quantity, cd.price, cd.discount "
+    "FROM cart_details cd "
+    "JOIN products p ON cd.product_id = p.id "
+    "WHERE cd.cart_id = :cart_id",
+    fields=("product_name", "quantity", "price", "discount"),
+    cart_id=Integer,
+)
+
+# Orders
+
+CREATE_ORDER = Statement(
+    "order.create",
+    "EXEC CreateOrder @UserID=:user_id, @ShippingAddress=:shipping_address, "
+    "@TotalAmount=:total_amount, @PaymentMethod=:payment_method",
+    user_id=Integer, shipping_address=String, total_amount=Money, payment_method=String(20),
+)
+
+ORDER_DETAILS = Statement(
+    "order.details",
+    "EXEC GetOrderDetails @order_id=:order_id",
+    order_id=Integer,
+)
+
+ORDER_DETAILS_FOR_CALLER = Statement(
+    "order.details_for_caller",
+    "EXEC GetOrderDetails @order_id=:order_id, @caller_user_id=:caller_user_id, @is_admin=:is_admin",
+    order_id=Integer, caller_user_id=Integer, is_admin=Integer,
+)
+
+ORDER_ITEMS = Statement(
+    "order.items",
+    "EXEC GetOrderItems @order_id=:order_id",
+    order_id=Integer,
+)
+
+CANCEL_ORDER = Statement(
+    "order.cancel",
+    "EXEC CancelOrder @order_id=:order_id",
+    order_id=Integer,
+)
+
+USER_ORDERS = Statement(
+    "order.for_user",
+    "EXEC GetAllOrders @user_id=:user_id",
+    user_id=Integer,
+)
+
+# The same rows, for requests that ask for only some of the columns
+USER_ORDER_FIELDS = Projection(
+    "order.fields_for_user",
+    "SELECT {columns} FROM orders WHERE user_id = :user_id",
+    {field: field for field in ("id", "total_amount", "status", "order_date")},
+    user_id=Integer,
+)
+
+PENDING_ORDER = Statement(
+    "order.pending_for_user",
+    """
+    SELECT o.id, o.total_amount, o.shipping_address
+    FROM orders o
+    WHERE o.id = :order_id AND o.user_id = :user_id AND o.status = 'Pending'
+    """,
+    order_id=Integer, user_id=Integer,
+)
+
+ORDER_LINE_ITEMS = Statement(
+    "order.line_items",
+    """
+    SELECT p.product_name, od.quantity, od.price, od.discount
+    FROM order_details od
+    JOIN products p ON od.product_id = p.id
+    WHERE od.order_id = :order_id
+    """,
+    fields=("product_name", "quantity", "price", "discount"),
+    order_id=Integer,
+)
+
+# Products and reviews
+
+ALL_PRODUCTS = Statement(
+    "product.all",
+    "EXEC GetAllProducts @category_id = :category_id, @only_active = 1",
+    category_id=Integer,
+)
+
+# Keyset pages of the active catalogue. Each sort maps to its key expression,
+# whether it runs descending, and the record field holding the key; ties are
+# broken on the id in the same direction, and ``newest`` pages on the id alone.
+PRODUCT_SORTS = {
+    "newest": ("p.id", True, None),
+    "price": ("p.price", False, "price"),
+    "price_desc": ("p.price", True, "price"),
+    "discount": ("ISNULL(p.discount, 0)", True, "discount"),
+    "name": ("p.product_name", False, "product_name"),
+}
+
+PRODUCT_PAGE_COLUMNS = {
+    "id": "p.id",
+    "product_name": "p.product_name",
+    "product_description": "p.product_description",
+    "price": "p.price",
+    "stock": "p.stock",
+    "category_id": "p.category_id",
+    "category_name": "c.category_name",
+    "image_url": "p.image_url",
+    "discount": "ISNULL(p.discount, 0)",
+}
+PRODUCT_PAGE_FIELDS = tuple(PRODUCT_PAGE_COLUMNS)
+
+_SORT_KEY_TYPES = {"price": Money, "discount": Percent, "product_name": String(100)}
+
+
+def _product_page(sort, after, by_category):
+    expression, descending, field = PRODUCT_SORTS[sort]
+    direction, beyond = ("DESC", "<") if descending else ("ASC", ">")
+    where = ["p.is_active = 1"]
+    types = {"limit": Integer}
+    if by_category:
+        where.append("p.category_id = :category_id")
+        types["category_id"] = Integer
+    if after:
+        types["after_id"] = Integer
+        if field is None:
+            where.append(f"p.id {beyond} :after_id")
+        else:
+            where.append(f"({expression} {beyond} :after_key OR ({expression} = :after_key AND p.id {beyond} :after_id))")
+            types["after_key"] = _SORT_KEY_TYPES[field]
+    order = f"p.id {direction}" if field is None else f"{expression} {direction}, p.id {direction}"
+    name = ".".join(["product.page", sort] + (["after"] if after else []) + (["category"] if by_category else []))
+    return Projection(
+        name,
+        f"""
+    SELECT {{columns}}
+    FROM products p
+    JOIN categories c ON p.category_id = c.id
+    WHERE {" AND ".join(where)}
+    ORDER BY {order}
+    OFFSET 0 ROWS FETCH NEXT :limit ROWS ONLY
+    """,
+        PRODUCT_PAGE_COLUMNS,
+        **types,
+    )
+
+
+PRODUCT_PAGES = {
+    (sort, after, by_category): _product_page(sort, after, by_category)
+    for sort in PRODUCT_SORTS
+    for after in (False, True)
+    for by_category in (False, True)
+}
+
+# Everything the product page shows, in one round trip: the product and its rating summary on
+# every row, one row per review on the requested page (a single row with NULL review columns when
+# the page is empty), and whether the caller has reviewed it. The reviews are those
+# GetReviewsForSpecificProduct returns; as with GetProductDetails, a name shared by several
+# products resolves to one of them (here the oldest).
+PRODUCT_DETAIL_PAGE = Statement(
+    "product.detail_page",
+    """
+    SELECT p.id AS product_id, p.product_name, p.product_description, p.price, p.stock,
+           c.category_name, p.image_url, ISNULL(p.discount, 0) AS discount,
+           (SELECT AVG(CAST(rating AS FLOAT)) FROM product_reviews WHERE product_id = p.id) AS average_rating,
+           (SELECT COUNT(rating) FROM product_reviews WHERE product_id = p.id) AS total_reviews,
+           CASE WHEN EXISTS (SELECT 1 FROM product_reviews WHERE product_id = p.id AND user_id = :user_id)
+                THEN 1 ELSE 0 END AS user_reviewed,
+           r.user_id AS review_user_id, r.username AS review_username, r.rating, r.review_text, r.review_date
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    LEFT JOIN (
+        SELECT pr.product_id, pr.user_id, u.full_name AS username, pr.rating, pr.review_text, pr.review_date
+        FROM product_reviews pr
+        JOIN users u ON pr.user_id = u.id
+        WHERE pr.product_id = (SELECT MIN(id) FROM products WHERE product_name = :product_name)
+        ORDER BY pr.review_date DESC
+        OFFSET :offset ROWS FETCH NEXT :per_page ROWS ONLY
+    ) r ON r.product_id = p.id
+    WHERE p.id = (SELECT MIN(id) FROM products WHERE product_name = :product_name)
+    """,
+    fields=("product_id", "product_name", "product_description", "price", "stock", "category_name", "image_url",
+            "discount", "average_rating", "total_reviews", "user_reviewed", "review_user_id", "review_username",
+            "rating", "review_text", "review_date"),
+    product_name=String(100), user_id=Integer, offset=Integer, per_page=Integer,
+)
+
+USER_REVIEWED_PRODUCT = Statement(
+    "product.user_reviewed",
+    "SELECT 1 FROM product_reviews WHERE product_id = :product_id AND user_id = :user_id",
+    product_id=Integer, user_id=Integer,
+)
+
+ADD_PRODUCT_REVIEW = Statement(
+    "product.add_review",
+    "EXEC AddProductReview @ProductName=:product_name, @Username=:username, @Rating=:rating, @ReviewText=:review_text",
+    product_name=String(100), username=String(100), rating=Integer, review_text=String,
+)
+
+DELETE_PRODUCT_REVIEW = Statement(
+    "product.delete_review",
+    "EXEC DeleteProductReview @ProductName=:product_name, @Username=:username",
+    product_name=String(100), username=String(100),
+)
+
+ALL_CATEGORIES = Statement(
+    "category.all",
+    "SELECT id, category_name FROM categories",
+    fields=("id", "category_name"),
+)
+
+BESTSELLERS = Statement(
+    "product.bestsellers",
+    """
+    SELECT TOP 8 p.id, p.product_name, p.product_description, p.price,
+           ISNULL(p.discount, 0) as discount,
+           p.stock, p.image_url,
+           p.category_id, c.category_name
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = 1
+    ORDER BY p.id DESC
+    """,
+    fields=("id", "product_name", "product_description", "price", "discount", "stock", "image_url",
+            "category_id", "category_name"),
+)
+
+SAMPLE_PRODUCT = Statement("product.sample", "SELECT TOP 1 * FROM products")
+
+# Search index documents: the whole active catalogue at startup. ACTIVE_PRODUCT re-reads one
+# product after an admin change, for the search index and the catalogue columns alike.
+
+SEARCH_FIELDS = ("id", "product_name", "product_description", "price", "discount", "stock", "image_url",
+                 "category_id", "category_name")
+
+SEARCH_DOCUMENTS = Statement(
+    "search.documents",
+    """
+    SELECT p.id, p.product_name, p.product_description, p.price,
+           ISNULL(p.discount, 0) as discount,
+           p.stock, p.image_url,
+           p.category_id, c.category_name
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = 1
+    """,
+    fields=SEARCH_FIELDS,
+    bind="reporting",
+)
+
+ACTIVE_PRODUCT = Statement(
+    "product.active",
+    """
+    SELECT p.id, p.product_name, p.product_description, p.price,
+           ISNULL(p.discount, 0) as discount,
+           p.stock, p.image_url,
+           p.category_id, c.category_name
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.id = :product_id AND p.is_active = 1
+    """,
+    fields=SEARCH_FIELDS,
+    product_id=Integer,
+)
+
+# Admin
+
+COUNT_PRODUCTS = Statement("admin.count_products", "SELECT COUNT(*) FROM products", bind="reporting")
+
+COUNT_USERS = Statement("admin.count_users", "SELECT COUNT(*) FROM users", bind="reporting")
+
+ORDER_STATS = Statement(
+    "admin.order_stats",
+    """
+    SELECT COUNT(*) as order_count, COALESCE(SUM(total_amount), 0) as total_revenue
+    FROM orders
+    """,
+    bind="reporting",
+)
+
+RECENT_ORDERS = Statement(
+    "admin.recent_orders",
+    """
+    SELECT TOP 5 o.id, o.user_id, u.username, o.order_date, o.total_amount, o.status
+    FROM orders o
+    JOIN users u ON o.user_id = u.id
+    ORDER BY o.order_date DESC
+    """,
+    fields=("id", "user_id", "username", "order_date", "total_amount", "status"),
+    bind="reporting",
+)
+
+PRODUCTS_TABLE_EXISTS = Statement(
+    "admin.products_table_exists",
+    """
+    SELECT TABLE_NAME
+    FROM INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_TYPE = 'BASE TABLE' AND TABLE_NAME = 'products'
+    """,
+)
+
+ADMIN_PRODUCTS = Projection(
+    "admin.products",
+    """
+    SELECT {columns}
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    ORDER BY p.id DESC
+    """,
+    {
+        "id": "p.id",
+        "product_name": "p.product_name",
+        "description": "p.product_description",
+        "price": "p.price",
+        "stock": "p.stock",
+        "category_id": "p.category_id",
+        "category_name": "c.category_name",
+        "image_url": "p.image_url",
+        "is_active": "p.is_active",
+        "discount": "p.discount",
+    },
+    bind="reporting",
+)
+
+ALL_USERS = Statement("admin.all_users", "EXEC GetAllUsers", bind="reporting")
+
+# The columns GetAllUsers returns, for requests that ask for only some of them
+ADMIN_USERS = Projection(
+    "admin.users",
+    "SELECT {columns} FROM users",
+    {field: field for field in ("id", "username", "email", "full_name", "user_address", "phone_number", "user_role")},
+    bind="reporting",
+)
+
+PRODUCT_NAME = Statement(
+    "admin.product_name",
+    "SELECT product_name FROM products WHERE id = :product_id",
+    product_id=Integer,
+)
+
+SET_PRODUCT_VISIBILITY = Statement(
+    "admin.set_product_visibility",
+    """
+    UPDATE products
+    SET is_active = :is_active
+    WHERE id = :product_id
+    """,
+    product_id=Integer,
+)
+
+PRODUCT_BY_ID = Statement(
+    "admin.product_by_id",
+    "SELECT * FROM products WHERE id = :product_id",
+    product_id=Integer,
+)
+
+UPDATE_PRODUCT = Statement(
+    "admin.update_product",
+    "EXEC UpdateProduct "
+    "@product_id = :product_id, "
+    "@product_name = :product_name, "
+    "@product_description = :product_description, "
+    "@price = :price, "
+    "@stock = :stock, "
+    "@category_id = :category_id, "
+    "@image_url = :image_url, "
+    "@discount = :discount, "
+    "@is_active = :is_active",
+    product_id=Integer, product_name=String(100), product_description=String, price=Money, stock=Integer,
+    category_id=Integer, image_url=String(255), discount=Percent,
+)
+
+DELETE_USER = Statement(
+    "admin.delete_user",
+    "EXEC DeleteUser @UserID = :user_id",
+    user_id=Integer,
+)
+
+USER_NAME = Statement(
+    "admin.user_name",
+    "SELECT id, username FROM users WHERE id = :user_id",
+    user_id=Integer,
+)
+
+ADD_NEW_PRODUCT = Statement(
+    "admin.add_product",
+    "EXEC AddNewProduct "
+    "@product_name = :product_name, "
+    "@description = :description, "
+    "@price = :price, "
+    "@stock = :stock, "
+    "@category_id = :category_id, "
+    "@image_url = :image_url, "
+    "@discount = :discount",
+    product_name=String(100), description=String, price=Money, stock=Integer, category_id=Integer,
+    image_url=String(255), discount=Percent,
+)
+
+PRODUCT_BY_NAME = Statement(
+    "admin.product_by_name",
+    """
+    SELECT id, product_name, product_description, price, stock,
+           category_id, image_url, discount, is_active
+    FROM products
+    WHERE product_name = :product_name
+    """,
+    product_name=String(100),
+)
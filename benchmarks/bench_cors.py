@@ -0,0 +1,102 @@
+"""Per-request CORS overhead: flask_cors + catch-all OPTIONS route vs CORSMiddleware.
+
+Calls the WSGI app directly with a prebuilt environ so the numbers reflect
+the CORS layer and Flask dispatch, not the test client.
+
+* ``before`` - the previous wiring: ``flask_cors.CORS(app, ...)`` plus a
+  catch-all ``OPTIONS`` route (needs ``flask-cors`` installed)
+* ``after``  - ``backend.cors_middleware.CORSMiddleware`` in front of the app
+
+    python benchmarks/bench_cors.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+from flask import Flask, jsonify
+from werkzeug.test import EnvironBuilder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.cors_middleware import CORSMiddleware  # noqa: E402
+
+ORIGINS = ["http://localhost:5174", "http://localhost:3000", "http://localhost:5173"]
+ORIGIN = "http://localhost:3000"
+
+
+def make_flask_app():
+    app = Flask(__name__)
+
+    @app.route("/products")
+    def products():
+        return jsonify({"products": []})
+
+    return app
+
+
+def make_before():
+    try:
+        from flask_cors import CORS
+    except ImportError:
+        return None
+
+    app = make_flask_app()
+    CORS(app, origins=ORIGINS, allow_headers=["Content-Type", "Authorization"],
+         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+         supports_credentials=True, max_age=3600)
+
+    @app.route("/", defaults={"path": ""}, methods=["OPTIONS"])
+    @app.route("/<path:path>", methods=["OPTIONS"])
+    def handle_options(path):
+        return "", 200
+
+    return app
+
+
+def make_after():
+    app = make_flask_app()
+    app.wsgi_app = CORSMiddleware(app.wsgi_app, origins=ORIGINS)
+    return app
+
+
+def environ_for(method):
+    headers = {"Origin": ORIGIN}
+    if method == "OPTIONS":
+        headers["Access-Control-Request-Method"] = "POST"
+        headers["Access-Control-Request-Headers"] = "Content-Type, Authorization"
+    return EnvironBuilder(path="/products", method=method, headers=headers).get_environ()
+
+
+def measure(app, method, iterations):
+    template = environ_for(method)
+
+    def start_response(status, headers, exc_info=None):
+        return None
+
+    for _ in range(100):
+        b"".join(app(dict(template), start_response))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        b"".join(app(dict(template), start_response))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    variants = [("before", make_before()), ("after", make_after())]
+    for name, app in variants:
+        if app is None:
+            print(f"{name:<7} skipped (flask-cors is not installed)")
+            continue
+        get_us = measure(app, "GET", args.iterations)
+        options_us = measure(app, "OPTIONS", args.iterations)
+        print(f"{name:<7} GET {get_us:8.1f} us/request   preflight {options_us:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Micro-benchmark: full ORM ``User`` vs slotted ``Principal`` per request.
+
+Simulates what ``token_required`` does for one request, using a fresh
+session each time the way Flask-SQLAlchemy scopes sessions per request:
+
+* ``orm``        - ``User.query.get(user_id)`` (the previous behaviour)
+* ``principal``  - column-only lookup building a ``Principal`` (cache miss)
+* ``cached``     - ``Principal`` served from ``AuthCache`` (cache hit)
+
+Run from the repository root:
+
+    python benchmarks/bench_principal.py --iterations 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from backend import create_app  # noqa: E402
+from backend.auth_cache import auth_cache  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import User  # noqa: E402
+from backend.principal import load_principal  # noqa: E402
+
+
+def run_orm(user_id):
+    user = User.query.get(user_id)
+    return user.id, user.username, user.user_role
+
+
+def run_principal(user_id):
+    principal = load_principal(db.session, user_id)
+    return principal.id, principal.username, principal.user_role
+
+
+def run_cached(user_id):
+    principal = auth_cache.get("bench-token")
+    return principal.id, principal.username, principal.user_role
+
+
+def measure(fn, user_id, iterations):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(user_id)
+        db.session.remove()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        user = User(username="bench", pass_word="x", email="bench@example.com",
+                    full_name="Bench User", user_role="Customer")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        auth_cache.put("bench-token", user_id, load_principal(db.session, user_id))
+        db.session.remove()
+
+        for name, fn in (("orm", run_orm), ("principal", run_principal), ("cached", run_cached)):
+            fn(user_id)
+            elapsed, peak = measure(fn, user_id, args.iterations)
+            per_call = elapsed / args.iterations * 1e6
+            print(f"{name:<10} {per_call:9.1f} us/request   peak alloc {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
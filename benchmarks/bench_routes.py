@@ -0,0 +1,296 @@
+"""End-to-end route benchmark against SQLite.
+
+Boots ``create_app`` on a temporary SQLite database with the stored
+procedures emulated by ``benchmarks/sqlite_procedures.py``, seeds a small
+catalogue and drives the main routes through the Flask test client:
+
+* ``products``       - ``GET /products``
+* ``products_304``   - ``GET /products`` revalidated with ``If-None-Match``
+* ``product_detail`` - ``GET /product/<name>`` (rotating over products)
+* ``search``         - ``GET /products/search`` (rotating over a few queries)
+* ``autocomplete``   - ``GET /products/autocomplete`` (typing a product name)
+* ``facets``         - ``GET /products/facets`` (rotating over a few filters)
+* ``cart``           - ``GET /cart``
+* ``cart_update``    - ``POST /cart/update``
+* ``checkout``       - ``POST /checkout`` (the cart is refilled between calls, untimed)
+* ``orders``         - ``GET /orders``
+* ``admin``          - ``GET /admin``
+
+For each scenario it reports throughput and p50/p95/p99 latency. Results
+can be saved as a JSON baseline and later runs compared against it:
+
+    python benchmarks/bench_routes.py --save-baseline
+    python benchmarks/bench_routes.py --baseline benchmarks/results/baseline.json
+
+With ``--replica`` a second SQLite file, copied from the primary once it
+is seeded, is configured as the read replica. It is never refreshed, so a
+read that should have been pinned to the primary shows up as stale data.
+
+Absolute numbers only mean something on the machine that produced the
+baseline; compare runs from the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sqlite_procedures import engine_options  # noqa: E402
+from backend import create_app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import Category, Product, ProductReview, User  # noqa: E402
+from backend.passwords import password_hasher  # noqa: E402
+from backend.search_index import search_index  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "baseline.json")
+PASSWORD = "benchmark-password"
+
+
+def make_app(workdir, replica=False, **overrides):
+    path = os.path.join(workdir, "bench.db")
+    config = {
+        "SECRET_KEY": "benchmark-only-secret-key-0123456789abcdef",
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options(path),
+        "LOG_LEVEL": "ERROR",
+        "SLOW_QUERY_LOG": os.path.join(workdir, "slow_queries.log"),
+        "PROFILE_DIR": os.path.join(workdir, "profiles"),
+        "SCHEMA_FINGERPRINT_FILE": os.path.join(workdir, "schema_fingerprint.json"),
+    }
+    if replica:
+        replica_path = os.path.join(workdir, "replica.db")
+        config["REPLICA_DATABASE_URL"] = f"sqlite:///{replica_path}"
+        config["REPLICA_ENGINE_OPTIONS"] = engine_options(replica_path)
+    config.update(overrides)
+    return create_app(config)
+
+
+def replicate(workdir):
+    """Copy the primary database over the replica, as of now."""
+    with sqlite3.connect(os.path.join(workdir, "bench.db")) as source, \
+            sqlite3.connect(os.path.join(workdir, "replica.db")) as target:
+        source.backup(target)
+
+
+def seed(app, products, reviews_per_product):
+    with app.app_context():
+        hashed = password_hasher.hash(PASSWORD)
+        customer = User(username="bench_customer", pass_word=hashed, email="customer@bench.local",
+                        full_name="Bench Customer", user_address="1 Bench St", user_role="Customer")
+        admin = User(username="bench_admin", pass_word=hashed, email="admin@bench.local",
+                     full_name="Bench Admin", user_role="Admin")
+        reviewers = [
+            User(username=f"reviewer{i}", pass_word=hashed, email=f"reviewer{i}@bench.local",
+                 full_name=f"Reviewer {i}", user_role="Customer")
+            for i in range(reviews_per_product)
+        ]
+        categories = [Category(category_name=f"Category {i}") for i in range(5)]
+        db.session.add_all([customer, admin] + reviewers + categories)
+        db.session.flush()
+
+        rows = []
+        for i in range(products):
+            rows.append(Product(product_name=f"Cake {i:05d}", product_description=f"Benchmark cake number {i}",
+                                price=10 + i % 40, stock=1_000_000, category_id=categories[i % 5].id,
+                                image_url=f"/static/uploads/cake{i % 20}.jpg", discount=(i % 4) * 5))
+        db.session.add_all(rows)
+        db.session.flush()
+
+        db.session.add_all([
+            ProductReview(product_id=product.id, user_id=reviewer.id, rating=1 + (product.id + j) % 5,
+                          review_text=f"Review {j} of {product.product_name}")
+            for product in rows for j, reviewer in enumerate(reviewers)
+        ])
+        db.session.commit()
+        # The index was built, empty, when the app started
+        search_index.build()
+        return [product.product_name for product in rows], [product.id for product in rows]
+
+
+def login(client, username):
+    response = client.post("/login", json={"username": username, "pass_word": PASSWORD})
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+
+def build_scenarios(client, product_names, product_ids):
+    customer = login(client, "bench_customer")
+    admin = login(client, "bench_admin")
+
+    client.post("/cart/add", json={"product_id": product_ids[0], "quantity": 5}, headers=customer)
+    cart_item_id = client.get("/cart", headers=customer).get_json()["data"][0]["cart_item_id"]
+
+    state = {"product": 0, "change": 1, "search": 0, "typed": 0, "filter": 0}
+    queries = ("cake", "cake 001", "category 2", "benchmark number 4")
+    filters = ({}, {"discounted": "true"}, {"min_price": 5, "max_price": 20}, {"in_stock": "true", "category_id": 2})
+    products_etag = {"If-None-Match": client.get("/products").headers.get("ETag", "")}
+
+    def product_detail():
+        state["product"] = (state["product"] + 1) % len(product_names)
+        return client.get(f"/product/{product_names[state['product']]}", headers=customer)
+
+    def search():
+        state["search"] = (state["search"] + 1) % len(queries)
+        return client.get("/products/search", query_string={"q": queries[state["search"]]})
+
+    def autocomplete():
+        name = product_names[state["product"]]
+        state["typed"] = state["typed"] % len(name) + 1
+        return client.get("/products/autocomplete", query_string={"q": name[:state["typed"]]})
+
+    def facets():
+        state["filter"] = (state["filter"] + 1) % len(filters)
+        return client.get("/products/facets", query_string=filters[state["filter"]])
+
+    def cart_update():
+        state["change"] = -state["change"]
+        return client.post("/cart/update", json={"cart_item_id": cart_item_id, "change": state["change"]},
+                           headers=customer)
+
+    def refill_cart():
+        client.post("/cart/add", json={"product_id": product_ids[1], "quantity": 1}, headers=customer)
+
+    def checkout():
+        return client.post("/checkout", json={"shipping_address": "1 Bench St", "payment_method": "Credit Card"},
+                           headers=customer)
+
+    return [
+        ("products", None, lambda: client.get("/products")),
+        ("products_304", None, lambda: client.get("/products", headers=products_etag)),
+        ("product_detail", None, product_detail),
+        ("search", None, search),
+        ("autocomplete", None, autocomplete),
+        ("facets", None, facets),
+        ("cart", None, lambda: client.get("/cart", headers=customer)),
+        ("cart_update", None, cart_update),
+        ("checkout", refill_cart, checkout),
+        ("orders", None, lambda: client.get("/orders", headers=customer)),
+        ("admin", None, lambda: client.get("/admin", headers=admin)),
+    ]
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_scenario(setup, call, iterations, warmup):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        call()
+
+    timings = []
+    errors = 0
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        response = call()
+        timings.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors += 1
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "requests": iterations,
+        "errors": errors,
+        "throughput_rps": round(iterations / total, 1) if total else 0.0,
+        "mean_ms": round(total / iterations * 1000, 3),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against ``baseline``; return the regressed scenarios."""
+    regressions = []
+    print(f"\n{'scenario':<16}{'p95 base':>10}{'p95 now':>10}{'change':>9}{'rps base':>11}{'rps now':>10}{'change':>9}")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            print(f"{name:<16}  (not in baseline)")
+            continue
+        p95_change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] if previous["p95_ms"] else 0.0
+        rps_change = ((current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"]
+                      if previous["throughput_rps"] else 0.0)
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<16}{previous['p95_ms']:>10.3f}{current['p95_ms']:>10.3f}{p95_change:>+9.1%}"
+              f"{previous['throughput_rps']:>11.1f}{current['throughput_rps']:>10.1f}{rps_change:>+9.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--reviews-per-product", type=int, default=5)
+    parser.add_argument("--only", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"write the results as the new baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative p95/throughput change counted as a regression (default 0.15)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--replica", action="store_true",
+                        help="serve read-only endpoints from a second SQLite file")
+    parser.add_argument("--no-catalog-cache", action="store_true",
+                        help="disable the GET /products response cache")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_routes_")
+    overrides = {"CATALOG_CACHE_SIZE": 0} if args.no_catalog_cache else {}
+    app = make_app(workdir, replica=args.replica, **overrides)
+    product_names, product_ids = seed(app, args.products, args.reviews_per_product)
+    if args.replica:
+        replicate(workdir)
+    client = app.test_client()
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "dataset": {"products": args.products, "reviews_per_product": args.reviews_per_product},
+        "replica": args.replica,
+        "catalog_cache": not args.no_catalog_cache,
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<16}{'req/s':>9}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}  (ms)")
+    for name, setup, call in build_scenarios(client, product_names, product_ids):
+        if args.only and name not in args.only:
+            continue
+        stats = run_scenario(setup, call, args.iterations, args.warmup)
+        results["scenarios"][name] = stats
+        print(f"{name:<16}{stats['throughput_rps']:>9.1f}{stats['mean_ms']:>9.3f}{stats['p50_ms']:>9.3f}"
+              f"{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}{stats['errors']:>8}")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nWrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
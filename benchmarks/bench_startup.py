@@ -0,0 +1,155 @@
+"""Cold-start benchmark: import time and time to first request.
+
+Every run is a fresh interpreter that imports ``backend``, builds the app
+with ``create_app`` against a SQLite database seeded once up front, and
+serves a single ``GET /products`` through the test client. Each phase is
+timed inside the child; ``process`` is the parent's wall-clock time for
+the whole child, interpreter startup included.
+
+Runs are repeated for each ``SCHEMA_CHECK`` mode so the cost of
+``db.create_all()`` on boot can be compared with the cached fingerprint
+and with skipping the check:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --modes create_all skip --runs 20
+    python benchmarks/bench_startup.py --importtime    # slowest imports of ``backend``
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_routes import percentile  # noqa: E402
+
+MODES = ("create_all", "fingerprint", "skip")
+PHASES = ("import", "create_app", "first_request", "process")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import backend
+imported = time.perf_counter()
+from benchmarks.bench_routes import make_app
+setup = time.perf_counter()
+app = make_app(sys.argv[1], SCHEMA_CHECK=sys.argv[2])
+created = time.perf_counter()
+response = app.test_client().get("/products")
+served = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import": (imported - started) * 1000,
+    "create_app": (created - setup) * 1000,
+    "first_request": (served - created) * 1000,
+}))
+"""
+
+
+def prepare(workdir, products):
+    from benchmarks.bench_routes import make_app, seed
+
+    app = make_app(workdir, SCHEMA_CHECK="create_all")
+    seed(app, products, 1)
+
+
+def run_child(workdir, mode, python_flags=()):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, *python_flags, "-c", CHILD, workdir, mode],
+                          capture_output=True, text=True, cwd=ROOT, env=env)
+    elapsed = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup run failed ({mode}):\n{proc.stderr}")
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    timings["process"] = elapsed
+    return timings, proc.stderr
+
+
+def summarize(samples):
+    stats = {}
+    for phase in PHASES:
+        values = sorted(sample[phase] for sample in samples)
+        stats[phase] = {
+            "min_ms": round(values[0], 2),
+            "p50_ms": round(percentile(values, 50), 2),
+            "max_ms": round(values[-1], 2),
+        }
+    stats["errors"] = sum(1 for sample in samples if sample["status"] >= 400)
+    return stats
+
+
+def slowest_imports(workdir, limit):
+    """The slowest imports (cumulative ``-X importtime``) triggered by ``import backend``."""
+    _, stderr = run_child(workdir, "skip", ("-X", "importtime"))
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative), depth, name.strip()))
+    rows.sort(reverse=True)
+    print(f"\n{'cumulative':>12}  module")
+    for cumulative, depth, name in rows[:limit]:
+        print(f"{cumulative / 1000:>10.1f}ms  {'  ' * depth}{name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="untimed runs per mode (the first fingerprint run writes the cache)")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--importtime", nargs="?", type=int, const=25, metavar="N",
+                        help="also list the N slowest imports (default 25)")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    prepare(workdir, args.products)
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "modes": {},
+    }
+
+    print(f"{'mode':<13}{'phase':<15}{'min':>9}{'p50':>9}{'max':>9}  (ms)")
+    for mode in args.modes:
+        fingerprint = os.path.join(workdir, "schema_fingerprint.json")
+        if os.path.exists(fingerprint):
+            os.remove(fingerprint)
+        for _ in range(args.warmup):
+            run_child(workdir, mode)
+        stats = summarize([run_child(workdir, mode)[0] for _ in range(args.runs)])
+        results["modes"][mode] = stats
+        for phase in PHASES:
+            row = stats[phase]
+            print(f"{mode:<13}{phase:<15}{row['min_ms']:>9.1f}{row['p50_ms']:>9.1f}{row['max_ms']:>9.1f}")
+        if stats["errors"]:
+            print(f"{mode:<13}{stats['errors']} first requests failed")
+
+    if args.importtime:
+        slowest_imports(workdir, args.importtime)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Index advisor: query plans of every registered statement, with scans flagged.
+
+Runs each statement from ``backend.statements`` once with representative
+parameters taken from the data (the heaviest customer, the most reviewed
+product, ...) and prints its plan:
+
+* SQL Server - the statement runs under ``SET SHOWPLAN_XML ON``, so nothing
+  executes; stored procedures report the plan of every statement inside.
+* SQLite     - through the procedure emulation of ``sqlite_procedures.py``,
+  inside a transaction that is rolled back. Every SQL statement that
+  reaches SQLite (including the ones an emulated procedure runs) is run
+  again under ``EXPLAIN QUERY PLAN``.
+
+Table scans, full index scans, key lookups and sorts are flagged, except
+on the statements listed in ``EXPECTED_SCANS``, whose job is to read the
+whole table. Point it at the database the data generator filled:
+
+    python -m backend.init_db --scale small
+    python benchmarks/index_advisor.py                         # DATABASE_URL
+    python benchmarks/index_advisor.py --url sqlite:////tmp/shop.db
+
+or let it build a throwaway SQLite database with generated data, with or
+without the secondary indexes the models declare:
+
+    python benchmarks/index_advisor.py --local
+    python benchmarks/index_advisor.py --local --drop-indexes --only-flagged
+"""
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from benchmarks.sqlite_procedures import engine_options  # noqa: E402
+from backend import create_app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import Cart, Category, Order, Product, ProductReview, User  # noqa: E402
+from backend.models.CartDetail import CartDetails  # noqa: E402
+from backend.scale_data import SCALES  # noqa: E402
+from backend.statements import STATEMENTS, Projection, Statement  # noqa: E402
+
+EXPECTED_SCANS = {
+    "admin.count_products": "counts the whole table",
+    "admin.count_users": "counts the whole table",
+    "admin.order_stats": "aggregates the whole table",
+    "admin.products": "lists every product",
+    "admin.all_users": "lists every user",
+    "admin.users": "lists every user",
+    "admin.products_table_exists": "catalog view",
+    "category.all": "lists every category",
+    "product.all": "lists the catalogue; a category filter seeks",
+    "product.detail_page": "scans the one page of reviews it has already sought and materialized",
+    "product.bestsellers": "walks the primary key newest first and stops after 8 rows",
+    "product.sample": "reads any one row",
+    "search.documents": "loads the active catalogue into the search index",
+    "ping": "no table",
+    "product.page.newest": "walks the primary key newest first and stops after a page",
+    "product.page.name": "walks the name index and stops after a page",
+    "product.page.price": "walks the price index and stops after a page",
+    "product.page.price_desc": "walks the price index backwards and stops after a page",
+}
+EXPECTED_SCANS.update({name: "orders on ISNULL(discount, 0), which no index holds"
+                       for name in STATEMENTS if name.startswith("product.page.discount")})
+
+# Values for the parameters that are not looked up in the data
+LITERALS = {
+    "quantity": 1, "new_quantity": 2, "page": 1, "per_page": 10, "rating": 5, "is_admin": 0, "is_active": 1,
+    "review_text": "index advisor", "shipping_address": "1 Advisor St", "total_amount": 10,
+    "payment_method": "Credit Card", "description": "", "product_description": "", "price": 10, "stock": 1,
+    "image_url": "", "discount": 0, "limit": 25, "after_key": 10, "after_id": 1, "offset": 0,
+}
+
+SHOWPLAN_NS = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+SQLSERVER_SCANS = {"Table Scan": "table scan", "Clustered Index Scan": "index scan", "Index Scan": "index scan"}
+SKIPPED_SQL = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|PRAGMA|EXPLAIN)\b", re.IGNORECASE)
+
+
+def statement_routes():
+    """Map each statement name to the route modules that use it."""
+    import backend.routes
+
+    routes = {}
+    for info in pkgutil.iter_modules(backend.routes.__path__):
+        module = importlib.import_module(f"backend.routes.{info.name}")
+        for value in vars(module).values():
+            statements = value.values() if isinstance(value, dict) else (value,)
+            for statement in statements:
+                if isinstance(statement, Projection):
+                    statement = statement.full
+                if isinstance(statement, Statement):
+                    routes.setdefault(statement.name, []).append(info.name)
+    return routes
+
+
+def sample_parameters(session):
+    """Representative values: the heaviest customer, the most reviewed product, and so on."""
+    def first(query, default=None):
+        value = session.execute(query.limit(1)).scalar()
+        return default if value is None else value
+
+    user_id = first(select(Order.user_id).where(Order.user_id.isnot(None))
+                    .group_by(Order.user_id).order_by(func.count().desc()), 1)
+    product_id = first(select(ProductReview.product_id).where(ProductReview.product_id.isnot(None))
+                       .group_by(ProductReview.product_id).order_by(func.count().desc()),
+                       first(select(Product.id).order_by(Product.id), 1))
+    params = dict(LITERALS)
+    params.update(
+        user_id=user_id,
+        caller_user_id=user_id,
+        username=first(select(User.username).where(User.id == user_id), ""),
+        product_id=product_id,
+        product_name=first(select(Product.product_name).where(Product.id == product_id), ""),
+        category_id=first(select(Product.category_id).group_by(Product.category_id)
+                          .order_by(func.count().desc()), first(select(Category.id), 1)),
+        order_id=first(select(Order.id).where(Order.user_id == user_id).order_by(Order.id.desc()), 1),
+        cart_id=first(select(Cart.id).where(Cart.user_id == user_id).order_by(Cart.id.desc()), 1),
+        cart_item_id=first(select(CartDetails.id).order_by(CartDetails.id.desc()), 1),
+    )
+    return params
+
+
+def classify_sqlite(detail):
+    if detail.startswith("SCAN ") and not detail.startswith("SCAN CONSTANT ROW"):
+        return "index scan" if " USING " in detail else "table scan"
+    if detail.startswith("USE TEMP B-TREE"):
+        return "sort"
+    return None
+
+
+def explain_sqlite(connection, statement, params):
+    """Plan lines of every SQL statement ``statement`` sends to SQLite."""
+    raw = connection.connection.dbapi_connection
+    captured = []
+    trans = connection.begin()
+    try:
+        raw.set_trace_callback(captured.append)
+        try:
+            statement.execute(params, session=connection)
+        finally:
+            raw.set_trace_callback(None)
+
+        plans = []
+        cursor = raw.cursor(sqlite3.Cursor)
+        for sql in dict.fromkeys(captured):
+            if SKIPPED_SQL.match(sql):
+                continue
+            steps = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            plans.append({
+                "sql": " ".join(sql.split()),
+                "steps": [{"detail": step, "flag": classify_sqlite(step)} for step in steps],
+            })
+        return plans
+    finally:
+        trans.rollback()
+
+
+def explain_sqlserver(connection, statement, params):
+    """Scan, lookup and sort operators from the estimated plan of ``statement``."""
+    connection.exec_driver_sql("SET SHOWPLAN_XML ON")
+    try:
+        result = statement.execute(params, session=connection)
+        cursor = result.context.cursor
+        documents = []
+        while True:
+            documents.extend(row[0] for row in cursor.fetchall())
+            if not cursor.nextset():
+                break
+    finally:
+        connection.exec_driver_sql("SET SHOWPLAN_XML OFF")
+
+    plans = []
+    for document in documents:
+        root = ElementTree.fromstring(document)
+        for stmt in root.iter(f"{SHOWPLAN_NS}StmtSimple"):
+            steps = []
+            for relop in stmt.iter(f"{SHOWPLAN_NS}RelOp"):
+                op = relop.get("PhysicalOp")
+                target = relop.find(f"./*/{SHOWPLAN_NS}Object")
+                flag = SQLSERVER_SCANS.get(op)
+                if relop.find(f"./{SHOWPLAN_NS}IndexScan[@Lookup='1']") is not None:
+                    flag = "key lookup"
+                elif op == "Sort":
+                    flag = "sort"
+                detail = op
+                if target is not None:
+                    detail += f" {target.get('Table', '')}.{target.get('Index', '')}".rstrip(".")
+                detail += f" (est. {float(relop.get('EstimateRows', 0)):.0f} rows)"
+                steps.append({"detail": detail, "flag": flag})
+            plans.append({"sql": " ".join((stmt.get("StatementText") or "").split()), "steps": steps})
+    return plans
+
+
+def advise(app, only=None):
+    routes = statement_routes()
+    with app.app_context():
+        params = sample_parameters(db.session)
+        db.session.remove()
+        explain = explain_sqlite if db.engine.dialect.name == "sqlite" else explain_sqlserver
+        report = []
+        with db.engine.connect() as connection:
+            for name, statement in sorted(STATEMENTS.items()):
+                if only and not name.startswith(tuple(only)):
+                    continue
+                entry = {"statement": name, "routes": routes.get(name, []), "expected": EXPECTED_SCANS.get(name)}
+                try:
+                    entry["plans"] = explain(connection, statement, params)
+                except Exception as e:
+                    entry["plans"] = []
+                    entry["error"] = str(e).splitlines()[0]
+                entry["flags"] = sorted({step["flag"] for plan in entry["plans"]
+                                         for step in plan["steps"] if step["flag"]})
+                entry["flagged"] = bool(entry["flags"]) and not entry["expected"]
+                report.append(entry)
+    return params, report
+
+
+def print_report(report, only_flagged=False):
+    for entry in report:
+        if only_flagged and not (entry["flagged"] or entry.get("error")):
+            continue
+        marker = "!!" if entry["flagged"] else "  "
+        where = ", ".join(entry["routes"]) or "unused"
+        note = f" - expected: {entry['expected']}" if entry["expected"] and entry["flags"] else ""
+        print(f"{marker} {entry['statement']} [{where}]{note}")
+        if entry.get("error"):
+            print(f"     error: {entry['error']}")
+        for plan in entry["plans"]:
+            print(f"     {plan['sql'][:110]}")
+            for step in plan["steps"]:
+                flag = f"   <- {step['flag']}" if step["flag"] else ""
+                print(f"       {step['detail']}{flag}")
+
+    flagged = [entry["statement"] for entry in report if entry["flagged"]]
+    errors = [entry["statement"] for entry in report if entry.get("error")]
+    print(f"\n{len(report)} statements, {len(flagged)} flagged, {len(errors)} could not be planned")
+    if flagged:
+        print("flagged: " + ", ".join(flagged))
+
+
+def local_app(args):
+    """A throwaway SQLite database filled by the scale data generator."""
+    from benchmarks.bench_routes import make_app
+    from backend.scale_data import generate_scale_data
+
+    workdir = tempfile.mkdtemp(prefix="index_advisor_")
+    app = make_app(workdir)
+    with app.app_context():
+        if args.drop_indexes:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.drop(db.engine)
+        started = time.perf_counter()
+        generate_scale_data(db.engine, args.scale, seed=args.seed)
+        print(f"Generated {args.scale} scale data in {time.perf_counter() - started:.1f}s ({workdir})")
+    return app
+
+
+def url_app(url):
+    config = {"SQLALCHEMY_DATABASE_URI": url, "SCHEMA_CHECK": "skip", "LOG_LEVEL": "ERROR"}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(parsed.database)
+    return create_app(config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="database to plan against (default: DATABASE_URL)")
+    target.add_argument("--local", action="store_true", help="generate a temporary SQLite database")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="data size for --local")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop-indexes", action="store_true",
+                        help="with --local, drop the models' secondary indexes before generating")
+    parser.add_argument("--statements", nargs="+", metavar="PREFIX", help="only statements starting with these")
+    parser.add_argument("--only-flagged", action="store_true")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    if args.local:
+        app = local_app(args)
+    else:
+        url = args.url or os.getenv("DATABASE_URL")
+        if not url:
+            parser.error("set DATABASE_URL, or pass --url or --local")
+        app = url_app(url)
+
+    params, report = advise(app, args.statements)
+    print_report(report, args.only_flagged)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as fh:
+            json.dump({"created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                       "parameters": params, "statements": report}, fh, indent=2, default=str)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Mixed-traffic load test replaying weighted shopper sessions.
+
+Worker threads repeatedly pick a session script by weight and replay it
+against a running app over HTTP:
+
+* ``browser`` - ``/products``, ``/categories``, ``/bestsellers`` (when the
+  target serves it) and a category-filtered ``/products``
+* ``shopper`` - log in, browse, ``/cart/add``, ``/cart``, ``/cart/update``
+  and ``POST /checkout``
+* ``admin``   - log in once, then poll ``/admin``
+
+Concurrency is ramped through ``--stages``; for every stage the report
+shows throughput, p50/p95/p99 latency and error rate per step, and the
+stage totals show where throughput stops scaling (the saturation point).
+Steps whose latency grows much faster than the rest (``checkout`` runs
+``CreateOrder``, which updates stock rows) point at contention.
+
+Against a running server, with accounts created by
+``python -m backend.init_db --scale small`` (password ``password``):
+
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 \\
+        --shopper "scale_user_{n}" --shopper-range 2-2001 --admin admin:admin123
+
+Or fully local, on a threaded dev server over the SQLite procedure
+emulation with generated data. The app does not register the bestsellers
+blueprint; the local server registers it for the load test only:
+
+    python benchmarks/load_test.py --local --stages 1,2,4,8,16 --stage-seconds 15
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAYMENT_METHODS = ("Credit Card", "PayPal", "Cash on Delivery")
+
+
+class Client:
+    """Keep-alive HTTP client for one worker thread."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.timeout = timeout
+        self.conn = None
+        self.token = None
+        self.tokens = {}
+
+    def request(self, method, path, body=None, auth=False):
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.getheader("Connection", "").lower() == "close":
+                    self.close()
+                return response.status, data
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Stale keep-alive connection; retry once on a fresh one
+                self.close()
+                if attempt:
+                    raise
+
+    def json(self, method, path, body=None, auth=False):
+        status, data = self.request(method, path, body, auth)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class StageOver(Exception):
+    """Raised inside a session script once the stage deadline has passed."""
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, step, elapsed, status):
+        with self.lock:
+            self.timings[step].append(elapsed)
+            self.statuses[step][status] += 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[step] += 1
+
+
+class Session:
+    """One virtual user's view of the app, shared by the session scripts."""
+
+    def __init__(self, client, recorder, catalog, accounts, args, rng, deadline):
+        self.client = client
+        self.recorder = recorder
+        self.catalog = catalog
+        self.accounts = accounts
+        self.args = args
+        self.rng = rng
+        self.deadline = deadline
+
+    def step(self, name, method, path, body=None, auth=False):
+        if time.monotonic() >= self.deadline:
+            raise StageOver
+        started = time.perf_counter()
+        try:
+            status, data = self.client.json(method, path, body, auth)
+        except Exception as e:
+            status, data = type(e).__name__, None
+        self.recorder.record(name, time.perf_counter() - started, status)
+        if self.args.think:
+            time.sleep(self.rng.expovariate(1000 / self.args.think))
+        return status, data
+
+    def login(self, username, password, reuse=False):
+        """Log in as ``username``; with ``reuse`` an earlier token for it is kept."""
+        if reuse and username in self.client.tokens:
+            self.client.token = self.client.tokens[username]
+            return True
+        status, data = self.step("login", "POST", "/login", {"username": username, "pass_word": password})
+        self.client.token = data.get("token") if status == 200 and data else None
+        if self.client.token is None:
+            return False
+        self.client.tokens[username] = self.client.token
+        return True
+
+    def product(self):
+        # Popular products get most of the traffic
+        index = min(int(self.rng.paretovariate(1.2)) - 1, len(self.catalog["products"]) - 1)
+        return self.catalog["products"][index]
+
+
+def browser(session):
+    session.step("products", "GET", "/products")
+    session.step("categories", "GET", "/categories")
+    if session.catalog["bestsellers"]:
+        session.step("bestsellers", "GET", "/bestsellers")
+    if session.catalog["categories"]:
+        category_id = session.rng.choice(session.catalog["categories"])
+        session.step("products_by_category", "GET", f"/products?category_id={category_id}")
+
+
+def shopper(session):
+    if not session.accounts["shoppers"]:
+        return browser(session)
+    username, password = session.rng.choice(session.accounts["shoppers"])
+    if not session.login(username, password):
+        return
+
+    session.step("products", "GET", "/products")
+    for _ in range(session.rng.randint(1, 3)):
+        product = session.product()
+        session.step("product_detail", "GET", f"/product/{quote(product['product_name'])}", auth=True)
+        session.step("cart_add", "POST", "/cart/add",
+                     {"product_id": product["id"], "quantity": session.rng.randint(1, 3)}, auth=True)
+
+    status, cart = session.step("cart", "GET", "/cart", auth=True)
+    items = (cart or {}).get("data") or []
+    if status == 200 and items:
+        session.step("cart_update", "POST", "/cart/update",
+                     {"cart_item_id": items[0]["cart_item_id"], "change": 1}, auth=True)
+
+    if session.rng.random() < session.args.checkout_rate:
+        session.step("checkout", "POST", "/checkout",
+                     {"shipping_address": "1 Load Test Road", "payment_method": session.rng.choice(PAYMENT_METHODS)},
+                     auth=True)
+
+
+def admin(session):
+    if not session.accounts["admin"]:
+        return browser(session)
+    if not session.login(*session.accounts["admin"], reuse=True):
+        return
+    for _ in range(5):
+        session.step("admin", "GET", "/admin", auth=True)
+
+
+SCRIPTS = {"browser": browser, "shopper": shopper, "admin": admin}
+
+
+def worker(base_url, recorder, catalog, accounts, args, seed, deadline):
+    rng = random.Random(seed)
+    client = Client(base_url, args.timeout)
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    try:
+        while time.monotonic() < deadline:
+            script = SCRIPTS[rng.choices(names, weights)[0]]
+            client.token = None
+            try:
+                script(Session(client, recorder, catalog, accounts, args, rng, deadline))
+            except StageOver:
+                break
+    finally:
+        client.close()
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(recorder, duration):
+    steps = {}
+    for step, timings in sorted(recorder.timings.items()):
+        timings.sort()
+        steps[step] = {
+            "requests": len(timings),
+            "errors": recorder.errors[step],
+            "error_rate": round(recorder.errors[step] / len(timings), 4),
+            "throughput_rps": round(len(timings) / duration, 1),
+            "p50_ms": round(percentile(timings, 50) * 1000, 2),
+            "p95_ms": round(percentile(timings, 95) * 1000, 2),
+            "p99_ms": round(percentile(timings, 99) * 1000, 2),
+            "statuses": {str(status): count for status, count in recorder.statuses[step].items()},
+        }
+
+    everything = sorted(t for timings in recorder.timings.values() for t in timings)
+    errors = sum(recorder.errors.values())
+    total = {
+        "requests": len(everything),
+        "errors": errors,
+        "error_rate": round(errors / len(everything), 4) if everything else 0.0,
+        "throughput_rps": round(len(everything) / duration, 1),
+        "p50_ms": round(percentile(everything, 50) * 1000, 2),
+        "p95_ms": round(percentile(everything, 95) * 1000, 2),
+        "p99_ms": round(percentile(everything, 99) * 1000, 2),
+    }
+    return steps, total
+
+
+def run_stage(base_url, concurrency, catalog, accounts, args, stage_index):
+    recorder = Recorder()
+    deadline = time.monotonic() + args.stage_seconds
+    threads = [
+        threading.Thread(target=worker, daemon=True,
+                         args=(base_url, recorder, catalog, accounts, args, args.seed * 1000 + stage_index * 100 + i,
+                               deadline))
+        for i in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, max(time.monotonic() - started, 1e-9))
+
+
+def print_stage(concurrency, steps, total):
+    print(f"\n== concurrency {concurrency}: {total['throughput_rps']:.1f} req/s, p95 {total['p95_ms']:.1f}ms, "
+          f"errors {total['error_rate']:.2%}")
+    print(f"  {'step':<22}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>9}")
+    for step, stats in steps.items():
+        print(f"  {step:<22}{stats['throughput_rps']:>8.1f}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+              f"{stats['p99_ms']:>9.1f}{stats['error_rate']:>9.2%}")
+
+
+def find_saturation(stages, min_gain):
+    """First stage whose throughput gain over the previous one is below ``min_gain``."""
+    for previous, current in zip(stages, stages[1:]):
+        before, after = previous["total"]["throughput_rps"], current["total"]["throughput_rps"]
+        if before and (after - before) / before < min_gain:
+            return previous["concurrency"]
+    return None
+
+
+def load_catalog(base_url, timeout):
+    client = Client(base_url, timeout)
+    status, data = client.json("GET", "/products")
+    products = [p for p in (data or {}).get("products", []) if p.get("stock", 1) > 0]
+    status_c, data_c = client.json("GET", "/categories")
+    status_b, _ = client.json("GET", "/bestsellers")
+    client.close()
+    if status != 200 or not products:
+        raise SystemExit(f"Could not load products from {base_url}/products (status {status})")
+    return {"products": products, "categories": [c["id"] for c in (data_c or {}).get("categories", [])],
+            "bestsellers": status_b == 200}
+
+
+def parse_range(value):
+    first, _, last = value.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def start_local_server(args):
+    """Boot the app on the SQLite procedure emulation with generated data."""
+    from werkzeug.serving import make_server
+
+    from benchmarks.bench_routes import make_app
+    from backend.extensions import db
+    from backend.models import User
+    from backend.passwords import password_hasher
+    from backend.routes.bestsellers import bestsellers_bp
+    from backend.scale_data import generate_scale_data
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    app = make_app(workdir)
+    app.register_blueprint(bestsellers_bp)
+    with app.app_context():
+        db.session.add(User(username="load_admin", pass_word=password_hasher.hash("password"),
+                            email="load_admin@example.com", full_name="Load Admin", user_role="Admin"))
+        db.session.commit()
+        first_user = db.session.query(db.func.max(User.id)).scalar() + 1
+        generate_scale_data(db.engine, "small", seed=args.seed, users=args.local_users, products=args.local_products,
+                            orders=args.local_users * 2, order_details=args.local_users * 6,
+                            reviews=args.local_products * 5, wishlist=args.local_users)
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    shoppers = [(f"scale_user_{n}", "password") for n in range(first_user, first_user + args.local_users)]
+    return server, f"http://127.0.0.1:{server.server_port}", shoppers, ("load_admin", "password")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running app")
+    target.add_argument("--local", action="store_true", help="start a local server on SQLite with generated data")
+    parser.add_argument("--stages", default="1,2,4,8,16,32", help="comma-separated concurrency levels")
+    parser.add_argument("--stage-seconds", type=float, default=20)
+    parser.add_argument("--mix", default="browser=70,shopper=25,admin=5", help="session weights")
+    parser.add_argument("--think", type=float, default=0, help="mean think time between steps in ms")
+    parser.add_argument("--checkout-rate", type=float, default=0.3, help="share of shopper sessions that check out")
+    parser.add_argument("--shopper", default="scale_user_{n}", help="shopper username template")
+    parser.add_argument("--shopper-range", help="values of {n} for shopper accounts, e.g. 2-2001")
+    parser.add_argument("--shopper-password", default="password")
+    parser.add_argument("--admin", help="admin credentials as username:password")
+    parser.add_argument("--local-users", type=int, default=500)
+    parser.add_argument("--local-products", type=int, default=500)
+    parser.add_argument("--min-gain", type=float, default=0.05,
+                        help="throughput gain below which the previous stage is reported as saturated")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+    args.mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+    unknown = set(args.mix) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"Unknown session scripts: {', '.join(sorted(unknown))}")
+
+    server = None
+    if args.local:
+        server, base_url, shoppers, admin_account = start_local_server(args)
+    else:
+        base_url = args.url.rstrip("/")
+        shoppers = ([(args.shopper.format(n=n), args.shopper_password) for n in parse_range(args.shopper_range)]
+                    if args.shopper_range else [])
+        admin_account = tuple(args.admin.split(":", 1)) if args.admin else None
+
+    accounts = {"shoppers": shoppers, "admin": admin_account}
+    catalog = load_catalog(base_url, args.timeout)
+    print(f"Target {base_url}: {len(catalog['products'])} products, {len(shoppers)} shopper accounts, "
+          f"admin {'yes' if admin_account else 'no'}, mix {args.mix}")
+
+    stages = []
+    try:
+        for index, concurrency in enumerate(int(c) for c in args.stages.split(",")):
+            steps, total = run_stage(base_url, concurrency, catalog, accounts, args, index)
+            print_stage(concurrency, steps, total)
+            stages.append({"concurrency": concurrency, "total": total, "steps": steps})
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    saturation = find_saturation(stages, args.min_gain)
+    scaling = ", ".join(f"{stage['concurrency']}={stage['total']['throughput_rps']:.0f}" for stage in stages)
+    print(f"\nThroughput (req/s) by concurrency: {scaling}")
+    if saturation is not None:
+        print(f"Throughput stopped scaling after concurrency {saturation}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "target": base_url,
+                "mix": args.mix,
+                "stage_seconds": args.stage_seconds,
+                "saturation_concurrency": saturation,
+                "stages": stages,
+            }, fh, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
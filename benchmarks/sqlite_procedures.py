@@ -0,0 +1,410 @@
+"""SQLite stand-in for the SQL Server stored procedures the routes call.
+
+``connect(path)`` returns a ``sqlite3`` connection whose cursors intercept
+``EXEC <Procedure> @name=?, ...`` and run a Python emulation of the
+procedure from ``database/procedures.sql`` instead. Each emulation ends
+with a ``SELECT`` that produces the same columns as the real procedure
+(or, where a route expects more than the procedure returns, the columns the
+route reads), so the result is consumed exactly as it would be from SQL
+Server. Plain statements get the few T-SQL constructs the routes use
+(``TOP n``, ``OFFSET m ROWS FETCH NEXT n ROWS ONLY``, ``ISNULL``,
+``GETDATE()``) rewritten to SQLite.
+
+Pass it to ``create_app`` through the engine options::
+
+    create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options(path),
+    })
+"""
+import re
+import sqlite3
+
+EXEC_RE = re.compile(r"^\s*EXEC(?:UTE)?\s+(\w+)(.*)$", re.IGNORECASE | re.DOTALL)
+ARG_RE = re.compile(r"@(\w+)\s*=\s*(\?|'(?:[^']|'')*'|NULL|-?\d+(?:\.\d+)?)", re.IGNORECASE)
+TOP_RE = re.compile(r"^(\s*SELECT\s+)TOP\s*\(?\s*(\d+)\s*\)?\s+", re.IGNORECASE)
+
+REWRITES = (
+    (re.compile(r"\bOFFSET\s+0\s+ROWS\s+FETCH\s+NEXT\s+(\?|\d+)\s+ROWS\s+ONLY", re.IGNORECASE), r"LIMIT \1"),
+    (re.compile(r"\bOFFSET\s+(\?|\d+)\s+ROWS\s+FETCH\s+NEXT\s+(\?|\d+)\s+ROWS\s+ONLY", re.IGNORECASE), r"LIMIT \1, \2"),
+    (re.compile(r"\bISNULL\s*\(", re.IGNORECASE), "IFNULL("),
+    (re.compile(r"\bGETDATE\s*\(\s*\)", re.IGNORECASE), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\bLEN\s*\(", re.IGNORECASE), "LENGTH("),
+)
+
+PROCEDURES = {}
+
+
+def procedure(func):
+    PROCEDURES[func.__name__.lower()] = func
+    return func
+
+
+def translate(statement):
+    """Rewrite the T-SQL bits of a plain statement for SQLite."""
+    match = TOP_RE.match(statement)
+    if match:
+        statement = f"{match.group(1)}{statement[match.end():].rstrip().rstrip(';')} LIMIT {match.group(2)}"
+    for pattern, replacement in REWRITES:
+        statement = pattern.sub(replacement, statement)
+    return statement
+
+
+def parse_arguments(arguments, parameters):
+    """Map ``@Name=?`` assignments to values, lower-casing the names."""
+    values = iter(parameters or ())
+    parsed = {}
+    for name, raw in ARG_RE.findall(arguments):
+        if raw == "?":
+            value = next(values)
+        elif raw.upper() == "NULL":
+            value = None
+        elif raw.startswith("'"):
+            value = raw[1:-1].replace("''", "'")
+        else:
+            value = float(raw) if "." in raw else int(raw)
+        parsed[name.lower()] = value
+    return parsed
+
+
+class ProcedureCursor(sqlite3.Cursor):
+    _translated = {}
+
+    def execute(self, sql, parameters=()):
+        match = EXEC_RE.match(sql)
+        if match is None:
+            translated = self._translated.get(sql)
+            if translated is None:
+                translated = self._translated[sql] = translate(sql)
+            return super().execute(translated, parameters)
+
+        name = match.group(1).lower()
+        emulation = PROCEDURES.get(name)
+        if emulation is None:
+            raise sqlite3.OperationalError(f"No SQLite emulation for procedure {match.group(1)}")
+        emulation(self, parse_arguments(match.group(2), parameters))
+        return self
+
+    def result(self, sql, parameters=()):
+        """Run the statement whose rows are the procedure's result set."""
+        return super().execute(sql, parameters)
+
+    def query(self, sql, parameters=()):
+        return self.connection.cursor(sqlite3.Cursor).execute(sql, parameters)
+
+
+class ProcedureConnection(sqlite3.Connection):
+    def cursor(self, factory=ProcedureCursor):
+        return super().cursor(factory)
+
+
+def connect(path):
+    return sqlite3.connect(path, factory=ProcedureConnection, check_same_thread=False)
+
+
+def engine_options(path):
+    return {"creator": lambda: connect(path)}
+
+
+def _status(cursor, status, code, message, **extra):
+    columns = ["? AS status", "? AS StatusCode", "? AS message"]
+    values = [status, code, message]
+    for name, value in extra.items():
+        columns.append(f"? AS {name}")
+        values.append(value)
+    cursor.result(f"SELECT {', '.join(columns)}", values)
+
+
+# Products and reviews
+
+@procedure
+def GetAllProducts(cursor, args):
+    category_id = args.get("category_id")
+    only_active = args.get("only_active", 0)
+    sql = """
+        SELECT p.id, p.product_name, p.product_description, p.price, p.stock,
+               p.category_id, c.category_name, p.image_url, p.discount
+        FROM products p
+        JOIN categories c ON p.category_id = c.id
+        WHERE (? IS NULL OR p.category_id = ?) AND (? = 0 OR p.is_active = 1)
+    """
+    params = (category_id, category_id, only_active)
+    if cursor.query(f"SELECT EXISTS ({sql})", params).fetchone()[0]:
+        cursor.result(sql, params)
+    else:
+        _status(cursor, "fail", 1, "No products found.")
+
+
+@procedure
+def GetProductDetails(cursor, args):
+    cursor.result("""
+        SELECT p.id AS product_id, p.product_name, p.product_description, p.price,
+               p.stock, c.category_name, p.image_url, p.discount
+        FROM products p
+        LEFT JOIN categories c ON p.category_id = c.id
+        WHERE p.product_name = ?
+    """, (args.get("productname"),))
+
+
+@procedure
+def GetReviewsForSpecificProduct(cursor, args):
+    page = args.get("page", 1)
+    per_page = args.get("perpage", 10)
+    cursor.result("""
+        SELECT pr.product_id, p.product_name, pr.user_id, u.full_name AS username,
+               pr.rating, pr.review_text, pr.review_date, p.image_url AS photo_url
+        FROM product_reviews pr
+        JOIN products p ON pr.product_id = p.id
+        JOIN users u ON pr.user_id = u.id
+        WHERE p.product_name = ?
+        ORDER BY pr.review_date DESC
+        LIMIT ? OFFSET ?
+    """, (args.get("productname"), per_page, (page - 1) * per_page))
+
+
+@procedure
+def AddProductReview(cursor, args):
+    rating = args.get("rating")
+    if rating is None or not 1 <= rating <= 5:
+        return _status(cursor, "fail", 1, "Invalid rating. Rating must be between 1 and 5.")
+
+    product = cursor.query("SELECT id FROM products WHERE product_name = ?", (args.get("productname"),)).fetchone()
+    if product is None:
+        return _status(cursor, "fail", 2, "Product not found.")
+    user = cursor.query("SELECT id FROM users WHERE username = ?", (args.get("username"),)).fetchone()
+    if user is None:
+        return _status(cursor, "fail", 3, "User not found.")
+
+    existing = cursor.query(
+        "SELECT review_text FROM product_reviews WHERE product_id = ? AND user_id = ?", (product[0], user[0])
+    ).fetchone()
+    if existing is not None and (existing[0] or "") == (args.get("reviewtext") or ""):
+        return _status(cursor, "fail", 4, "Duplicate review. Your review is identical to the previous one.")
+
+    inserted = cursor.query(
+        "INSERT INTO product_reviews (product_id, user_id, rating, review_text, review_date) "
+        "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+        (product[0], user[0], rating, args.get("reviewtext")),
+    )
+    cursor.result("""
+        SELECT 'success' AS status, 0 AS StatusCode, 'Review successfully added.' AS message,
+               id AS review_id, product_id, user_id, rating, review_text, review_date
+        FROM product_reviews WHERE id = ?
+    """, (inserted.lastrowid,))
+
+
+@procedure
+def DeleteProductReview(cursor, args):
+    deleted = cursor.query("""
+        DELETE FROM product_reviews
+        WHERE product_id = (SELECT id FROM products WHERE product_name = ?)
+          AND user_id = (SELECT id FROM users WHERE username = ?)
+    """, (args.get("productname"), args.get("username")))
+    if deleted.rowcount:
+        _status(cursor, "success", 0, "Review successfully deleted.")
+    else:
+        _status(cursor, "fail", 2, "No review found for this product by this user.")
+
+
+# Cart and orders
+
+@procedure
+def AddToCart(cursor, args):
+    user_id, product_id, quantity = args.get("userid"), args.get("productid"), args.get("quantity")
+    if cursor.query("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone() is None:
+        return cursor.result("SELECT 1 AS StatusCode, 'User not found.' AS Message")
+    product = cursor.query("SELECT price, discount FROM products WHERE id = ?", (product_id,)).fetchone()
+    if product is None:
+        return cursor.result("SELECT 1 AS StatusCode, 'Product not found.' AS Message")
+    if quantity is None or quantity <= 0:
+        return cursor.result("SELECT 1 AS StatusCode, 'Invalid quantity. Must be greater than 0.' AS Message")
+
+    cart = cursor.query("SELECT id FROM cart WHERE user_id = ? AND is_checked_out = 0 LIMIT 1", (user_id,)).fetchone()
+    if cart is None:
+        cart_id = cursor.query(
+            "INSERT INTO cart (user_id, created_date, is_checked_out) VALUES (?, CURRENT_TIMESTAMP, 0)", (user_id,)
+        ).lastrowid
+    else:
+        cart_id = cart[0]
+
+    updated = cursor.query(
+        "UPDATE cart_details SET quantity = quantity + ? WHERE cart_id = ? AND product_id = ?",
+        (quantity, cart_id, product_id),
+    )
+    if updated.rowcount:
+        return cursor.result("SELECT 0 AS StatusCode, 'Product quantity updated in cart successfully!' AS Message")
+
+    cursor.query(
+        "INSERT INTO cart_details (cart_id, product_id, quantity, price, discount, added_date) "
+        "VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+        (cart_id, product_id, quantity, product[0], product[1]),
+    )
+    cursor.result("SELECT 0 AS StatusCode, 'Product added to cart successfully!' AS Message")
+
+
+@procedure
+def CreateOrder(cursor, args):
+    user_id = args.get("userid")
+    if cursor.query("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone() is None:
+        return _status(cursor, "fail", 1, "User not found.", order_id=None)
+    if args.get("paymentmethod") not in ("Credit Card", "PayPal", "Bank Transfer", "Cash on Delivery", "Gift Card"):
+        return _status(cursor, "fail", 4, "Invalid payment method.", order_id=None)
+
+    cart = cursor.query("SELECT id FROM cart WHERE user_id = ? AND is_checked_out = 0", (user_id,)).fetchone()
+    if cart is None:
+        return _status(cursor, "fail", 3, "No active cart found.", order_id=None)
+    cart_id = cart[0]
+    if cursor.query("SELECT 1 FROM cart_details WHERE cart_id = ?", (cart_id,)).fetchone() is None:
+        return _status(cursor, "fail", 3, "Cart is empty. Cannot create order.", order_id=None)
+
+    order_id = cursor.query(
+        "INSERT INTO orders (user_id, order_date, total_amount, status, shipping_address) "
+        "VALUES (?, CURRENT_TIMESTAMP, ?, 'Pending', ?)",
+        (user_id, args.get("totalamount"), args.get("shippingaddress")),
+    ).lastrowid
+    cursor.query(
+        "INSERT INTO payments (order_id, payment_date, amount, payment_method, status) "
+        "VALUES (?, CURRENT_TIMESTAMP, ?, ?, 'Pending')",
+        (order_id, args.get("totalamount"), args.get("paymentmethod")),
+    )
+    cursor.query(
+        "INSERT INTO order_details (order_id, product_id, quantity, price, discount) "
+        "SELECT ?, product_id, quantity, price, discount FROM cart_details WHERE cart_id = ?",
+        (order_id, cart_id),
+    )
+    cursor.query("""
+        UPDATE products
+        SET stock = stock - (SELECT cd.quantity FROM cart_details cd WHERE cd.cart_id = ? AND cd.product_id = products.id)
+        WHERE id IN (SELECT product_id FROM cart_details WHERE cart_id = ?)
+    """, (cart_id, cart_id))
+    cursor.query("UPDATE cart SET is_checked_out = 1 WHERE id = ?", (cart_id,))
+    _status(cursor, "success", 0, "Order created successfully!", order_id=order_id)
+
+
+@procedure
+def GetOrderDetails(cursor, args):
+    order_id = args.get("order_id")
+    order = cursor.query("SELECT user_id FROM orders WHERE id = ?", (order_id,)).fetchone()
+    if order is None:
+        return cursor.result("SELECT 'fail' AS status, 'Order not found.' AS message")
+    if "is_admin" in args and not args["is_admin"] and order[0] != args.get("caller_user_id"):
+        return cursor.result("SELECT 'fail' AS status, 'You are not authorized to view this order.' AS message")
+
+    cursor.result("""
+        SELECT o.id, o.user_id, u.username, u.full_name, u.user_address, u.phone_number,
+               o.total_amount, o.status, o.order_date
+        FROM orders o
+        JOIN users u ON o.user_id = u.id
+        WHERE o.id = ?
+    """, (order_id,))
+
+
+@procedure
+def GetOrderItems(cursor, args):
+    cursor.result("""
+        SELECT p.product_name AS ProductName, od.quantity AS Quantity, od.price AS UnitPrice,
+               od.quantity * od.price * (1 - IFNULL(od.discount, 0) / 100.0) AS TotalPrice
+        FROM order_details od
+        JOIN products p ON od.product_id = p.id
+        WHERE od.order_id = ?
+        ORDER BY p.product_name
+    """, (args.get("order_id"),))
+
+
+@procedure
+def GetAllOrders(cursor, args):
+    # The route passes @user_id and reads GetUserOrders-shaped rows
+    cursor.result("""
+        SELECT id, total_amount, status, order_date
+        FROM orders
+        WHERE ? IS NULL OR user_id = ?
+    """, (args.get("user_id"), args.get("user_id")))
+
+
+@procedure
+def CancelOrder(cursor, args):
+    order = cursor.query("SELECT status FROM orders WHERE id = ?", (args.get("order_id"),)).fetchone()
+    if order is None:
+        return cursor.result("SELECT 'fail' AS status, 'Order not found.' AS message")
+    if order[0] in ("shipped", "delivered"):
+        return cursor.result("SELECT 'fail' AS status, 'Cannot cancel order in this status.' AS message")
+    cursor.result("SELECT 'success' AS status, 'Order canceled successfully.' AS message")
+
+
+# Admin
+
+@procedure
+def GetAllUsers(cursor, args):
+    if cursor.query("SELECT 1 FROM users LIMIT 1").fetchone() is None:
+        return _status(cursor, "fail", 1, "No users found.")
+    cursor.result("SELECT id, username, email, full_name, user_address, phone_number, user_role FROM users")
+
+
+@procedure
+def AddNewProduct(cursor, args):
+    price, stock = args.get("price"), args.get("stock")
+    if price is None or price <= 0:
+        return cursor.result("SELECT 'fail' AS status, 'Invalid price value. Please enter a positive value.' AS message")
+    if stock is None or stock < 0:
+        return cursor.result("SELECT 'fail' AS status, 'Invalid stock value. Stock cannot be negative.' AS message")
+    if cursor.query("SELECT 1 FROM categories WHERE id = ?", (args.get("category_id"),)).fetchone() is None:
+        return cursor.result("SELECT 'fail' AS status, 'Invalid category_id. The category does not exist.' AS message")
+
+    existing = cursor.query("SELECT id, price FROM products WHERE product_name = ?", (args.get("product_name"),)).fetchone()
+    if existing is None:
+        cursor.query(
+            "INSERT INTO products (product_name, product_description, price, stock, category_id, image_url, discount, is_active) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+            (args.get("product_name"), args.get("description"), price, stock, args.get("category_id"),
+             args.get("image_url"), args.get("discount") or 0),
+        )
+        return cursor.result("SELECT 'success' AS status, 'New product added successfully!' AS message")
+
+    cursor.query("UPDATE products SET stock = stock + ?, price = ? WHERE id = ?", (stock, price, existing[0]))
+    cursor.result("SELECT 'success' AS status, 'Product exists. Stock updated successfully!' AS message")
+
+
+@procedure
+def UpdateProduct(cursor, args):
+    cursor.query("""
+        UPDATE products SET
+            product_name = COALESCE(?, product_name),
+            product_description = COALESCE(?, product_description),
+            price = COALESCE(?, price),
+            stock = COALESCE(?, stock),
+            category_id = COALESCE(?, category_id),
+            image_url = COALESCE(?, image_url),
+            discount = COALESCE(?, discount),
+            is_active = COALESCE(?, is_active)
+        WHERE id = ?
+    """, tuple(args.get(name) for name in (
+        "product_name", "product_description", "price", "stock", "category_id",
+        "image_url", "discount", "is_active", "product_id",
+    )))
+    cursor.result("SELECT 'success' AS status, 0 AS StatusCode, 'Product updated.' AS message")
+
+
+@procedure
+def DeleteUser(cursor, args):
+    user_id = args.get("userid")
+    user = cursor.query("SELECT user_role FROM users WHERE id = ?", (user_id,)).fetchone()
+    if user is None:
+        return _status(cursor, "fail", 1, "User not found.")
+    if user[0] == "Admin":
+        return _status(cursor, "fail", 2, "Cannot delete an admin user.")
+
+    placeholder = cursor.query("SELECT id FROM users WHERE username = 'deleted_user'").fetchone()
+    if placeholder is None:
+        placeholder_id = cursor.query(
+            "INSERT INTO users (username, email, pass_word, full_name, user_role, phone_number, user_address) "
+            "VALUES ('deleted_user', 'deleted@gmail.com', 'N/A', 'Deleted User', 'Admin', 'N/A', 'N/A')"
+        ).lastrowid
+    else:
+        placeholder_id = placeholder[0]
+
+    cursor.query("UPDATE orders SET user_id = ? WHERE user_id = ?", (placeholder_id, user_id))
+    cursor.query("UPDATE product_reviews SET user_id = ? WHERE user_id = ?", (placeholder_id, user_id))
+    cursor.query("DELETE FROM cart_details WHERE cart_id IN (SELECT id FROM cart WHERE user_id = ?)", (user_id,))
+    cursor.query("DELETE FROM cart WHERE user_id = ?", (user_id,))
+    cursor.query("DELETE FROM users WHERE id = ?", (user_id,))
+    _status(cursor, "success", 0, "User deleted successfully, orders and reviews preserved.")
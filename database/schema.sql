@@ -113,6 +113,29 @@ CREATE TABLE wishlist (
     CONSTRAINT UQ_User_Product UNIQUE (user_id, product_id)
 );
 
+-- Revoked JWTs (by jti), kept until the token would have expired anyway
+CREATE TABLE revoked_tokens (
+    id INT PRIMARY KEY IDENTITY(1,1),
+    jti VARCHAR(64) UNIQUE NOT NULL,
+    user_id INT,
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NOT NULL DEFAULT GETUTCDATE(),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE INDEX ix_revoked_tokens_revoked_at ON revoked_tokens (revoked_at);
+
+-- Secondary indexes for the hot lookups (also migrations/versions/382df14ac826)
+CREATE INDEX ix_cart_user_id_is_checked_out ON Cart (user_id, is_checked_out);
+CREATE INDEX ix_cart_details_cart_id ON cart_details (cart_id) INCLUDE (product_id, quantity, price, discount);
+CREATE INDEX ix_orders_user_id_order_date ON orders (user_id, order_date) INCLUDE (total_amount, status);
+CREATE INDEX ix_order_details_order_id ON order_details (order_id) INCLUDE (product_id, quantity, price, discount);
+CREATE INDEX ix_product_reviews_product_id_review_date ON product_reviews (product_id, review_date) INCLUDE (user_id, rating);
+CREATE INDEX ix_products_product_name ON products (product_name);
+CREATE INDEX ix_products_price ON products (price);
+CREATE INDEX ix_products_category_id_is_active_price ON products (category_id, is_active, price);
+CREATE INDEX ix_products_category_id_is_active_product_name ON products (category_id, is_active, product_name);
+
 -- mahmoud elqalini
 -- mahmoud ramadan
 -- habiba abdelmalik
\ No newline at end of file
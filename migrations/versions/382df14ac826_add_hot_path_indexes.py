@@ -0,0 +1,56 @@
+"""add hot path indexes
+
+Revision ID: 382df14ac826
+Revises:
+Create Date: 2026-10-18 12:40:41.567709
+
+Secondary indexes for the lookups the storefront makes on every request:
+active cart by user, cart and order lines by their parent, a user's
+orders, a product's reviews newest first, the catalogue by category and
+products by name. The ``mssql_include`` columns make the cart, order line
+and review indexes covering on SQL Server; other backends ignore them.
+
+Tables created by ``db.create_all()`` after this revision already have
+these indexes (they are declared on the models too), so existing ones are
+skipped instead of failing the upgrade.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '382df14ac826'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    ('ix_cart_user_id_is_checked_out', 'cart', ['user_id', 'is_checked_out'], []),
+    ('ix_cart_details_cart_id', 'cart_details', ['cart_id'], ['product_id', 'quantity', 'price', 'discount']),
+    ('ix_orders_user_id_order_date', 'orders', ['user_id', 'order_date'], ['total_amount', 'status']),
+    ('ix_order_details_order_id', 'order_details', ['order_id'], ['product_id', 'quantity', 'price', 'discount']),
+    ('ix_product_reviews_product_id_review_date', 'product_reviews', ['product_id', 'review_date'],
+     ['user_id', 'rating']),
+    ('ix_products_category_id_is_active', 'products', ['category_id', 'is_active'], []),
+    ('ix_products_product_name', 'products', ['product_name'], []),
+)
+
+
+def _existing_indexes(table):
+    if context.is_offline_mode():
+        return set()
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    for name, table, columns, include in INDEXES:
+        if name in _existing_indexes(table):
+            continue
+        op.create_index(name, table, columns, mssql_include=include)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        if context.is_offline_mode() or name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,67 @@
+"""add product page indexes
+
+Revision ID: 9ec6f27b18a7
+Revises: 382df14ac826
+Create Date: 2026-10-18 15:02:17.318420
+
+Indexes for the keyset pages of ``GET /products``: the active catalogue by
+price, and a category's active products by price and by name, so a page
+seeks to its cursor and reads rows already in order instead of sorting the
+whole catalogue. The id tie-breaker comes for free as the clustered key
+(SQLite's rowid). ``newest`` pages walk the primary key, and the
+``discount`` sort orders on ``ISNULL(discount, 0)``, which no plain index
+holds.
+
+``ix_products_category_id_is_active`` from the previous revision is a
+prefix of the new category indexes, which serve its lookups as well, so
+it is dropped.
+
+As with the previous revision, indexes ``db.create_all()`` already made
+are skipped.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9ec6f27b18a7'
+down_revision = '382df14ac826'
+branch_labels = None
+depends_on = None
+
+
+# Superseded by ix_products_category_id_is_active_price
+REPLACED = ('ix_products_category_id_is_active', 'products', ['category_id', 'is_active'])
+
+INDEXES = (
+    ('ix_products_price', 'products', ['price']),
+    ('ix_products_category_id_is_active_price', 'products', ['category_id', 'is_active', 'price']),
+    ('ix_products_category_id_is_active_product_name', 'products', ['category_id', 'is_active', 'product_name']),
+)
+
+
+def _existing_indexes(table):
+    if context.is_offline_mode():
+        return set()
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        if name in _existing_indexes(table):
+            continue
+        op.create_index(name, table, columns)
+
+    name, table, _ = REPLACED
+    if context.is_offline_mode() or name in _existing_indexes(table):
+        op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    name, table, columns = REPLACED
+    if name not in _existing_indexes(table):
+        op.create_index(name, table, columns)
+
+    for name, table, _ in reversed(INDEXES):
+        if context.is_offline_mode() or name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
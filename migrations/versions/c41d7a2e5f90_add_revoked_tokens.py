@@ -0,0 +1,55 @@
+"""add revoked tokens
+
+Revision ID: c41d7a2e5f90
+Revises: 9ec6f27b18a7
+Create Date: 2026-10-18 16:20:05.114302
+
+The ``revoked_tokens`` table behind logout and the in-process revocation
+list, with the ``revoked_at`` index its incremental refresh reads by. It
+is the only table the model changes since the baseline schema added.
+
+A table or index ``db.create_all()`` already made is skipped, as in the
+previous revisions.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7a2e5f90'
+down_revision = '9ec6f27b18a7'
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables():
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _existing_indexes(table):
+    if context.is_offline_mode():
+        return set()
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    if 'revoked_tokens' not in _existing_tables():
+        op.create_table(
+            'revoked_tokens',
+            sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+            sa.Column('jti', sa.String(length=64), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('revoked_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('jti'),
+        )
+    if 'ix_revoked_tokens_revoked_at' not in _existing_indexes('revoked_tokens'):
+        op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'])
+
+
+def downgrade():
+    op.drop_table('revoked_tokens')